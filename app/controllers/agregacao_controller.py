@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, status, Query
+from typing import Optional
+
+from services import agregacao_service
+from services.agregacao_service import TOP_MAXIMO
+from services.auth_service import get_current_user
+
+router = APIRouter(prefix="/agregacoes", tags=["Agregações"])
+
+_COLUNA = "Coluna numérica agregada (padrão: a última da tabela, ex: 'Valor (US$)')"
+
+# Endpoint para resumir uma coluna por chave (produto, cultivar ou país) num intervalo de anos
+@router.get("/{dataset}/resumo", status_code=status.HTTP_200_OK)
+async def get_resumo(
+    dataset: str,
+    ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
+    ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
+    op: str = Query("soma", description="Operação: soma, media, min ou max"),
+    coluna: Optional[str] = Query(None, description=_COLUNA),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Retorna, para cada chave, o resultado da operação sobre os anos do intervalo
+    e quantos registros com valor entraram no cálculo.
+    """
+    return await agregacao_service.resumo(dataset, ano_inicio, ano_fim, op, coluna)
+
+
+# Endpoint para a série anual de uma chave
+@router.get("/{dataset}/serie", status_code=status.HTTP_200_OK)
+async def get_serie(
+    dataset: str,
+    chave: str = Query(..., description="Produto, cultivar ou país (sem diferenciar maiúsculas e acentos)"),
+    categoria: Optional[str] = Query(None, description="Categoria da chave nas tabelas hierárquicas (ex: 'VINHO DE MESA' para Tinto)"),
+    ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
+    ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
+    coluna: Optional[str] = Query(None, description=_COLUNA),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Retorna o valor da chave em cada ano do intervalo, com a variação absoluta
+    e percentual em relação ao ano anterior.
+    """
+    return await agregacao_service.serie(dataset, chave, ano_inicio, ano_fim, coluna, categoria)
+
+
+# Endpoint para as N maiores chaves de um intervalo
+@router.get("/{dataset}/top", status_code=status.HTTP_200_OK)
+async def get_top(
+    dataset: str,
+    ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
+    ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
+    n: int = Query(10, ge=1, le=TOP_MAXIMO, description="Quantidade de chaves"),
+    op: str = Query("soma", description="Operação usada no ranking: soma, media, min ou max"),
+    coluna: Optional[str] = Query(None, description=_COLUNA),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Retorna as N chaves (ex: países) com maior valor no intervalo, em ordem decrescente.
+    """
+    return await agregacao_service.top(dataset, ano_inicio, ano_fim, n, op, coluna)
@@ -12,12 +12,13 @@ from services.auth_service import (
     refresh_access_token,
     get_current_user,
     delete_user,
+    hash_pool_stats,
     REFRESH_TOKEN_EXPIRE_DAYS,
     ACCESS_TOKEN_EXPIRE_MINUTES
     
 )
-from database import get_db
-from sqlalchemy.orm import Session
+from database import get_async_db, pool_stats
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Roteador principal para endpoints de autenticação (tag para documentação Swagger/OpenAPI)
 router = APIRouter(tags=["Authentication"])
@@ -29,10 +30,10 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 @router.post("/createToken", response_model=Token)
 async def login_for_access_token(
     user_data: User,  # Agora espera JSON  # Formulário padrão de login
-    db: Session = Depends(get_db)  # Injeção da sessão do banco
+    db: AsyncSession = Depends(get_async_db)  # Injeção da sessão do banco
 ):
     # Autentica o usuário no banco de dados
-    user = authenticate_user(db, user_data.username, user_data.password)
+    user = await authenticate_user(db, user_data.username, user_data.password)
     if not user:
         # Falha na autenticação retorna HTTP 401
         raise HTTPException(
@@ -64,26 +65,42 @@ async def login_for_access_token(
 @router.post("/refreshToken", response_model=Token)
 async def refresh_token_endpoint(
     request: RefreshTokenRequest,  # Recebe o refresh token no corpo da requisição
-    db: Session = Depends(get_db)   # Sessão do DB
+    db: AsyncSession = Depends(get_async_db)   # Sessão do DB
 ):
     # Chama o serviço de renovação de token
-    return refresh_access_token(request.refresh_token, db)
+    return await refresh_access_token(request.refresh_token, db)
 
 # Endpoint para criação de novos usuários
 @router.post("/createUser", status_code=status.HTTP_201_CREATED)
 async def create_user_endpoint(
     user: User,  # Dados do usuário validados pelo schema
-    db: Session = Depends(get_db)  # Sessão do DB
+    db: AsyncSession = Depends(get_async_db)  # Sessão do DB
 ):
     # Chama o serviço de criação de usuário
-    return create_user(db, user.username, user.password)
+    return await create_user(db, user.username, user.password)
 
 # Endpoint para deletar usuários
 @router.delete("/user/{user_id}", status_code=status.HTTP_200_OK)
 async def delete_user_endpoint(
     user_id: int,  # ID do usuário a ser deletado (via path parameter)
-    db: Session = Depends(get_db),  # Sessão do DB
+    db: AsyncSession = Depends(get_async_db),  # Sessão do DB
     current_user: str = Depends(get_current_user)  # Valida usuário logado
 ):
     # Chama o serviço de deleção
-    return delete_user(db, user_id)
\ No newline at end of file
+    return await delete_user(db, user_id)
+
+# Endpoint para acompanhar a ocupação do pool de hashing de senhas
+@router.get("/hashPoolStats", status_code=status.HTTP_200_OK)
+async def hash_pool_stats_endpoint(
+    current_user: str = Depends(get_current_user)  # Valida usuário logado
+):
+    # Retorna hashes em execução, tamanho da fila e requisições recusadas
+    return hash_pool_stats()
+
+# Endpoint para acompanhar o pool de conexões com o banco
+@router.get("/dbPoolStats", status_code=status.HTTP_200_OK)
+async def db_pool_stats_endpoint(
+    current_user: str = Depends(get_current_user)  # Valida usuário logado
+):
+    # Retorna conexões em uso, overflow e tempo de espera por conexão
+    return pool_stats()
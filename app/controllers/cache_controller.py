@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Optional
+
+from services.auth_service import get_current_user
+from services.cache_service import scraping_cache
+from services.circuit_breaker import embrapa_breaker
+from services.datasets import DATASETS
+from services.prefetch import prefetcher
+from services.singleflight import scraping_singleflight
+from services.warmup_service import aquecimento_stats
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+# Endpoint para consultar as estatísticas do cache de scraping
+@router.get("/stats", status_code=status.HTTP_200_OK)
+async def get_cache_stats(
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Retorna ocupação, acertos, falhas e descartes do cache de tabelas,
+    além das buscas coalescidas pelo single-flight, do estado do circuit
+    breaker da Embrapa e do progresso do aquecimento e do prefetch.
+    """
+    stats = await scraping_cache.stats()
+    stats["singleflight"] = scraping_singleflight.stats()
+    stats["upstream"] = embrapa_breaker.stats()
+    stats["aquecimento"] = aquecimento_stats()
+    stats["prefetch"] = prefetcher.stats()
+    return stats
+
+
+# Endpoint para invalidar entradas do cache
+@router.delete("", status_code=status.HTTP_200_OK)
+async def invalidate_cache(
+    dataset: Optional[str] = Query(None, description="Nome do dataset (ex: producao). Se omitido, limpa todo o cache"),
+    ano: Optional[int] = Query(None, ge=1970, description="Ano a invalidar (requer dataset)"),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Remove entradas do cache, forçando um novo scraping na próxima consulta.
+    """
+    if dataset is None:
+        if ano is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe o dataset para invalidar um ano específico"
+            )
+        return {"removed": await scraping_cache.invalidate()}
+
+    service = DATASETS.get(dataset)
+    if service is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset '{dataset}' não encontrado"
+        )
+
+    filtro = (service.url_param,) if ano is None else (service.url_param, ano)
+    return {"removed": await scraping_cache.invalidate(filtro)}
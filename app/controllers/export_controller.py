@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, status, Query
+from typing import Optional
+
+from services.auth_service import get_current_user
+from services.export_service import exportar_dataset, exportar_todos
+
+router = APIRouter(prefix="/export", tags=["Exportação"])
+
+# Endpoint para exportar todos os datasets num único arquivo
+@router.get("", status_code=status.HTTP_200_OK)
+async def export_all(
+    formato: str = Query("parquet", description="Formato do arquivo: parquet ou arrow (Arrow IPC stream)"),
+    ano_inicio: Optional[int] = Query(None, ge=1970, description="Ano inicial (padrão: 1970, limitado aos últimos EXPORT_MAX_ANOS anos)"),
+    ano_fim: Optional[int] = Query(None, ge=1970, description="Ano final (padrão: ano atual)"),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Exporta o histórico de todos os datasets, com a coluna 'dataset' indicando a origem de cada linha.
+    """
+    return await exportar_todos(formato, ano_inicio, ano_fim)
+
+
+# Endpoint para exportar um dataset
+@router.get("/{dataset}", status_code=status.HTTP_200_OK)
+async def export_dataset(
+    dataset: str,
+    formato: str = Query("parquet", description="Formato do arquivo: parquet ou arrow (Arrow IPC stream)"),
+    ano_inicio: Optional[int] = Query(None, ge=1970, description="Ano inicial (padrão: 1970, limitado aos últimos EXPORT_MAX_ANOS anos)"),
+    ano_fim: Optional[int] = Query(None, ge=1970, description="Ano final (padrão: ano atual)"),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Exporta o histórico de um dataset (ex: producao, importacao_vinhos_mesa) em Parquet ou Arrow.
+    """
+    return await exportar_dataset(dataset, formato, ano_inicio, ano_fim)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, status, Query, Request
 from typing import List, Dict, Union
 
 from services.auth_service import get_current_user
+from services.consulta import Consulta, parametros_consulta
 from services.importacao_service import (
     importacao_service_vinhos_mesa,
     importacao_service_espumantes,
@@ -13,122 +14,137 @@ from services.importacao_service import (
 router = APIRouter(prefix="/importacao", tags=["Importacao"])
 
 # Endpoint para buscar vinhosMesa
-@router.get("/vinhosMesa/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/vinhosMesa/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return importacao_service_vinhos_mesa.get_data_by_year(year)
+    return await importacao_service_vinhos_mesa.get_response_by_year(year, consulta)
 
 
 # Endpoint para buscar vinhosMesa
-@router.get("/vinhosMesa", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/vinhosMesa", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return importacao_service_vinhos_mesa.get_data_range(ano_inicio, ano_fim)
+    return await importacao_service_vinhos_mesa.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
 
 
 # Endpoint para buscar espumantes
-@router.get("/espumantes/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/espumantes/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return importacao_service_espumantes.get_data_by_year(year)
+    return await importacao_service_espumantes.get_response_by_year(year, consulta)
 
 
-@router.get("/espumantes", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/espumantes", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return importacao_service_espumantes.get_data_range(ano_inicio, ano_fim)
+    return await importacao_service_espumantes.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
 
 
 # Endpoint para buscar uvasFrescas
-@router.get("/uvasFrescas/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/uvasFrescas/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return importacao_service_uvas_frescas.get_data_by_year(year)
+    return await importacao_service_uvas_frescas.get_response_by_year(year, consulta)
 
 
-@router.get("/uvasFrescas", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/uvasFrescas", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return importacao_service_uvas_frescas.get_data_range(ano_inicio, ano_fim)
+    return await importacao_service_uvas_frescas.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
 
 
 # Endpoint para buscar uvasPassas
-@router.get("/uvasPassas/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/uvasPassas/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return importacao_service_uvas_passas.get_data_by_year(year)
+    return await importacao_service_uvas_passas.get_response_by_year(year, consulta)
 
 
-@router.get("/uvasPassas", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/uvasPassas", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return importacao_service_uvas_passas.get_data_range(ano_inicio, ano_fim)
+    return await importacao_service_uvas_passas.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
 
 
 # Endpoint para buscar uvasPassas
-@router.get("/sucoUva/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/sucoUva/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return importacao_service_suco_uva.get_data_by_year(year)
+    return await importacao_service_suco_uva.get_response_by_year(year, consulta)
 
 
-@router.get("/sucoUva", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/sucoUva", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return importacao_service_suco_uva.get_data_range(ano_inicio, ano_fim)
+    return await importacao_service_suco_uva.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
 
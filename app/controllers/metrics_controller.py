@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from database import pool_stats
+from services.auth_service import hash_pool_stats
+from services.cache_service import MemoryCacheBackend, scraping_cache
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, embrapa_breaker
+from services.prefetch import prefetcher
+from services.singleflight import scraping_singleflight
+
+router = APIRouter(tags=["Métricas"])
+
+
+def _gauge(nome: str, descricao: str, valor: float) -> GaugeMetricFamily:
+    return GaugeMetricFamily(nome, descricao, value=valor)
+
+
+def _counter(nome: str, descricao: str, valor: float) -> CounterMetricFamily:
+    return CounterMetricFamily(nome, descricao, value=valor)
+
+
+class EstadoCollector:
+    """
+    Ocupação dos pools, do cache e da fila de prefetch, lida dos contadores
+    que os serviços já mantêm somente quando /metrics é consultado.
+    """
+
+    def collect(self):
+        banco = pool_stats()
+        if "size" in banco:
+            conexoes = GaugeMetricFamily(
+                "vitibrasil_db_pool_connections", "Conexões do pool do banco por estado", labels=["estado"]
+            )
+            conexoes.add_metric(["checked_in"], banco["checked_in"])
+            conexoes.add_metric(["checked_out"], banco["checked_out"])
+            conexoes.add_metric(["overflow"], max(banco["overflow"], 0))
+            yield conexoes
+            yield _gauge("vitibrasil_db_pool_size", "Tamanho fixo do pool do banco", banco["size"])
+            yield _gauge("vitibrasil_db_pool_max_overflow", "Conexões extras permitidas além do pool", banco["max_overflow"])
+        if "checkouts" in banco:
+            yield _counter("vitibrasil_db_pool_checkouts", "Conexões retiradas do pool", banco["checkouts"])
+            yield _counter("vitibrasil_db_pool_timeouts", "Esperas por conexão que esgotaram o tempo", banco["timeouts"])
+            yield _counter(
+                "vitibrasil_db_pool_wait_seconds", "Tempo total de espera por uma conexão livre",
+                banco["wait_total_ms"] / 1000,
+            )
+
+        hashing = hash_pool_stats()
+        yield _gauge("vitibrasil_auth_hash_workers", "Threads do pool de hashing de senhas", hashing["workers"])
+        yield _gauge("vitibrasil_auth_hash_running", "Hashes de senha em execução", hashing["running"])
+        yield _gauge("vitibrasil_auth_hash_queue_depth", "Hashes de senha aguardando uma thread", hashing["queue_depth"])
+        yield _counter("vitibrasil_auth_hash_completed", "Hashes de senha concluídos", hashing["completed"])
+        yield _counter("vitibrasil_auth_hash_rejected", "Hashes de senha recusados com a fila cheia", hashing["rejected"])
+
+        voos = scraping_singleflight.stats()
+        yield _gauge("vitibrasil_scraping_in_flight", "Buscas na Embrapa em andamento", voos["in_flight"])
+        yield _counter("vitibrasil_scraping_executions", "Buscas executadas (após o single-flight)", voos["executions"])
+        yield _counter("vitibrasil_scraping_coalesced", "Requisições que aguardaram uma busca já em andamento", voos["coalesced"])
+
+        circuito = embrapa_breaker.stats()
+        estado = GaugeMetricFamily(
+            "vitibrasil_upstream_circuit_state", "Estado do circuit breaker da Embrapa (1 = estado atual)", labels=["estado"]
+        )
+        for nome in (CLOSED, HALF_OPEN, OPEN):
+            estado.add_metric([nome], 1 if circuito["state"] == nome else 0)
+        yield estado
+        yield _counter("vitibrasil_upstream_circuit_opened", "Vezes que o circuito abriu", circuito["opened"])
+        yield _counter("vitibrasil_upstream_circuit_rejected", "Buscas recusadas com o circuito aberto", circuito["rejected"])
+
+        fila = prefetcher.stats()
+        yield _gauge("vitibrasil_prefetch_queue_depth", "Anos na fila de prefetch", fila["na_fila"])
+        for chave in ("agendados", "carregados", "descartados", "erros"):
+            yield _counter(f"vitibrasil_prefetch_{chave}", f"Anos de prefetch {chave}", fila[chave])
+
+        # Com Redis, a ocupação é do servidor compartilhado (ver /cache/stats e as métricas do próprio Redis)
+        if isinstance(scraping_cache, MemoryCacheBackend):
+            cache = scraping_cache.cache.stats()
+            yield _gauge("vitibrasil_cache_entries", "Tabelas no cache em memória", cache["entries"])
+            yield _gauge("vitibrasil_cache_bytes", "Tamanho estimado das tabelas no cache em memória", cache["bytes"])
+            yield _counter("vitibrasil_cache_evictions", "Tabelas descartadas por falta de espaço", cache["evictions"])
+
+
+REGISTRY.register(EstadoCollector())
+
+
+# Endpoint no formato de exposição do Prometheus (sem autenticação, como de costume para scrapers)
+@router.get("/metrics")
+async def metrics():
+    """
+    Latência por rota e por etapa do scraping, acertos do cache por dataset,
+    status das respostas da Embrapa e ocupação dos pools.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, status, Query, Request
 from typing import List, Dict, Union
 
 from services.auth_service import get_current_user
+from services.consulta import Consulta, parametros_consulta
 from services.processamento_service import (
     processamento_service_viniferas, 
     processamento_service_americanas, 
@@ -12,100 +13,112 @@ from services.processamento_service import (
 router = APIRouter(prefix="/processamento", tags=["Processamento"])
 
 # Endpoint para buscar viniferas
-@router.get("/viniferas/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/viniferas/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return processamento_service_viniferas.get_data_by_year(year)
+    return await processamento_service_viniferas.get_response_by_year(year, consulta)
 
 
 # Endpoint para buscar viniferas
-@router.get("/viniferas", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/viniferas", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return processamento_service_viniferas.get_data_range(ano_inicio, ano_fim)
+    return await processamento_service_viniferas.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
 
 
 # Endpoint para buscar americanas
-@router.get("/americanas/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/americanas/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return processamento_service_americanas.get_data_by_year(year)
+    return await processamento_service_americanas.get_response_by_year(year, consulta)
 
 
 # Endpoint para buscar americanas
-@router.get("/americanas", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/americanas", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return processamento_service_americanas.get_data_range(ano_inicio, ano_fim)
+    return await processamento_service_americanas.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
 
 
 # Endpoint para buscar Uvas
-@router.get("/uvas/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/uvas/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return processamento_service_uvas.get_data_by_year(year)
+    return await processamento_service_uvas.get_response_by_year(year, consulta)
 
 
 # Endpoint para buscar Uvas
-@router.get("/uvas", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/uvas", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return processamento_service_uvas.get_data_range(ano_inicio, ano_fim)
+    return await processamento_service_uvas.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
 
 
 # Endpoint para buscar sem classificação
-@router.get("/semClass/{year}", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/semClass/{year}", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_by_year(
     year: int,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento para um ano específico.
     """
-    return processamento_service_sem_classificacao.get_data_by_year(year)
+    return await processamento_service_sem_classificacao.get_response_by_year(year, consulta)
 
 
 # Endpoint para buscar sem classificação
-@router.get("/semClass", response_model=List[Dict[str, Union[str, int, float]]], status_code=status.HTTP_200_OK)
+@router.get("/semClass", response_model=List[Dict[str, Union[str, int, float, None]]], status_code=status.HTTP_200_OK)
 async def get_processamento_range(
+    request: Request,
     ano_inicio: int = Query(..., ge=1970, le=2025, description="Ano inicial do intervalo"),
     ano_fim: int = Query(..., ge=1970, le=2025, description="Ano final do intervalo"),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    consulta: Consulta = Depends(parametros_consulta)
 ):
     """
     Retorna dados de processamento em um intervalo de anos (inclusive).
     """
-    return processamento_service_sem_classificacao.get_data_range(ano_inicio, ano_fim)
+    return await processamento_service_sem_classificacao.get_response_range(ano_inicio, ano_fim, request.headers.get("accept"), consulta)
@@ -1,10 +1,16 @@
 import os
+import time
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # Carrega variáveis do .env
 load_dotenv()
@@ -12,12 +18,103 @@ load_dotenv()
 # URL de conexão com o banco MySQL
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# URL da engine assíncrona; se vazia, é derivada da DATABASE_URL trocando o driver
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Configurações do pool de conexões (com valores padrão)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Driver assíncrono usado para cada banco
+DRIVERS_ASYNC = {
+    "mysql": "mysql+aiomysql",
+    "mariadb": "mariadb+aiomysql",
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: Optional[str] = DATABASE_URL) -> str:
+    """
+    Converte a URL síncrona para o driver assíncrono equivalente
+    (ex: mysql+pymysql://... -> mysql+aiomysql://...).
+    """
+    if ASYNC_DATABASE_URL:
+        return ASYNC_DATABASE_URL
+    url_obj = make_url(url)
+    driver = DRIVERS_ASYNC.get(url_obj.get_backend_name())
+    if driver is None:
+        raise ValueError(f"Sem driver assíncrono conhecido para {url_obj.drivername}; defina ASYNC_DATABASE_URL")
+    return url_obj.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _pool_kwargs(url: str) -> Dict[str, Any]:
+    # SQLite em memória usa um pool de conexão única, sem parâmetros de tamanho
+    url_obj = make_url(url)
+    if url_obj.get_backend_name() == "sqlite" and url_obj.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+class MeasuredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool assíncrono que mede o tempo de cada checkout, ou seja, quanto uma
+    requisição esperou por uma conexão livre (incluindo abrir uma nova).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            self.checkouts += 1
+            self.wait_total += espera
+            self.wait_max = max(self.wait_max, espera)
+
+    def recreate(self):
+        # Mantém os contadores quando o pool é recriado (ex: após dispose)
+        novo = super().recreate()
+        novo.checkouts, novo.timeouts = self.checkouts, self.timeouts
+        novo.wait_total, novo.wait_max = self.wait_total, self.wait_max
+        return novo
+
+
 # Cria a engine de conexão com o banco de dados, engine é o ponto central de conexão com o banco
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **_pool_kwargs(DATABASE_URL))
+
+# Engine assíncrona usada pelos handlers async (não bloqueia o event loop)
+_async_url = get_async_database_url()
+_async_pool = _pool_kwargs(_async_url)
+async_engine = create_async_engine(
+    _async_url, **_async_pool, **({"poolclass": MeasuredAsyncQueuePool} if _async_pool else {})
+)
 
 # Cria uma fábrica de sessões
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Fábrica de sessões assíncronas (objetos continuam legíveis após o commit)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base para os modelos declarativos
 # Todas as classes de modelo herdarão desta classe
 Base = declarative_base()
@@ -32,4 +129,38 @@ def get_db():
     finally:
         # Garante que a sessão será fechada após o uso
         # Mesmo se ocorrer um erro durante a operação
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Função geradora que fornece sessões assíncronas de banco de dados
+async def get_async_db():
+    # A sessão devolve a conexão ao pool ao sair do bloco, mesmo com erro
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Ocupação do pool da engine assíncrona e tempo de espera por conexão"""
+    pool = async_engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=DB_MAX_OVERFLOW,
+        )
+    if isinstance(pool, MeasuredAsyncQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_avg_ms=round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            wait_max_ms=round(pool.wait_max * 1000, 3),
+            wait_total_ms=round(pool.wait_total * 1000, 3),
+        )
+    return stats
+
+
+async def close_async_engine() -> None:
+    """Fecha as conexões do pool assíncrono (chamado no encerramento da aplicação)"""
+    await async_engine.dispose()
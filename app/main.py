@@ -1,23 +1,60 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, APIRouter
-from pathlib import Path
-import yaml
 from controllers import (
     auth_controller, 
     producao_controller, 
     processamento_controller,
     comercializacao_controller,
     importacao_controller,
-    exportacao_controller
+    exportacao_controller,
+    cache_controller,
+    export_controller,
+    agregacao_controller,
+    metrics_controller
 ) 
+from services.http_client import close_http_client
+from services.parse_executor import shutdown_parse_executor
+from services.auth_service import shutdown_hash_pool
+from services.revogacao import revogacoes
+from database import close_async_engine
+from services.migration_service import DB_AUTO_MIGRATE, aplicar_migracoes
+from services.cache_service import scraping_cache
+from services.snapshot_store import snapshot_store
+from services.snapshot_service import loop_atualizacao
+from services.http_cache import ConditionalGetMiddleware
+from services.metrics import METRICS_ENABLED, MetricsMiddleware
+from services.prefetch import prefetcher
+from services.warmup_service import WARMUP_DATASETS, tarefa_aquecimento
+from services.openapi_doc import carregar_openapi
+from services.html_parser import precarregar as precarregar_parser
 
-# Carrega o YAML
-def load_openapi():
-    BASE_DIR = Path(__file__).resolve().parent.parent.parent
-    # DATA_DIR = BASE_DIR / "fastapi-embrapa"
-    DATA_DIR = BASE_DIR / "API Tech Challenge"
-
-    with open(DATA_DIR / "openapi.yaml", encoding='utf-8') as f:
-        return yaml.safe_load(f)
+# Ciclo de vida da aplicação: aplica as migrações do banco, agenda a atualização do snapshot, inicia o
+# aquecimento do cache (em segundo plano) e o prefetch, importa as dependências do parsing numa thread
+# (sem atrasar o início) e, no encerramento, libera os pools de conexões (HTTP e banco), o cache e os
+# pools de parsing e de hashing
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DB_AUTO_MIGRATE:
+        await aplicar_migracoes()
+    tarefas = [asyncio.create_task(asyncio.to_thread(precarregar_parser))]
+    if snapshot_store is not None:
+        tarefas.append(asyncio.create_task(loop_atualizacao()))
+    if WARMUP_DATASETS:
+        tarefas.append(asyncio.create_task(tarefa_aquecimento()))
+    prefetcher.iniciar()
+    yield
+    for tarefa in tarefas:
+        tarefa.cancel()
+        with suppress(asyncio.CancelledError):
+            await tarefa
+    await prefetcher.parar()
+    await close_http_client()
+    await scraping_cache.close()
+    await revogacoes.close()
+    shutdown_parse_executor()
+    shutdown_hash_pool()
+    await close_async_engine()
 
 app = FastAPI(
     title="API EMBRAPA",
@@ -25,15 +62,29 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
+# Responde 304 a requisições condicionais (If-None-Match / If-Modified-Since) das rotas de dados
+app.add_middleware(ConditionalGetMiddleware)
+
+# Latência por rota (adicionado por último para ficar mais externo e medir também as respostas 304)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # roteador principal
 API_PREFIX = "/api/v1"
 main_router = APIRouter(prefix=API_PREFIX)
 
-# Mescla a especificação YAML com as rotas
-app.openapi_schema = load_openapi()
+# A documentação vem da especificação mantida em openapi.yaml, pré-compilada em
+# app/openapi.json; só é lida quando /openapi.json (ou /docs) é acessado
+def openapi():
+    if app.openapi_schema is None:
+        app.openapi_schema = carregar_openapi()
+    return app.openapi_schema
+
+app.openapi = openapi
 
 # Incluir os outros roteadores no roteador principal
 main_router.include_router(auth_controller.router, prefix="/auth")
@@ -42,6 +93,13 @@ main_router.include_router(processamento_controller.router)
 main_router.include_router(comercializacao_controller.router)
 main_router.include_router(importacao_controller.router)
 main_router.include_router(exportacao_controller.router)
+main_router.include_router(cache_controller.router)
+main_router.include_router(export_controller.router)
+main_router.include_router(agregacao_controller.router)
 
 # Incluir o roteador principal no app
-app.include_router(main_router)
\ No newline at end of file
+app.include_router(main_router)
+
+# Métricas no formato do Prometheus, fora do prefixo da API (caminho padrão dos scrapers)
+if METRICS_ENABLED:
+    app.include_router(metrics_controller.router)
\ No newline at end of file
@@ -0,0 +1,306 @@
+import hashlib
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Response
+
+from .cache_service import TTLCache
+from .datasets import DATASETS
+from .http_cache import cache_headers
+from .json_response import etag_tabelas
+from .scraping_service import ScrapingService
+from .tabela import TIPO_FLOAT, TIPO_INT, Tabela, normalizar_chave, serializar_json
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# Resultados já calculados ficam em memória, validados pelo ETag das tabelas de origem
+AGGREGATE_CACHE_MAX_BYTES = int(os.getenv("AGGREGATE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+AGGREGATE_CACHE_TTL = int(os.getenv("AGGREGATE_CACHE_TTL", str(60 * 60)))
+agregacao_cache = TTLCache(max_entries=1024, max_bytes=AGGREGATE_CACHE_MAX_BYTES)
+
+# Operações de resumo por chave
+OPERACOES = ("soma", "media", "min", "max")
+
+# Maior N aceito no top-N
+TOP_MAXIMO = 1000
+
+# Linha de total das tabelas da Embrapa: entra no resumo e na série, mas não no ranking
+# (nas tabelas hierárquicas, as categorias também ficam fora do ranking)
+_CHAVE_TOTAL = "total"
+
+# numpy é importado no primeiro cálculo (import local nas funções), fora do início da aplicação
+
+
+class _Grupos:
+    """
+    Linhas de várias tabelas achatadas em vetores numpy para agregação.
+
+    Nas tabelas hierárquicas (produção, processamento e comercialização) a
+    chave é qualificada pela categoria: o "Tinto" de VINHO DE MESA e o de
+    VINHO FINO DE MESA são grupos diferentes.
+
+    nomes: nome de cada chave (como aparece na primeira ocorrência)
+    categorias: nome da categoria de cada chave (None no primeiro nível)
+    primeiro_nivel: True nas categorias e no total das tabelas hierárquicas
+    codigos: posição em nomes da chave de cada linha
+    anos, valores: ano e valor da coluna agregada de cada linha (linhas sem valor são descartadas)
+    """
+
+    __slots__ = ("nomes", "categorias", "primeiro_nivel", "codigos", "anos", "valores")
+
+    def __init__(
+        self,
+        nomes: List[str],
+        categorias: List[Optional[str]],
+        primeiro_nivel: List[bool],
+        codigos: "np.ndarray",
+        anos: "np.ndarray",
+        valores: "np.ndarray",
+    ):
+        self.nomes = nomes
+        self.categorias = categorias
+        self.primeiro_nivel = primeiro_nivel
+        self.codigos = codigos
+        self.anos = anos
+        self.valores = valores
+
+
+def _colunas_numericas(tabela: Tabela) -> List[int]:
+    return [j for j, tipo in enumerate(tabela.tipos) if tipo in (TIPO_INT, TIPO_FLOAT)]
+
+
+def _coluna_valor(tabela: Tabela, coluna: Optional[str]) -> Optional[int]:
+    # Sem coluna informada, usa a última coluna numérica (o valor em US$ ou, sem ele, a quantidade)
+    numericas = _colunas_numericas(tabela)
+    if coluna is None:
+        return numericas[-1] if numericas else None
+    alvo = normalizar_chave(coluna)
+    return next((j for j in numericas if normalizar_chave(tabela.headers[j]) == alvo), None)
+
+
+def _agrupar(tabelas: Sequence[Tabela], coluna: Optional[str]) -> _Grupos:
+    import numpy as np
+
+    ids: Dict[Tuple[Optional[str], str], int] = {}
+    nomes: List[str] = []
+    categorias: List[Optional[str]] = []
+    primeiro_nivel: List[bool] = []
+
+    def codigo_grupo(categoria: Optional[str], nome: str, normalizada: str, hierarquica: bool) -> int:
+        grupo = (categoria and normalizar_chave(categoria), normalizada)
+        codigo = ids.get(grupo)
+        if codigo is None:
+            codigo = ids[grupo] = len(nomes)
+            nomes.append(nome)
+            categorias.append(categoria)
+            primeiro_nivel.append(hierarquica and categoria is None)
+        return codigo
+
+    partes: List[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]] = []
+
+    for tabela in tabelas:
+        chave, j = tabela.coluna_chave, _coluna_valor(tabela, coluna)
+        if chave is None or j is None or not len(tabela):
+            continue
+
+        codigos = np.full(len(tabela), -1, dtype=np.int64)
+        hierarquia = tabela.hierarquia
+        if hierarquia is None:
+            # O índice da coluna chave (montado quando a tabela entrou no cache)
+            # dá as linhas de cada chave sem percorrer a tabela
+            for normalizada, posicoes in tabela.indice().items():
+                nome = tabela.colunas[chave][posicoes[0]]
+                codigos[np.frombuffer(posicoes, dtype=np.uint32)] = codigo_grupo(None, nome, normalizada, False)
+        else:
+            nomes_linhas = tabela.colunas[chave]
+            for i, nome in enumerate(nomes_linhas):
+                if nome is not None:
+                    categoria = nomes_linhas[hierarquia[i]] if hierarquia[i] >= 0 else None
+                    codigos[i] = codigo_grupo(categoria, nome, normalizar_chave(nome), True)
+
+        # Colunas numéricas são lidas direto do array tipado, sem criar objetos Python
+        dtype = np.int64 if tabela.tipos[j] == TIPO_INT else np.float64
+        valores = np.frombuffer(tabela.colunas[j], dtype=dtype).astype(np.float64)
+        validas = codigos >= 0
+        if tabela.nulos[j] is not None:
+            validas[np.frombuffer(tabela.nulos[j], dtype=np.uint32)] = False
+        partes.append((codigos[validas], np.full(int(validas.sum()), tabela.ano, dtype=np.int64), valores[validas]))
+
+    if not partes:
+        vazio = np.empty(0, dtype=np.int64)
+        return _Grupos(nomes, categorias, primeiro_nivel, vazio, vazio, np.empty(0, dtype=np.float64))
+    codigos, anos, valores = (np.concatenate(vetores) for vetores in zip(*partes))
+    return _Grupos(nomes, categorias, primeiro_nivel, codigos, anos, valores)
+
+
+def _reduzir(grupos: _Grupos, operacao: str) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Valor da operação e quantidade de valores de cada chave (vetorizado com bincount/ufunc.at)"""
+    import numpy as np
+
+    k = len(grupos.nomes)
+    contagem = np.bincount(grupos.codigos, minlength=k)
+    if operacao in ("soma", "media"):
+        resultado = np.bincount(grupos.codigos, weights=grupos.valores, minlength=k)
+        if operacao == "media":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                resultado = resultado / contagem
+    else:
+        ufunc = np.minimum if operacao == "min" else np.maximum
+        resultado = np.full(k, np.inf if operacao == "min" else -np.inf)
+        ufunc.at(resultado, grupos.codigos, grupos.valores)
+    return resultado, contagem
+
+
+def _numero(valor: float):
+    # Totais inteiros voltam como int no JSON, como nas tabelas de origem
+    return int(valor) if float(valor).is_integer() else round(float(valor), 6)
+
+
+def _validar(nome: str, ano_inicio: int, ano_fim: int) -> ScrapingService:
+    service = DATASETS.get(nome)
+    if service is None:
+        raise HTTPException(status_code=404, detail=f"Dataset '{nome}' não encontrado")
+    if ano_inicio > ano_fim:
+        raise HTTPException(status_code=400, detail="Ano inicial deve ser menor ou igual ao ano final")
+    return service
+
+
+def _validar_coluna(tabelas: Sequence[Tabela], coluna: Optional[str]) -> None:
+    if coluna is None or not tabelas or any(_coluna_valor(t, coluna) is not None for t in tabelas):
+        return
+    numericas = [tabelas[0].headers[j] for j in _colunas_numericas(tabelas[0])]
+    raise HTTPException(status_code=400, detail=f"Coluna numérica inexistente. Disponíveis: {', '.join(numericas)}")
+
+
+async def _agregar(
+    nome: str, ano_inicio: int, ano_fim: int, coluna: Optional[str], parametros: tuple,
+    calcular: Callable[[Sequence[Tabela], _Grupos], object],
+) -> Response:
+    """
+    Calcula (ou reaproveita) uma agregação sobre as tabelas em cache de um dataset.
+
+    O resultado é memorizado por (dataset, intervalo, operação e parâmetros),
+    junto com o ETag das tabelas de origem: enquanto elas não mudam, a mesma
+    consulta é respondida com o JSON já pronto.
+    """
+    service = _validar(nome, ano_inicio, ano_fim)
+    tabelas = await service.get_tabela_range(ano_inicio, ano_fim, ignorar_ausentes=True)
+    _validar_coluna(tabelas, coluna)
+
+    origem = etag_tabelas(tabelas) if tabelas else '"vazio"'
+    chave = (nome, ano_inicio, ano_fim, coluna and normalizar_chave(coluna), parametros, origem)
+    corpo = agregacao_cache.get(chave)
+    if corpo is None:
+        corpo = serializar_json(calcular(tabelas, _agrupar(tabelas, coluna)))
+        agregacao_cache.set(chave, corpo, AGGREGATE_CACHE_TTL)
+
+    etag = '"' + hashlib.blake2b(repr(chave).encode(), digest_size=16).hexdigest() + '"'
+    return Response(content=corpo, media_type="application/json", headers={"ETag": etag, **cache_headers(tabelas)})
+
+
+async def resumo(nome: str, ano_inicio: int, ano_fim: int, operacao: str, coluna: Optional[str] = None) -> Response:
+    """Soma, média, mínimo ou máximo da coluna, por chave (produto, cultivar ou país), no intervalo"""
+    if operacao not in OPERACOES:
+        raise HTTPException(status_code=400, detail=f"Operação inválida: {operacao}. Use uma de {list(OPERACOES)}")
+
+    def calcular(_, grupos: _Grupos) -> List[dict]:
+        resultado, contagem = _reduzir(grupos, operacao)
+        return [
+            {
+                "chave": grupos.nomes[k],
+                "categoria": grupos.categorias[k],
+                "valor": _numero(resultado[k]),
+                "registros": int(contagem[k]),
+            }
+            for k in range(len(grupos.nomes)) if contagem[k]
+        ]
+
+    return await _agregar(nome, ano_inicio, ano_fim, coluna, ("resumo", operacao), calcular)
+
+
+async def serie(
+    nome: str, chave: str, ano_inicio: int, ano_fim: int, coluna: Optional[str] = None, categoria: Optional[str] = None
+) -> Response:
+    """
+    Série anual de uma chave, com a variação em relação ao ano anterior.
+
+    Nas tabelas hierárquicas, um subitem que aparece em mais de uma categoria
+    (ex: Tinto) exige a categoria. Linhas repetidas da chave no mesmo ano são
+    somadas; anos sem valor ficam null.
+    """
+    alvo = normalizar_chave(chave)
+    alvo_categoria = normalizar_chave(categoria) if categoria else None
+
+    def calcular(tabelas: Sequence[Tabela], grupos: _Grupos) -> List[dict]:
+        import numpy as np
+
+        encontrados = [
+            k for k, nome_chave in enumerate(grupos.nomes)
+            if normalizar_chave(nome_chave) == alvo and (
+                alvo_categoria is None or normalizar_chave(grupos.categorias[k] or "") == alvo_categoria
+            )
+        ]
+        if not encontrados:
+            raise HTTPException(status_code=404, detail=f"'{chave}' não encontrado no intervalo")
+        if len(encontrados) > 1:
+            opcoes = ", ".join(grupos.categorias[k] or "(primeiro nível)" for k in encontrados)
+            raise HTTPException(
+                status_code=400,
+                detail=f"'{chave}' aparece em mais de uma categoria ({opcoes}); informe o parâmetro categoria",
+            )
+        codigo = encontrados[0]
+        anos = np.array([t.ano for t in tabelas], dtype=np.int64)
+        linhas = grupos.codigos == codigo
+        posicoes = np.searchsorted(anos, grupos.anos[linhas])
+        totais = np.full(len(anos), np.nan)
+        totais[np.unique(posicoes)] = 0.0
+        np.add.at(totais, posicoes, grupos.valores[linhas])
+
+        variacao = np.diff(totais, prepend=np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            percentual = variacao / np.abs(np.roll(totais, 1)) * 100
+        pontos = []
+        for i, ano in enumerate(anos):
+            definido = not np.isnan(variacao[i])
+            pontos.append({
+                "ano": int(ano),
+                "valor": None if np.isnan(totais[i]) else _numero(totais[i]),
+                "variacao": _numero(variacao[i]) if definido else None,
+                "variacao_pct": round(float(percentual[i]), 2) if definido and np.isfinite(percentual[i]) else None,
+            })
+        return pontos
+
+    return await _agregar(nome, ano_inicio, ano_fim, coluna, ("serie", alvo, alvo_categoria), calcular)
+
+
+async def top(
+    nome: str, ano_inicio: int, ano_fim: int, n: int = 10, operacao: str = "soma", coluna: Optional[str] = None
+) -> Response:
+    """
+    As N chaves (ex.: países) com maior valor da operação no intervalo, em
+    ordem decrescente. O total e, nas tabelas hierárquicas, as categorias (que
+    somam os seus subitens) não entram no ranking.
+    """
+    if operacao not in OPERACOES:
+        raise HTTPException(status_code=400, detail=f"Operação inválida: {operacao}. Use uma de {list(OPERACOES)}")
+
+    def calcular(_, grupos: _Grupos) -> List[dict]:
+        import numpy as np
+
+        resultado, contagem = _reduzir(grupos, operacao)
+        # argpartition seleciona os N maiores sem ordenar todas as chaves
+        candidatos = np.array(
+            [
+                k for k in np.flatnonzero(contagem)
+                if not grupos.primeiro_nivel[k] and normalizar_chave(grupos.nomes[k]) != _CHAVE_TOTAL
+            ],
+            dtype=np.int64,
+        )
+        if len(candidatos) > n:
+            candidatos = candidatos[np.argpartition(-resultado[candidatos], n - 1)[:n]]
+        ordem = candidatos[np.argsort(-resultado[candidatos], kind="stable")]
+        return [{"chave": grupos.nomes[k], "categoria": grupos.categorias[k], "valor": _numero(resultado[k])} for k in ordem]
+
+    return await _agregar(nome, ano_inicio, ano_fim, coluna, ("top", operacao, n), calcular)
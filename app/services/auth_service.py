@@ -1,22 +1,34 @@
+import asyncio
+import logging
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from database import get_db
+from database import get_async_db
+from models.token_models import TokenData
+from services.cache_service import TTLCache
+from services.metrics import AUTH_BANCO, AUTH_JWT
+from services.revogacao import RevogacaoIndisponivel, revogacoes
 
 # Carrega variáveis do .env
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configurações de segurança (agora do .env)
 SECRET_KEY = os.getenv("SECRET_KEY") 
 ALGORITHM = os.getenv("ALGORITHM")
@@ -29,36 +41,131 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Configuração do esquema OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Modo de validação do usuário nas rotas autenticadas:
+#   database  - confere se o usuário existe no banco (resultado em cache por AUTH_PRINCIPAL_CACHE_TTL)
+#   stateless - confia nas claims do JWT assinado até expirar, checando apenas a lista de revogação
+AUTH_MODE = os.getenv("AUTH_MODE", "database")
+AUTH_PRINCIPAL_CACHE_TTL = int(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", "60"))
+
+# No modo stateless a remoção de um usuário só vale para todos os workers se a
+# lista de revogação for compartilhada (Redis); em memória, os demais workers
+# continuariam aceitando os tokens do usuário removido até expirarem
+if AUTH_MODE == "stateless" and not revogacoes.compartilhada:
+    raise RuntimeError(
+        "AUTH_MODE=stateless exige uma lista de revogação compartilhada: "
+        "configure CACHE_BACKEND_URL com a URL do Redis"
+    )
+
+# Cache local dos usuários já validados no banco (username -> linha do banco)
+principal_cache = TTLCache(max_entries=10000, max_bytes=0)
+
+
+def _revogacao_indisponivel() -> HTTPException:
+    # Usuários removidos têm os tokens recusados pela lista de revogação (services/revogacao.py);
+    # com ela fora do ar, a requisição é recusada em vez de aceitar um token possivelmente revogado
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service unavailable, try again later",
+        headers={"Retry-After": "5"},
+    )
+
+
+# Pool dedicado ao bcrypt: limita quantos hashes rodam ao mesmo tempo e
+# quantos podem ficar na fila antes de recusar novas requisições
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "4"))
+AUTH_HASH_MAX_QUEUE = int(os.getenv("AUTH_HASH_MAX_QUEUE", "64"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_lock = threading.Lock()
+_hash_stats = {"pending": 0, "running": 0, "completed": 0, "rejected": 0}
+
+
+def _executar_hash(func: Callable[..., Any], *args) -> Any:
+    # Roda na thread do pool e mantém o contador de hashes em execução
+    with _hash_lock:
+        _hash_stats["running"] += 1
+    try:
+        return func(*args)
+    finally:
+        with _hash_lock:
+            _hash_stats["running"] -= 1
+
+
+def _finalizar_hash(future) -> None:
+    # Chamado ao concluir (ou cancelar antes de iniciar) uma tarefa do pool
+    with _hash_lock:
+        _hash_stats["pending"] -= 1
+        if not future.cancelled():
+            _hash_stats["completed"] += 1
+
+
+async def _rodar_no_pool_hash(func: Callable[..., Any], *args) -> Any:
+    """
+    Executa uma operação do bcrypt no pool dedicado, sem bloquear o event loop.
+
+    Com a fila cheia, responde 503 na hora: uma rajada de logins degrada
+    apenas os endpoints de autenticação, e não a API inteira.
+    """
+    with _hash_lock:
+        if _hash_stats["pending"] >= AUTH_HASH_WORKERS + AUTH_HASH_MAX_QUEUE:
+            _hash_stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        _hash_stats["pending"] += 1
+
+    future = _hash_executor.submit(_executar_hash, func, *args)
+    future.add_done_callback(_finalizar_hash)
+    return await asyncio.wrap_future(future)
+
+
+def hash_pool_stats() -> Dict[str, int]:
+    """Ocupação do pool de hashing (queue_depth = aguardando uma thread livre)"""
+    with _hash_lock:
+        return {
+            "workers": AUTH_HASH_WORKERS,
+            "max_queue": AUTH_HASH_MAX_QUEUE,
+            "running": _hash_stats["running"],
+            "queue_depth": _hash_stats["pending"] - _hash_stats["running"],
+            "completed": _hash_stats["completed"],
+            "rejected": _hash_stats["rejected"],
+        }
+
+
+def shutdown_hash_pool() -> None:
+    """Encerra as threads do pool de hashing (chamado no encerramento da aplicação)"""
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
 # Função para verificar se a senha plain-text corresponde ao hash
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str):
+    return await _rodar_no_pool_hash(pwd_context.verify, plain_password, hashed_password)
 
 # Função para gerar hash de senha
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
+async def get_password_hash(password: str):
+    return await _rodar_no_pool_hash(pwd_context.hash, password)
 
 # Função para criar novo usuário no banco de dados
-def create_user(db: Session, username: str, password: str):
-    # Verifica se usuário já existe
-    query = text("SELECT username FROM usuarios WHERE username = :username")
-    existing_user = db.execute(query, {"username": username}).fetchone()
-    
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-    
+async def create_user(db: AsyncSession, username: str, password: str):
     # Cria hash da senha antes de armazenar
-    hashed_password = get_password_hash(password)
+    hashed_password = await get_password_hash(password)
     
-    # Insere novo usuário no banco
+    # Insere novo usuário no banco; o índice único de username recusa duplicados
+    # (um único comando, sem corrida entre verificar e inserir)
     insert_query = text("""
         INSERT INTO usuarios (username, password) 
         VALUES (:username, :password)
     """)
-    db.execute(insert_query, {"username": username, "password": hashed_password})
-    db.commit()
+    try:
+        await db.execute(insert_query, {"username": username, "password": hashed_password})
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already registered"
+        )
     
     return {"username": username, "message": "User created successfully"}
 
@@ -72,7 +179,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    # iat permite recusar tokens emitidos antes de o usuário ser removido
+    to_encode.update({"exp": expire, "iat": int(time.time())})
     # Gera token assinado
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
@@ -88,13 +196,13 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": int(time.time())})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
     return encoded_jwt
 
 # Função para obter usuário atual a partir do token
-async def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -104,37 +212,57 @@ async def get_current_user(db: Session = Depends(get_db), token: str = Depends(o
     
     try:
         # Decodifica token JWT
+        inicio = time.perf_counter()
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        AUTH_JWT.observe(time.perf_counter() - inicio)
         username: str = payload.get("sub")  # Obtém username do payload
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
+    # Modo stateless: a assinatura basta, desde que o usuário não tenha sido removido
+    if AUTH_MODE == "stateless":
+        try:
+            revogado_em = await revogacoes.revogado_em(username)
+        except RevogacaoIndisponivel:
+            raise _revogacao_indisponivel()
+        if revogado_em is not None and payload.get("iat", 0) <= revogado_em:
+            raise credentials_exception
+        return TokenData(username=username)
+
+    # Usuário validado recentemente: dispensa a consulta ao banco
+    user = principal_cache.get(username)
+    if user is not None:
+        return user
+
     # Verifica se usuário existe no banco
     query = text("SELECT username FROM usuarios WHERE username = :username")
-    user = db.execute(query, {"username": username}).fetchone()
+    inicio = time.perf_counter()
+    user = (await db.execute(query, {"username": username})).fetchone()
+    AUTH_BANCO.observe(time.perf_counter() - inicio)
     
     if user is None:
         raise credentials_exception
     
+    principal_cache.set(username, user, AUTH_PRINCIPAL_CACHE_TTL)
     return user
 
 # Função para autenticar usuário (verifica credenciais)
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
     query = text("SELECT username, password FROM usuarios WHERE username = :username")
-    result = db.execute(query, {"username": username}).fetchone()
+    result = (await db.execute(query, {"username": username})).fetchone()
     
     if not result:
         return False  # Usuário não encontrado
     
-    if not verify_password(password, result.password):
+    if not await verify_password(password, result.password):
         return False  # Senha incorreta
         
     return result  # Autenticação bem-sucedida
 
 # Função para renovar access token usando refresh token
-def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_access_token(refresh_token: str, db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate refresh token",
@@ -147,7 +275,7 @@ def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)):
             raise credentials_exception
         
         query = text("SELECT username FROM usuarios WHERE username = :username")
-        user = db.execute(query, {"username": username}).fetchone()
+        user = (await db.execute(query, {"username": username})).fetchone()
         if user is None:
             raise credentials_exception
             
@@ -173,22 +301,32 @@ def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)):
     }
 
 # Função para deletar usuário
-def delete_user(db: Session, id: int):
+async def delete_user(db: AsyncSession, id: int):
     # Primeiro verifica se o usuário existe
-    check_query = text("SELECT id FROM usuarios WHERE id = :id")
-    user_exists = db.execute(check_query, {"id": id}).fetchone()
+    check_query = text("SELECT id, username FROM usuarios WHERE id = :id")
+    user_exists = (await db.execute(check_query, {"id": id})).fetchone()
     
     if not user_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+
+    # A revogação é registrada antes da remoção: no modo stateless, se a lista
+    # estiver fora do ar, o usuário não é removido (seus tokens continuariam válidos).
+    # No modo database a lista não é consultada: a remoção do banco já basta
+    try:
+        await revogar_usuario(user_exists.username)
+    except RevogacaoIndisponivel:
+        if AUTH_MODE == "stateless":
+            raise _revogacao_indisponivel()
+        logger.warning("Lista de revogação indisponível ao remover %s; seguindo no modo database", user_exists.username)
     
     try:
         # Executa deleção
         delete_query = text("DELETE FROM usuarios WHERE id = :id")
-        result = db.execute(delete_query, {"id": id})
-        db.commit()
+        result = await db.execute(delete_query, {"id": id})
+        await db.commit()
         
         # Verifica se usuário foi realmente deletado
         if result.rowcount == 0:
@@ -201,8 +339,16 @@ def delete_user(db: Session, id: int):
     
     except Exception as e:
         # Em caso de erro, faz rollback e retorna erro 500
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting user: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+# Função para invalidar as credenciais de um usuário removido
+async def revogar_usuario(username: str):
+    # Remove do cache local e registra a revogação até expirar o token mais longo
+    # emitido até agora (o refresh token); depois disso os tokens antigos já terão expirado
+    principal_cache.delete(username)
+    agora = int(time.time())
+    await revogacoes.revogar(username, agora, agora + REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60)
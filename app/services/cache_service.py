@@ -0,0 +1,357 @@
+import json
+import logging
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .tabela import Tabela
+
+# Carrega variáveis do .env
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Backend do cache: vazio ou memory:// para cache em processo, redis://... para Redis
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "memory://")
+
+# Limites do cache compartilhado de tabelas (0 desativa o limite)
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# TTL padrão (em segundos) das tabelas em cache
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+
+# TTL (s) das tabelas de anos fechados, que a Embrapa não revisa mais
+# (anos fora de HTTP_CACHE_RECENT_YEARS); vale para todos os datasets
+CACHE_TTL_HISTORICAL = int(os.getenv("CACHE_TTL_HISTORICAL", str(30 * 24 * 60 * 60)))
+
+# Tempo (s) que uma tabela vencida ainda pode ser servida enquanto é revalidada
+CACHE_STALE_SECONDS = int(os.getenv("CACHE_STALE_SECONDS", str(7 * 24 * 60 * 60)))
+
+# TTL (s) do cache negativo de anos sem tabela na Embrapa
+CACHE_NEGATIVE_TTL = int(os.getenv("CACHE_NEGATIVE_TTL", "300"))
+
+
+def get_dataset_ttl(nome: str) -> int:
+    """
+    Retorna o TTL configurado para um dataset.
+
+    Pode ser sobrescrito por dataset com a variável CACHE_TTL_<NOME>,
+    ex: CACHE_TTL_PRODUCAO=3600.
+    """
+    return int(os.getenv(f"CACHE_TTL_{nome.upper()}", str(CACHE_TTL_SECONDS)))
+
+
+def estimar_tamanho(valor: Any) -> int:
+    """Estimativa (em bytes) da memória ocupada por um valor em cache"""
+    if isinstance(valor, Tabela):
+        return valor.tamanho_estimado()
+    tamanho = sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        for chave, item in valor.items():
+            tamanho += sys.getsizeof(chave) + estimar_tamanho(item)
+    elif isinstance(valor, (list, tuple)):
+        for item in valor:
+            tamanho += estimar_tamanho(item)
+    return tamanho
+
+
+class _Entrada:
+    __slots__ = ("valor", "expira_em", "tamanho")
+
+    def __init__(self, valor: Any, expira_em: float, tamanho: int):
+        self.valor = valor
+        self.expira_em = expira_em
+        self.tamanho = tamanho
+
+
+class TTLCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        """
+        Cache LRU em memória com expiração por entrada.
+
+        Args:
+            max_entries: Quantidade máxima de entradas (0 = sem limite)
+            max_bytes: Tamanho máximo estimado em bytes (0 = sem limite)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entradas: "OrderedDict[Hashable, _Entrada]" = OrderedDict()
+        self._bytes = 0
+
+        # Contadores para acompanhamento da taxa de acerto
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, chave: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache ou None se não existir ou estiver expirado"""
+        entrada = self._entradas.get(chave)
+        if entrada is None:
+            self.misses += 1
+            return None
+
+        if entrada.expira_em <= time.monotonic():
+            self._remover(chave)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        # Marca como usado recentemente
+        self._entradas.move_to_end(chave)
+        self.hits += 1
+        return entrada.valor
+
+    def set(self, chave: Hashable, valor: Any, ttl: int) -> None:
+        """Armazena um valor com tempo de vida em segundos"""
+        if chave in self._entradas:
+            self._remover(chave)
+
+        tamanho = estimar_tamanho(valor)
+        self._entradas[chave] = _Entrada(valor, time.monotonic() + ttl, tamanho)
+        self._bytes += tamanho
+        self._aplicar_limites()
+
+    def delete(self, chave: Hashable) -> bool:
+        """Remove uma entrada específica; retorna se ela existia"""
+        if chave not in self._entradas:
+            return False
+        self._remover(chave)
+        return True
+
+    def invalidate(self, filtro: Optional[Tuple[Any, ...]] = None) -> int:
+        """
+        Remove entradas do cache.
+
+        Args:
+            filtro: Prefixo da chave a remover (ex: (url_param,) remove todos os
+                anos de um dataset). Se None, limpa o cache inteiro.
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        if filtro is None:
+            removidas = len(self._entradas)
+            self._entradas.clear()
+            self._bytes = 0
+            return removidas
+
+        chaves = [c for c in self._entradas if c[:len(filtro)] == filtro]
+        for chave in chaves:
+            self._remover(chave)
+        return len(chaves)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna contadores e ocupação atual do cache"""
+        consultas = self.hits + self.misses
+        return {
+            "entries": len(self._entradas),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / consultas, 4) if consultas else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remover(self, chave: Hashable) -> None:
+        entrada = self._entradas.pop(chave)
+        self._bytes -= entrada.tamanho
+
+    def _aplicar_limites(self) -> None:
+        # Descarta as entradas menos usadas até respeitar os limites
+        while self._entradas and (
+            (self.max_entries and len(self._entradas) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            chave, entrada = self._entradas.popitem(last=False)
+            self._bytes -= entrada.tamanho
+            self.evictions += 1
+
+
+def _codificar_json(valor: Any) -> Any:
+    # Tabelas vão para backends distribuídos na forma serializável, marcadas
+    # para serem reconstruídas na leitura
+    if isinstance(valor, Tabela):
+        return {"__tabela__": valor.to_dict()}
+    raise TypeError(f"Valor não serializável no cache: {type(valor).__name__}")
+
+
+def _decodificar_json(objeto: Dict[str, Any]) -> Any:
+    if "__tabela__" in objeto:
+        return Tabela.from_dict(objeto["__tabela__"])
+    return objeto
+
+
+class CacheBackend(ABC):
+    """
+    Interface dos backends de cache usados pelo ScrapingService.
+
+    As chaves são tuplas (url_param, ano) e os valores precisam ser
+    serializáveis em JSON (ou instâncias de Tabela) para funcionar com
+    backends distribuídos.
+    """
+
+    name = "abstract"
+
+    @abstractmethod
+    async def get(self, chave: Tuple[str, int]) -> Optional[Any]:
+        """Retorna o valor em cache ou None"""
+
+    @abstractmethod
+    async def set(self, chave: Tuple[str, int], valor: Any, ttl: int) -> None:
+        """Armazena um valor com tempo de vida em segundos"""
+
+    @abstractmethod
+    async def invalidate(self, filtro: Optional[Tuple[Any, ...]] = None) -> int:
+        """Remove entradas pelo prefixo da chave (ou todas) e retorna quantas"""
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        """Retorna contadores e ocupação do cache"""
+
+    async def close(self) -> None:
+        """Libera recursos do backend (conexões, etc.)"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Cache em processo: cada worker mantém sua própria cópia das tabelas"""
+
+    name = "memory"
+
+    def __init__(self, cache: Optional[TTLCache] = None):
+        self.cache = cache if cache is not None else TTLCache()
+
+    async def get(self, chave: Tuple[str, int]) -> Optional[Any]:
+        return self.cache.get(chave)
+
+    async def set(self, chave: Tuple[str, int], valor: Any, ttl: int) -> None:
+        self.cache.set(chave, valor, ttl)
+
+    async def invalidate(self, filtro: Optional[Tuple[Any, ...]] = None) -> int:
+        return self.cache.invalidate(filtro)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.cache.stats()}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache distribuído no Redis: as tabelas são compartilhadas entre todos os
+    workers e instâncias, então cada ano é buscado na Embrapa uma vez por cluster.
+
+    A expiração fica a cargo do TTL do Redis e o descarte por memória, da
+    política maxmemory configurada no servidor.
+    """
+
+    name = "redis"
+    PREFIXO = "embrapa:scrape"
+
+    def __init__(self, url: str = CACHE_BACKEND_URL, client: Any = None, prefixo: Optional[str] = None):
+        """
+        Args:
+            url: URL de conexão (ex: redis://localhost:6379/0)
+            client: Cliente redis.asyncio já criado (ex: fakeredis nos testes)
+            prefixo: Prefixo das chaves no Redis (padrão: PREFIXO)
+        """
+        self.prefixo = prefixo or self.PREFIXO
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.client = client
+
+        # Contadores locais deste processo
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _chave(self, chave: Tuple[Any, ...]) -> str:
+        return ":".join([self.prefixo, *(str(parte) for parte in chave)])
+
+    async def get(self, chave: Tuple[str, int]) -> Optional[Any]:
+        try:
+            bruto = await self.client.get(self._chave(chave))
+        except Exception as e:
+            # Redis indisponível não deve derrubar a API: trata como cache miss
+            self.errors += 1
+            logger.warning("Falha ao ler do cache Redis: %s", e)
+            bruto = None
+
+        if bruto is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(bruto, object_hook=_decodificar_json)
+
+    async def set(self, chave: Tuple[str, int], valor: Any, ttl: int) -> None:
+        try:
+            await self.client.set(self._chave(chave), json.dumps(valor, default=_codificar_json), ex=ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Falha ao gravar no cache Redis: %s", e)
+
+    async def invalidate(self, filtro: Optional[Tuple[Any, ...]] = None) -> int:
+        if filtro is not None and len(filtro) == 2:
+            return await self.client.delete(self._chave(filtro))
+
+        # Remove por padrão de chave usando SCAN (não bloqueia o servidor como KEYS)
+        padrao = self._escapar(self._chave(filtro or ())) + ":*"
+        removidas = 0
+        lote = []
+        async for chave in self.client.scan_iter(match=padrao, count=500):
+            lote.append(chave)
+            if len(lote) >= 500:
+                removidas += await self.client.delete(*lote)
+                lote = []
+        if lote:
+            removidas += await self.client.delete(*lote)
+        return removidas
+
+    async def stats(self) -> Dict[str, Any]:
+        consultas = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / consultas, 4) if consultas else 0.0,
+            "errors": self.errors,
+        }
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    @staticmethod
+    def _escapar(valor: str) -> str:
+        # Escapa os caracteres especiais do padrão glob usado pelo SCAN
+        for caractere in "\\*?[]":
+            valor = valor.replace(caractere, "\\" + caractere)
+        return valor
+
+
+def create_cache_backend(url: str = CACHE_BACKEND_URL, prefixo: Optional[str] = None) -> CacheBackend:
+    """
+    Cria o backend de cache a partir da URL configurada.
+
+    Args:
+        url: memory:// ou URL do Redis
+        prefixo: Prefixo das chaves no Redis, para separar usos do mesmo servidor
+    """
+    if not url or url.startswith("memory://"):
+        return MemoryCacheBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url, prefixo=prefixo)
+    raise ValueError(f"CACHE_BACKEND_URL não suportada: {url}")
+
+
+# Cache compartilhado por todas as instâncias de ScrapingService,
+# com chave (url_param, ano)
+scraping_cache = create_cache_backend()
@@ -0,0 +1,94 @@
+import os
+import time
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# Falhas consecutivas que abrem o circuito e tempo (s) até tentar novamente
+UPSTREAM_FAILURE_THRESHOLD = int(os.getenv("UPSTREAM_FAILURE_THRESHOLD", "5"))
+UPSTREAM_RESET_TIMEOUT = float(os.getenv("UPSTREAM_RESET_TIMEOUT", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = UPSTREAM_FAILURE_THRESHOLD, reset_timeout: float = UPSTREAM_RESET_TIMEOUT):
+        """
+        Circuit breaker para chamadas a um serviço externo.
+
+        Após failure_threshold falhas consecutivas o circuito abre e as chamadas
+        são recusadas imediatamente. Passado reset_timeout, uma única chamada de
+        teste é liberada (half-open): se der certo o circuito fecha, se falhar
+        volta a abrir.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+
+        # Contadores para acompanhamento
+        self.rejected = 0
+        self.opened = 0
+
+    def allow_request(self) -> bool:
+        """Indica se uma chamada ao serviço externo pode ser feita agora"""
+        if self.state == OPEN and time.monotonic() - self._aberto_em >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self._teste_em_andamento = False
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._teste_em_andamento:
+            self._teste_em_andamento = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def release_probe(self) -> None:
+        """
+        Encerra a chamada de teste sem resultado (ex: cancelada ou com um erro
+        que não é do serviço externo), liberando uma nova chamada de teste.
+
+        Deve ser chamado num finally por quem recebeu a chamada de teste; sem
+        isso o circuito ficaria em half-open recusando todas as chamadas.
+        """
+        if self.state == HALF_OPEN:
+            self._teste_em_andamento = False
+
+    def is_open(self) -> bool:
+        """Indica se o circuito está aberto (sem consumir a chamada de teste)"""
+        return self.state == OPEN and time.monotonic() - self._aberto_em < self.reset_timeout
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._teste_em_andamento = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.opened += 1
+            self.state = OPEN
+            self._aberto_em = time.monotonic()
+            self._teste_em_andamento = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+# Circuito compartilhado para o site VitiBrasil (todos os datasets usam o mesmo host)
+embrapa_breaker = CircuitBreaker()
@@ -1,4 +1,4 @@
 from .scraping_service import ScrapingService
 
 # Instanciando a classe Scraping
-comercializacao_service = ScrapingService(url_param='opcao=opt_04')
+comercializacao_service = ScrapingService(url_param='opcao=opt_04', nome='comercializacao')
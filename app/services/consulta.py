@@ -0,0 +1,136 @@
+import base64
+import binascii
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+
+from .tabela import Tabela, normalizar_chave
+
+# Maior página aceita no parâmetro limite
+LIMITE_MAXIMO = 10000
+
+
+def codificar_cursor(ano: int, posicao: int) -> str:
+    """Cursor opaco de paginação: ano e posição (entre as linhas filtradas) da próxima linha"""
+    return base64.urlsafe_b64encode(f"{ano}:{posicao}".encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ano, posicao = (int(parte) for parte in texto.split(":"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if posicao < 0:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return ano, posicao
+
+
+class Consulta:
+    """
+    Filtro, projeção e paginação pedidos numa rota de dados.
+
+    chaves: valores da coluna chave (produto, cultivar ou país) a manter,
+        comparados sem acentos e sem diferenciar maiúsculas
+    colunas: colunas a manter (a coluna 'ano' sempre vai na resposta)
+    limite: linhas por página; com ele a resposta traz X-Next-Cursor
+    cursor: posição de início devolvida em X-Next-Cursor pela página anterior
+    """
+
+    __slots__ = ("chaves", "colunas", "limite", "cursor")
+
+    def __init__(
+        self,
+        chaves: Optional[Sequence[str]] = None,
+        colunas: Optional[Sequence[str]] = None,
+        limite: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
+        self.chaves = [c for c in chaves or () if c.strip()] or None
+        colunas = [normalizar_chave(c) for c in colunas or () if c.strip()]
+        self.colunas = [c for c in colunas if c != "ano"] if colunas else None
+        if colunas and not self.colunas:
+            raise HTTPException(status_code=400, detail="Informe ao menos uma coluna além de 'ano'")
+        self.limite = limite
+        self.cursor = decodificar_cursor(cursor) if cursor else None
+        if self.cursor is not None and limite is None:
+            raise HTTPException(status_code=400, detail="O parâmetro cursor exige limite")
+
+    @property
+    def vazia(self) -> bool:
+        """True quando nada foi pedido: a resposta é a tabela completa, já serializada em cache"""
+        return self.chaves is None and self.colunas is None and self.limite is None
+
+    @property
+    def paginada(self) -> bool:
+        return self.limite is not None
+
+    def selecionar(self, tabela: Tabela) -> Tabela:
+        """Aplica o filtro pela coluna chave (via índice da tabela) e a projeção de colunas"""
+        if self.chaves is None and self.colunas is None:
+            return tabela
+        linhas = tabela.buscar(self.chaves) if self.chaves is not None else None
+        colunas = None
+        if self.colunas is not None:
+            pedidas = set(self.colunas)
+            colunas = [j for j, header in enumerate(tabela.headers) if normalizar_chave(header) in pedidas]
+        return tabela.selecionar(linhas, colunas)
+
+    def validar_colunas(self, tabelas: Sequence[Tabela]) -> None:
+        """400 se nenhuma das colunas pedidas existe nas tabelas consultadas"""
+        if self.colunas is None or not tabelas:
+            return
+        existentes = {normalizar_chave(h) for tabela in tabelas for h in tabela.headers}
+        if existentes.isdisjoint(self.colunas):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Colunas inexistentes. Disponíveis: {', '.join(tabelas[0].headers)}",
+            )
+
+    def aplicar(self, tabelas: Sequence[Tabela]) -> Tuple[List[Tabela], Optional[str]]:
+        """
+        Aplica a consulta às tabelas (em ordem de ano).
+
+        Retorna as tabelas resultantes e o cursor da próxima página (None na
+        última página ou sem paginação).
+        """
+        self.validar_colunas(tabelas)
+        if not self.paginada:
+            return [self.selecionar(tabela) for tabela in tabelas], None
+
+        ano_cursor, inicio = self.cursor or (None, 0)
+        restante = self.limite
+        pagina: List[Tabela] = []
+        for tabela in tabelas:
+            if ano_cursor is not None and tabela.ano < ano_cursor:
+                continue
+            selecionada = self.selecionar(tabela)
+            posicao = inicio if tabela.ano == ano_cursor else 0
+            if posicao >= len(selecionada):
+                continue
+            if restante == 0:
+                return pagina, codificar_cursor(tabela.ano, posicao)
+            fim = min(posicao + restante, len(selecionada))
+            pagina.append(selecionada.selecionar(range(posicao, fim)))
+            restante -= fim - posicao
+            if fim < len(selecionada):
+                return pagina, codificar_cursor(tabela.ano, fim)
+        return pagina, None
+
+
+def parametros_consulta(
+    chave: Optional[List[str]] = Query(
+        None,
+        description="Filtra pela primeira coluna (produto, cultivar ou país), sem diferenciar "
+                    "maiúsculas e acentos. Pode ser repetido",
+    ),
+    colunas: Optional[str] = Query(
+        None, description="Colunas da resposta, separadas por vírgula (a coluna 'ano' sempre é incluída)"
+    ),
+    limite: Optional[int] = Query(
+        None, ge=1, le=LIMITE_MAXIMO, description="Linhas por página; a próxima página vem no cabeçalho X-Next-Cursor"
+    ),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+) -> Consulta:
+    """Dependência das rotas de dados: monta a Consulta a partir dos parâmetros da URL"""
+    return Consulta(chave, colunas.split(",") if colunas else None, limite, cursor)
@@ -0,0 +1,24 @@
+from typing import Dict
+
+from .scraping_service import ScrapingService
+from . import (
+    producao_service,
+    processamento_service,
+    comercializacao_service,
+    importacao_service,
+    exportacao_service,
+)
+
+# Todos os serviços de scraping da API, indexados pelo nome do dataset
+DATASETS: Dict[str, ScrapingService] = {
+    service.nome: service
+    for modulo in (
+        producao_service,
+        processamento_service,
+        comercializacao_service,
+        importacao_service,
+        exportacao_service,
+    )
+    for service in vars(modulo).values()
+    if isinstance(service, ScrapingService)
+}
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import io
+import os
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Response
+
+from .cache_service import TTLCache
+from .datasets import DATASETS
+from .http_cache import cache_headers_anos
+from .json_response import etag_tabelas
+from .tabela import TIPO_FLOAT, TIPO_INT, Tabela
+
+# pyarrow (e numpy) são importados na primeira exportação (ver _pyarrow): a
+# importação é lenta e não deve pesar no início da aplicação
+pa = pq = None
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# Primeiro ano disponível no VitiBrasil
+ANO_INICIAL = 1970
+
+# Formatos de exportação: extensão do arquivo e media type
+FORMATOS_EXPORTACAO = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrows", "application/vnd.apache.arrow.stream"),
+}
+
+# Compressão dos arquivos gerados (zstd: arquivos pequenos e leitura rápida)
+EXPORT_COMPRESSION = os.getenv("EXPORT_COMPRESSION", "zstd")
+
+# Arquivos já gerados ficam em memória, validados pelo ETag das tabelas de origem
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EXPORT_CACHE_TTL = int(os.getenv("EXPORT_CACHE_TTL", str(60 * 60)))
+
+# Maior quantidade de anos numa exportação (cada ano fora do cache é uma busca na Embrapa por dataset)
+EXPORT_MAX_ANOS = int(os.getenv("EXPORT_MAX_ANOS", "60"))
+export_cache = TTLCache(max_entries=128, max_bytes=EXPORT_CACHE_MAX_BYTES)
+
+# Tipo Arrow de cada tipo de coluna da normalização
+_TIPOS_ARROW = {TIPO_INT: "int64", TIPO_FLOAT: "float64"}
+
+
+def _pyarrow():
+    """Importa o pyarrow no primeiro uso; None se ele não estiver instalado (é opcional: a exportação responde 501)"""
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            return None
+        pa, pq = pyarrow, pyarrow.parquet
+    return pa
+
+
+def _coluna_arrow(tabela: Tabela, j: int):
+    import numpy as np
+
+    coluna, nulos = tabela.colunas[j], tabela.nulos[j]
+    tipo = _TIPOS_ARROW.get(tabela.tipos[j])
+    if tipo is None:
+        return pa.array(coluna, type=pa.string())
+
+    # Colunas numéricas: o array tipado é lido direto, sem criar objetos Python
+    valores = np.frombuffer(coluna, dtype=np.int64 if tipo == "int64" else np.float64)
+    mascara = None
+    if nulos is not None:
+        mascara = np.zeros(len(valores), dtype=bool)
+        mascara[np.frombuffer(nulos, dtype=np.uint32)] = True
+    return pa.array(valores, mask=mascara)
+
+
+def tabela_arrow(tabela: Tabela, dataset: Optional[str] = None) -> "pa.Table":
+    """Converte uma Tabela em tabela Arrow (colunas ano, cabeçalhos e, opcionalmente, dataset)"""
+    import numpy as np
+
+    _pyarrow()
+    colunas = {"ano": pa.array(np.full(len(tabela), tabela.ano, dtype=np.int16))}
+    if dataset is not None:
+        colunas = {"dataset": pa.array([dataset] * len(tabela), type=pa.string()), **colunas}
+    for j, header in enumerate(tabela.headers):
+        colunas[header] = _coluna_arrow(tabela, j)
+    return pa.table(colunas)
+
+
+def _tipo_comum(tipos: Set["pa.DataType"]) -> "pa.DataType":
+    # Texto com qualquer outro tipo vira texto; inteiro com decimal vira decimal
+    if any(pa.types.is_string(tipo) for tipo in tipos):
+        return pa.string()
+    if any(pa.types.is_floating(tipo) for tipo in tipos):
+        return pa.float64()
+    return pa.int64()
+
+
+def _unificar_tipos(tabelas: List["pa.Table"]) -> List["pa.Table"]:
+    """
+    Converte as colunas de mesmo nome que têm tipos diferentes entre as
+    tabelas (ex: numérica num ano e texto em outro) para um tipo comum.
+
+    O concat_tables permissivo une colunas ausentes e promove inteiros, mas
+    falha ao juntar número com texto.
+    """
+    tipos: Dict[str, Set["pa.DataType"]] = {}
+    for tabela in tabelas:
+        for campo in tabela.schema:
+            if not pa.types.is_null(campo.type):
+                tipos.setdefault(campo.name, set()).add(campo.type)
+    destino = {nome: _tipo_comum(encontrados) for nome, encontrados in tipos.items() if len(encontrados) > 1}
+    if not destino:
+        return tabelas
+
+    unificadas = []
+    for tabela in tabelas:
+        for j, campo in enumerate(tabela.schema):
+            tipo = destino.get(campo.name)
+            if tipo is not None and campo.type != tipo:
+                tabela = tabela.set_column(j, pa.field(campo.name, tipo), tabela.column(j).cast(tipo))
+        unificadas.append(tabela)
+    return unificadas
+
+
+def _serializar(tabelas: List["pa.Table"], formato: str) -> bytes:
+    _pyarrow()
+    # Tabelas com colunas diferentes (anos ou datasets distintos) são unidas,
+    # com nulos nas colunas ausentes e tipos unificados quando divergem
+    tabela = pa.concat_tables(_unificar_tipos(tabelas), promote_options="permissive") if tabelas else pa.table({})
+    buffer = io.BytesIO()
+    if formato == "parquet":
+        pq.write_table(tabela, buffer, compression=EXPORT_COMPRESSION)
+    else:
+        opcoes = pa.ipc.IpcWriteOptions(compression=EXPORT_COMPRESSION)
+        with pa.ipc.new_stream(buffer, tabela.schema, options=opcoes) as escritor:
+            escritor.write_table(tabela)
+    return buffer.getvalue()
+
+
+def _validar_formato(formato: str) -> None:
+    if _pyarrow() is None:
+        raise HTTPException(status_code=501, detail="Exportação indisponível: pyarrow não está instalado")
+    if formato not in FORMATOS_EXPORTACAO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato inválido: {formato}. Use um de {sorted(FORMATOS_EXPORTACAO)}"
+        )
+
+
+async def _exportar(
+    nome_arquivo: str,
+    partes: Sequence[Tuple[Optional[str], List[Tabela]]],
+    formato: str,
+    anos: range,
+) -> Response:
+    tabelas = [tabela for _, lista in partes for tabela in lista]
+    etag = etag_tabelas(tabelas) if tabelas else '"vazio"'
+    # O ETag também identifica o formato e os datasets incluídos
+    etag = '"' + hashlib.blake2b(f"{nome_arquivo}:{formato}:{etag}".encode(), digest_size=16).hexdigest() + '"'
+
+    conteudo = export_cache.get(etag)
+    if conteudo is None:
+        # Montagem e compressão usam CPU: rodam numa thread, fora do event loop
+        def gerar() -> bytes:
+            return _serializar([tabela_arrow(t, dataset) for dataset, lista in partes for t in lista], formato)
+
+        conteudo = await asyncio.to_thread(gerar)
+        export_cache.set(etag, conteudo, EXPORT_CACHE_TTL)
+
+    extensao, media_type = FORMATOS_EXPORTACAO[formato]
+    return Response(
+        content=conteudo,
+        media_type=media_type,
+        headers={
+            "ETag": etag,
+            "Content-Disposition": f'attachment; filename="{nome_arquivo}.{extensao}"',
+            **cache_headers_anos(anos),
+        },
+    )
+
+
+def _intervalo(ano_inicio: Optional[int], ano_fim: Optional[int]) -> range:
+    # O ano atual é lido a cada requisição (não na importação), para que um
+    # processo de longa duração aceite o novo ano a partir de 1º de janeiro
+    ano_atual = date.today().year
+    for nome, ano in (("inicial", ano_inicio), ("final", ano_fim)):
+        if ano is not None and ano > ano_atual:
+            raise HTTPException(status_code=400, detail=f"Ano {nome} deve ser no máximo {ano_atual}")
+    fim = ano_fim or ano_atual
+    # Sem ano_inicio, exporta os últimos EXPORT_MAX_ANOS anos (a partir de 1970),
+    # para que a chamada sem parâmetros continue válida com o passar dos anos
+    inicio = ano_inicio or max(ANO_INICIAL, fim - EXPORT_MAX_ANOS + 1)
+    anos = range(inicio, fim + 1)
+    if not anos:
+        raise HTTPException(status_code=400, detail="Ano inicial deve ser menor ou igual ao ano final")
+    if len(anos) > EXPORT_MAX_ANOS:
+        raise HTTPException(status_code=400, detail=f"O intervalo deve ter no máximo {EXPORT_MAX_ANOS} anos")
+    return anos
+
+
+async def exportar_dataset(
+    nome: str, formato: str, ano_inicio: Optional[int] = None, ano_fim: Optional[int] = None
+) -> Response:
+    """
+    Exporta todos os anos de um dataset em Parquet ou Arrow IPC, a partir das
+    tabelas em cache. Anos sem tabela na Embrapa são omitidos.
+    """
+    _validar_formato(formato)
+    service = DATASETS.get(nome)
+    if service is None:
+        raise HTTPException(status_code=404, detail=f"Dataset '{nome}' não encontrado")
+
+    anos = _intervalo(ano_inicio, ano_fim)
+    tabelas = await service.get_tabela_range(anos.start, anos.stop - 1, ignorar_ausentes=True)
+    return await _exportar(nome, [(None, tabelas)], formato, anos)
+
+
+async def exportar_todos(formato: str, ano_inicio: Optional[int] = None, ano_fim: Optional[int] = None) -> Response:
+    """
+    Exporta todos os datasets num único arquivo, com a coluna 'dataset'
+    identificando a origem de cada linha.
+    """
+    _validar_formato(formato)
+    anos = _intervalo(ano_inicio, ano_fim)
+    partes: Dict[str, List[Tabela]] = {}
+    for nome, service in DATASETS.items():
+        partes[nome] = await service.get_tabela_range(anos.start, anos.stop - 1, ignorar_ausentes=True)
+    return await _exportar("vitibrasil", list(partes.items()), formato, anos)
@@ -0,0 +1,319 @@
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .tabela import TIPO_FLOAT, TIPO_INT, TIPO_STR
+
+# Carrega variáveis do .env
+load_dotenv()
+
+try:
+    import lxml.html
+except ImportError:  # lxml é opcional: sem ele, usa o modo "strainer"
+    lxml = None
+
+# Modos de extração da tabela de dados:
+#   full     - BeautifulSoup monta a árvore da página inteira (comportamento original)
+#   strainer - BeautifulSoup monta apenas a árvore da tabela de dados (SoupStrainer)
+#   lxml     - lxml localiza a tabela via XPath, sem montar árvore do BeautifulSoup
+PARSER_MODES = ("full", "strainer", "lxml")
+SCRAPING_PARSER = os.getenv("SCRAPING_PARSER", "lxml" if lxml is not None else "strainer")
+
+# Classe da tabela de dados nas páginas do VitiBrasil
+TABELA_CLASSE = "tb_base tb_dados"
+
+# Classes das células de categoria e de subitem nas tabelas hierárquicas
+CLASSE_ITEM = "tb_item"
+CLASSE_SUBITEM = "tb_subitem"
+
+# bs4 e numpy são importados no primeiro parsing (ou por precarregar), não na
+# importação do módulo: juntos custam ~0,2 s, que atrasariam o início de cada worker
+
+
+def precarregar() -> None:
+    """Importa as dependências do parsing; chamado numa thread logo após o início, antes da primeira consulta"""
+    import numpy  # noqa: F401
+    from bs4 import BeautifulSoup  # noqa: F401
+
+
+@lru_cache(maxsize=None)
+def _tabela_strainer():
+    from bs4 import SoupStrainer
+
+    return SoupStrainer("table", attrs={"class": TABELA_CLASSE})
+
+
+class TabelaAusente(Exception):
+    """A página não contém a tabela de dados"""
+
+
+# Marcadores usados pelo VitiBrasil para células sem valor ("-", "nd", "*")
+MARCADORES_AUSENTES = frozenset({"-", "nd", "ND", "*", ""})
+
+# Coluna numérica: cada célula é um número no formato brasileiro (-1.234,56)
+# ou um marcador de ausência, uma por linha
+_CELULA = r"(?:-?\d[\d.]*(?:,\d+)?|-|nd|ND|\*|)"
+_COLUNA_NUMERICA = re.compile(rf"{_CELULA}(?:\n{_CELULA})*")
+
+
+def _normalizar_coluna(celulas: List[str]) -> Tuple[str, list]:
+    """
+    Converte uma coluna inteira de textos para o tipo apropriado.
+
+    Regras:
+      - a coluna é numérica se todas as células forem números no formato
+        brasileiro (1.234,56, inclusive negativos) ou marcadores de ausência;
+      - numérica com alguma vírgula decimal vira float; sem vírgula, int;
+      - marcadores de ausência em colunas numéricas viram None; uma coluna só
+        de marcadores (ex: ano sem dados) é int com todos os valores None;
+      - inteiros fora do int64 mantêm a coluna como texto, em vez de saturar;
+      - células com quebra de linha no texto mantêm a coluna como texto;
+      - qualquer outra coluna é texto e mantém os valores originais.
+    """
+    texto = "\n".join(celulas)
+    # Uma célula com quebra de linha no próprio texto (ex: "1\n2") passaria na
+    # regex e viraria duas células no split abaixo, desalinhando a coluna
+    if not celulas or texto.count("\n") != len(celulas) - 1 or not _COLUNA_NUMERICA.fullmatch(texto):
+        return TIPO_STR, celulas
+    if all(c in MARCADORES_AUSENTES for c in celulas):
+        return TIPO_INT, [None] * len(celulas)
+
+    import numpy as np
+
+    tipo = TIPO_FLOAT if "," in texto else TIPO_INT
+    # Remove pontos de milhar e troca vírgula decimal por ponto de uma só vez
+    limpas = texto.replace(".", "").replace(",", ".").split("\n")
+
+    ausentes = [i for i, c in enumerate(limpas) if c in MARCADORES_AUSENTES]
+    for i in ausentes:
+        limpas[i] = "0"
+
+    # Conversão da coluna inteira em C pelo numpy (células já validadas pela regex)
+    try:
+        valores = np.array(limpas, dtype=np.float64 if tipo == TIPO_FLOAT else np.int64)
+    except OverflowError:
+        return TIPO_STR, celulas
+    if tipo == TIPO_FLOAT and not np.isfinite(valores).all():
+        return TIPO_STR, celulas
+
+    valores = valores.tolist()
+    assert len(valores) == len(celulas)
+    for i in ausentes:
+        valores[i] = None
+    return tipo, valores
+
+
+def normalizar_colunas(
+    headers: List[str], linhas: List[List[str]]
+) -> Tuple[List[str], List[str], List[list], Optional[List[int]]]:
+    """
+    Converte as linhas de texto da tabela em colunas tipadas.
+
+    Returns:
+        Cabeçalhos (estendidos com 'coluna_<i>' para colunas sem cabeçalho),
+        tipo de cada coluna (int, float ou str), os valores por coluna e a
+        quantidade de células de cada linha (None se nenhuma linha é mais curta).
+        Células faltantes em linhas mais curtas viram None nas colunas e ficam
+        fora dos registros, como no formato original.
+    """
+    # Se ainda não tiver cabeçalhos, usa padrão
+    if not headers:
+        headers = ['Produto', 'Valor']  # padrão mínimo
+
+    larguras = [len(cols) for cols in linhas]
+    largura = max(larguras, default=0)
+    headers = list(headers) + [f'coluna_{i}' for i in range(len(headers), largura)]
+    if all(w == len(headers) for w in larguras):
+        larguras = None
+
+    tipos, colunas = [], []
+    for j in range(len(headers)):
+        celulas = [cols[j].strip() if j < len(cols) else None for cols in linhas]
+        faltantes = [i for i, c in enumerate(celulas) if c is None]
+        for i in faltantes:
+            celulas[i] = ""
+        tipo, valores = _normalizar_coluna(celulas)
+        if faltantes:
+            valores = list(valores)
+            for i in faltantes:
+                valores[i] = None
+        tipos.append(tipo)
+        colunas.append(valores)
+    return headers, tipos, colunas, larguras
+
+
+def hierarquia_linhas(classes: List[str]) -> Optional[List[int]]:
+    """
+    Categoria de cada linha nas tabelas hierárquicas (produção, processamento
+    e comercialização), em que as categorias (tb_item, ex: VINHO DE MESA) são
+    seguidas dos seus subitens (tb_subitem, ex: Tinto).
+
+    Returns:
+        Para cada linha, a posição da linha da sua categoria, ou -1 nas linhas
+        de primeiro nível (categorias e total); None se a tabela não tem subitens
+    """
+    if CLASSE_SUBITEM not in classes:
+        return None
+    hierarquia, categoria = [], -1
+    for i, classe in enumerate(classes):
+        if classe == CLASSE_SUBITEM and categoria >= 0:
+            hierarquia.append(categoria)
+        else:
+            hierarquia.append(-1)
+            categoria = i if classe == CLASSE_ITEM else -1
+    return hierarquia
+
+
+def montar_registros(
+    ano: int, headers: List[str], colunas: List[list], larguras: Optional[List[int]] = None
+) -> List[Dict[str, Any]]:
+    """Converte colunas em registros (um por linha) com o ano e os cabeçalhos"""
+    # Cada coluna é mapeada para seu cabeçalho correspondente; sempre inclui o ano
+    if larguras is None:
+        return [{'ano': ano, **dict(zip(headers, linha))} for linha in zip(*colunas)]
+    # Linhas mais curtas só têm as chaves das células presentes
+    return [{'ano': ano, **dict(zip(headers[:w], linha))} for w, linha in zip(larguras, zip(*colunas))]
+
+
+def _extrair_bs4(table) -> tuple:
+    """Extrai cabeçalhos, células e a classe da primeira célula de cada linha de uma tabela do BeautifulSoup"""
+    # Encontra os cabeçalhos da tabela
+    headers = []
+    thead = table.find('thead')
+    if thead:
+        header_row = thead.find('tr')
+        if header_row:
+            headers = [th.get_text(strip=True) for th in header_row.find_all('th')]
+
+    # Se não encontrar no thead, tenta pegar a primeira linha do tbody
+    if not headers:
+        first_row = table.find('tr')
+        if first_row:
+            headers = [th.get_text(strip=True) for th in first_row.find_all('td')]
+
+    rows = table.find_all('tr')
+
+    # Se pegou cabeçalhos na primeira linha, começa da segunda
+    start_idx = 1 if not thead and len(rows) > 1 else 0
+
+    linhas, classes = [], []
+    for row in rows[start_idx:]:
+        cols = row.find_all('td')
+        if cols:
+            linhas.append([col.get_text(strip=True) for col in cols])
+            classes.append(' '.join(cols[0].get('class') or ()))
+    return headers, linhas, classes
+
+
+def _texto_lxml(elemento) -> str:
+    # Equivalente ao get_text(strip=True) do BeautifulSoup
+    return ''.join(parte.strip() for parte in elemento.itertext())
+
+
+def _extrair_lxml(table) -> tuple:
+    """Extrai cabeçalhos, células e classes de uma tabela do lxml (mesmas regras do _extrair_bs4)"""
+    headers = []
+    thead = table.find('.//thead')
+    if thead is not None:
+        header_row = thead.find('.//tr')
+        if header_row is not None:
+            headers = [_texto_lxml(th) for th in header_row.iterfind('.//th')]
+
+    if not headers:
+        first_row = table.find('.//tr')
+        if first_row is not None:
+            headers = [_texto_lxml(td) for td in first_row.iterfind('.//td')]
+
+    rows = table.findall('.//tr')
+    start_idx = 1 if thead is None and len(rows) > 1 else 0
+
+    linhas, classes = [], []
+    for row in rows[start_idx:]:
+        cols = row.findall('.//td')
+        if cols:
+            linhas.append([_texto_lxml(col) for col in cols])
+            classes.append(cols[0].get('class') or '')
+    return headers, linhas, classes
+
+
+def _localizar_tabela_lxml(content: bytes):
+    from bs4.dammit import UnicodeDammit
+
+    # Decodifica como o BeautifulSoup faria, para obter exatamente os mesmos textos
+    markup = UnicodeDammit(content, is_html=True).unicode_markup
+    if not markup.strip():
+        return None
+    documento = lxml.html.document_fromstring(markup)
+    tabelas = documento.xpath('//table[@class=$classe]', classe=TABELA_CLASSE)
+    return tabelas[0] if tabelas else None
+
+
+def extrair_colunas(
+    content: bytes, modo: Optional[str] = None, duracoes: Optional[Dict[str, float]] = None
+) -> Tuple[List[str], List[str], List[list], Optional[List[int]], Optional[List[int]]]:
+    """
+    Extrai a tabela de dados do HTML de uma página do VitiBrasil em colunas tipadas.
+
+    Função de módulo (sem estado) para poder rodar num pool de processos.
+
+    Args:
+        content: HTML da página
+        modo: Um dos PARSER_MODES (padrão: SCRAPING_PARSER)
+        duracoes: Se informado, recebe a duração (s) das etapas "parse" e "normalizacao"
+
+    Returns:
+        Cabeçalhos, tipos e valores de cada coluna, a categoria de cada linha
+        (ver hierarquia_linhas) e a quantidade de células de cada linha (ver
+        normalizar_colunas)
+
+    Raises:
+        TabelaAusente: Se a página não tiver a tabela de dados
+    """
+    inicio = time.perf_counter()
+    modo = modo or SCRAPING_PARSER
+    if modo == "lxml" and lxml is None:
+        modo = "strainer"
+
+    if modo == "lxml":
+        table = _localizar_tabela_lxml(content)
+        if table is None:
+            raise TabelaAusente()
+        headers, linhas, classes = _extrair_lxml(table)
+    elif modo in ("full", "strainer"):
+        from bs4 import BeautifulSoup
+
+        strainer = _tabela_strainer() if modo == "strainer" else None
+        soup = BeautifulSoup(content, 'html.parser', parse_only=strainer)
+        table = soup.find('table', {'class': TABELA_CLASSE})
+        if not table:
+            raise TabelaAusente()
+        headers, linhas, classes = _extrair_bs4(table)
+    else:
+        raise ValueError(f"Modo de parser inválido: {modo}. Use um de {PARSER_MODES}")
+
+    extraido = time.perf_counter()
+    headers, tipos, colunas, larguras = normalizar_colunas(headers, linhas)
+    if duracoes is not None:
+        duracoes["parse"] = extraido - inicio
+        duracoes["normalizacao"] = time.perf_counter() - extraido
+    return headers, tipos, colunas, hierarquia_linhas(classes), larguras
+
+
+def extrair_tabela(content: bytes, ano: int, modo: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Extrai as linhas da tabela de dados do HTML de uma página do VitiBrasil.
+
+    Args:
+        content: HTML da página
+        ano: Ano consultado (incluído em cada linha)
+        modo: Um dos PARSER_MODES (padrão: SCRAPING_PARSER)
+
+    Raises:
+        TabelaAusente: Se a página não tiver a tabela de dados
+    """
+    headers, _, colunas, _, larguras = extrair_colunas(content, modo)
+    return montar_registros(ano, headers, colunas, larguras)
@@ -0,0 +1,129 @@
+import os
+from datetime import date
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, Sequence
+
+from dotenv import load_dotenv
+
+from .tabela import Tabela
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# max-age (s) para anos fechados, que não mudam mais na Embrapa, e para os anos recentes
+HTTP_CACHE_MAX_AGE_HISTORICAL = int(os.getenv("HTTP_CACHE_MAX_AGE_HISTORICAL", str(30 * 24 * 60 * 60)))
+HTTP_CACHE_MAX_AGE_RECENT = int(os.getenv("HTTP_CACHE_MAX_AGE_RECENT", "300"))
+
+# Quantos anos (contando o atual) ainda são revisados pela Embrapa e recebem o max-age curto
+HTTP_CACHE_RECENT_YEARS = int(os.getenv("HTTP_CACHE_RECENT_YEARS", "2"))
+
+# Permite que caches compartilhados (CDN) guardem as respostas; por padrão só o cliente guarda,
+# já que as rotas exigem autenticação
+HTTP_CACHE_PUBLIC = os.getenv("HTTP_CACHE_PUBLIC", "false").lower() in ("1", "true", "yes")
+
+# Rotas com negociação de conteúdo (JSON, NDJSON ou CSV na mesma URL): caches
+# compartilhados e navegadores guardam uma versão por Accept
+VARY_ACCEPT = {"Vary": "Accept"}
+
+
+def ano_recente(ano: int) -> bool:
+    """Indica se o ano ainda pode ser revisado pela Embrapa (ver HTTP_CACHE_RECENT_YEARS)"""
+    return ano >= date.today().year - HTTP_CACHE_RECENT_YEARS + 1
+
+
+def cache_headers_anos(anos: Iterable[int]) -> Dict[str, str]:
+    """
+    Cache-Control de uma resposta com os anos informados.
+
+    O max-age é o menor entre os anos da resposta: basta um ano recente
+    para que o intervalo inteiro seja revalidado com frequência.
+    """
+    recente = any(ano_recente(ano) for ano in anos)
+    max_age = HTTP_CACHE_MAX_AGE_RECENT if recente else HTTP_CACHE_MAX_AGE_HISTORICAL
+    escopo = "public" if HTTP_CACHE_PUBLIC else "private"
+    return {"Cache-Control": f"{escopo}, max-age={max_age}"}
+
+
+def cache_headers(tabelas: Sequence[Tabela]) -> Dict[str, str]:
+    """Cabeçalhos de cache HTTP (Cache-Control e Last-Modified) de uma resposta com as tabelas informadas"""
+    headers = cache_headers_anos(tabela.ano for tabela in tabelas)
+    if tabelas:
+        headers["Last-Modified"] = formatdate(max(t.atualizado_em for t in tabelas), usegmt=True)
+    return headers
+
+
+def _etag_confere(if_none_match: str, etag: str) -> bool:
+    # Comparação fraca (RFC 9110): ignora o prefixo W/ dos dois lados
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(candidato.strip().removeprefix("W/") == etag for candidato in if_none_match.split(","))
+
+
+def _nao_modificado_desde(if_modified_since: str, last_modified: str) -> bool:
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+# Cabeçalhos mantidos numa resposta 304
+_CABECALHOS_304 = {"etag", "cache-control", "last-modified", "vary", "expires"}
+
+
+class ConditionalGetMiddleware:
+    """
+    Responde 304 Not Modified a GETs condicionais.
+
+    Vale para qualquer resposta 200 que traga ETag (ou Last-Modified), como as
+    rotas de dados: se o cliente já tem a mesma versão (If-None-Match, ou
+    If-Modified-Since na ausência dele), o corpo não é enviado.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        requisicao = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        if_none_match = requisicao.get("if-none-match")
+        if_modified_since = requisicao.get("if-modified-since")
+        if if_none_match is None and if_modified_since is None:
+            await self.app(scope, receive, send)
+            return
+
+        nao_modificado = False
+
+        def versao_do_cliente(status: int, headers: Dict[str, str]) -> bool:
+            if status != 200:
+                return False
+            # If-None-Match tem precedência; If-Modified-Since só vale sem ele
+            if if_none_match is not None:
+                return "etag" in headers and _etag_confere(if_none_match, headers["etag"])
+            return "last-modified" in headers and _nao_modificado_desde(if_modified_since, headers["last-modified"])
+
+        async def enviar(message):
+            nonlocal nao_modificado
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                nao_modificado = versao_do_cliente(
+                    message["status"], {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in headers}
+                )
+                if nao_modificado:
+                    message = {
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": [(k, v) for k, v in headers if k.decode("latin-1").lower() in _CABECALHOS_304],
+                    }
+                await send(message)
+            elif message["type"] == "http.response.body" and nao_modificado:
+                # Descarta o corpo; envia uma única mensagem vazia para encerrar a resposta
+                if not message.get("more_body", False):
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+            else:
+                await send(message)
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,44 @@
+import os
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# Configurações do cliente HTTP usado no scraping (com valores padrão)
+SCRAPING_TIMEOUT = float(os.getenv("SCRAPING_TIMEOUT", "15"))
+SCRAPING_CONNECT_TIMEOUT = float(os.getenv("SCRAPING_CONNECT_TIMEOUT", "5"))
+SCRAPING_MAX_CONNECTIONS = int(os.getenv("SCRAPING_MAX_CONNECTIONS", "20"))
+SCRAPING_MAX_KEEPALIVE = int(os.getenv("SCRAPING_MAX_KEEPALIVE", "10"))
+
+# Cliente compartilhado por todas as instâncias de ScrapingService
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente HTTP assíncrono compartilhado, criando-o no primeiro uso.
+
+    O cliente mantém um pool de conexões keep-alive com o site VitiBrasil,
+    evitando um novo handshake TCP a cada página consultada.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(SCRAPING_TIMEOUT, connect=SCRAPING_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=SCRAPING_MAX_CONNECTIONS,
+                max_keepalive_connections=SCRAPING_MAX_KEEPALIVE,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Fecha o cliente compartilhado (chamado no encerramento da aplicação)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,37 @@
+import hashlib
+from typing import Dict, Optional, Sequence
+
+from fastapi import Response
+
+from .http_cache import cache_headers
+from .tabela import Tabela
+
+
+def etag_tabelas(tabelas: Sequence[Tabela]) -> str:
+    """ETag de uma resposta com uma ou mais tabelas (combina os ETags de cada ano)"""
+    if len(tabelas) == 1:
+        return tabelas[0].etag
+    combinado = hashlib.blake2b(digest_size=16)
+    for tabela in tabelas:
+        combinado.update(tabela.etag.encode())
+    return '"' + combinado.hexdigest() + '"'
+
+
+def corpo_tabelas(tabelas: Sequence[Tabela]) -> bytes:
+    """Array JSON com os registros de todas as tabelas, montado a partir do JSON já serializado de cada uma"""
+    return b"[" + b",".join(parte for parte in (t.json_registros() for t in tabelas) if parte) + b"]"
+
+
+def responder_tabelas(tabelas: Sequence[Tabela], headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Resposta JSON pronta com os registros das tabelas.
+
+    Ao devolver um Response, o FastAPI não revalida nem re-serializa cada
+    célula pelo response_model da rota (que continua valendo para o OpenAPI).
+    Inclui ETag, Last-Modified e Cache-Control, usados pelo ConditionalGetMiddleware.
+    """
+    return Response(
+        content=corpo_tabelas(tabelas),
+        media_type="application/json",
+        headers={"ETag": etag_tabelas(tabelas), **cache_headers(tabelas), **(headers or {})},
+    )
@@ -0,0 +1,124 @@
+import os
+import time
+from typing import Dict
+
+from dotenv import load_dotenv
+from prometheus_client import Counter, Histogram
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# Expõe /metrics e mede a latência por rota (os contadores internos custam poucos µs por requisição)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Buckets (s): as rotas vão de respostas em cache (sub-ms) a intervalos buscados na Embrapa (dezenas de s)
+_BUCKETS_HTTP = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_BUCKETS_ETAPA = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_DURACAO = Histogram(
+    "vitibrasil_http_request_duration_seconds",
+    "Duração das requisições HTTP por rota (template da rota, não o caminho com os valores)",
+    ["method", "route", "status"],
+    buckets=_BUCKETS_HTTP,
+)
+
+# Etapas da obtenção de um ano:
+#   cache         - consulta ao cache de tabelas
+#   snapshot      - leitura do snapshot local
+#   fetch         - download da página na Embrapa
+#   parse         - extração da tabela do HTML
+#   normalizacao  - conversão das células em valores tipados
+#   serializacao  - JSON pré-serializado e índice montados antes de entrar no cache
+#   resposta      - montagem do corpo da resposta (filtros, projeção e paginação)
+ETAPAS = ("cache", "snapshot", "fetch", "parse", "normalizacao", "serializacao", "resposta")
+ETAPA_DURACAO = Histogram(
+    "vitibrasil_scraping_stage_duration_seconds",
+    "Duração de cada etapa da obtenção das tabelas, por dataset",
+    ["dataset", "etapa"],
+    buckets=_BUCKETS_ETAPA,
+)
+
+# Resultado das consultas ao cache: hit, stale (vencida, servida e revalidada),
+# negativo (ano sem tabela) e miss
+RESULTADOS_CACHE = ("hit", "stale", "negativo", "miss")
+CACHE_CONSULTAS = Counter(
+    "vitibrasil_cache_lookups_total",
+    "Consultas ao cache de tabelas por dataset e resultado",
+    ["dataset", "resultado"],
+)
+
+# Status HTTP das respostas da Embrapa, ou timeout / erro_conexao / circuito_aberto
+UPSTREAM_RESPOSTAS = Counter(
+    "vitibrasil_upstream_responses_total",
+    "Respostas da Embrapa por dataset e status",
+    ["dataset", "status"],
+)
+
+AUTH_DURACAO = Histogram(
+    "vitibrasil_auth_stage_duration_seconds",
+    "Duração da validação do usuário nas rotas autenticadas (decodificação do JWT e consulta ao banco)",
+    ["etapa"],
+    buckets=_BUCKETS_ETAPA,
+)
+AUTH_JWT = AUTH_DURACAO.labels("jwt_decode")
+AUTH_BANCO = AUTH_DURACAO.labels("db_lookup")
+
+
+class MetricasDataset:
+    """
+    Séries de um dataset com os labels já resolvidos.
+
+    labels() adquire um lock e busca a série a cada chamada; resolvendo uma
+    vez por dataset, medir uma etapa no caminho quente é só um observe().
+    """
+
+    def __init__(self, dataset: str):
+        self.dataset = dataset
+        self.etapas = {etapa: ETAPA_DURACAO.labels(dataset, etapa) for etapa in ETAPAS}
+        self.cache = {resultado: CACHE_CONSULTAS.labels(dataset, resultado) for resultado in RESULTADOS_CACHE}
+        self._upstream: Dict[str, Counter] = {}
+
+    def observar(self, etapa: str, inicio: float) -> None:
+        """Registra a duração de uma etapa iniciada em inicio (time.perf_counter())"""
+        self.etapas[etapa].observe(time.perf_counter() - inicio)
+
+    def upstream(self, status: str) -> None:
+        contador = self._upstream.get(status)
+        if contador is None:
+            contador = self._upstream[status] = UPSTREAM_RESPOSTAS.labels(self.dataset, status)
+        contador.inc()
+
+
+class MetricsMiddleware:
+    """
+    Mede a duração de cada requisição HTTP, do início ao último byte enviado.
+
+    O label route é o template da rota (ex: /api/v1/producao/{ano}), para que a
+    quantidade de séries não cresça com os valores pedidos; requisições que não
+    casam com nenhuma rota ficam em "sem_rota".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        inicio = time.perf_counter()
+
+        async def enviar(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            rota = scope.get("route")
+            HTTP_DURACAO.labels(
+                scope["method"], rota.path if rota is not None else "sem_rota", str(status)
+            ).observe(time.perf_counter() - inicio)
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import os
+import re
+from pathlib import Path
+from typing import List, NamedTuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from database import async_engine
+
+# Carrega variáveis do .env
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Aplica as migrações pendentes ao iniciar a aplicação
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+
+# Pasta com os arquivos NNNN_descricao.sql (e variantes NNNN_descricao.<dialeto>.sql)
+DB_MIGRATIONS_DIR = Path(
+    os.getenv("DB_MIGRATIONS_DIR", Path(__file__).resolve().parent.parent.parent / "db" / "migrations")
+)
+
+# Bancos em que as migrações são serializadas com GET_LOCK e tempo máximo (s) de espera pelo lock
+DIALETOS_COM_LOCK = ("mysql", "mariadb")
+DB_MIGRATION_LOCK_TIMEOUT = int(os.getenv("DB_MIGRATION_LOCK_TIMEOUT", "60"))
+
+_ARQUIVO_MIGRACAO = re.compile(r"^(\d+)_(\w+?)(?:\.(\w+))?\.sql$")
+
+# Pré-condição de uma migração: "-- falha_se: SELECT ..." interrompe a migração
+# (sem aplicar nada) quando a consulta retorna alguma linha
+_FALHA_SE = re.compile(r"^\s*--\s*falha_se:\s*(.+?)\s*;?\s*$", re.M)
+
+
+class MigracaoBloqueada(RuntimeError):
+    """Pré-condição de uma migração não atendida; exige ação do operador"""
+
+
+class Migracao(NamedTuple):
+    versao: int
+    nome: str
+    arquivo: Path
+
+
+def listar_migracoes(dialeto: str, pasta: Path = DB_MIGRATIONS_DIR) -> List[Migracao]:
+    """
+    Lista as migrações em ordem de versão.
+
+    Quando existe uma variante específica do dialeto (ex: 0001_x.sqlite.sql),
+    ela substitui o arquivo genérico (0001_x.sql).
+    """
+    escolhidas = {}
+    for arquivo in sorted(pasta.glob("*.sql")):
+        match = _ARQUIVO_MIGRACAO.match(arquivo.name)
+        if not match:
+            continue
+        versao, nome, variante = int(match.group(1)), match.group(2), match.group(3)
+        if variante is None:
+            escolhidas.setdefault(versao, Migracao(versao, nome, arquivo))
+        elif variante == dialeto:
+            escolhidas[versao] = Migracao(versao, nome, arquivo)
+    return [escolhidas[versao] for versao in sorted(escolhidas)]
+
+
+def _comandos(sql: str) -> List[str]:
+    # Remove comentários de linha e separa os comandos pelo ";" no fim da linha
+    linhas = [linha for linha in sql.splitlines() if not linha.strip().startswith("--")]
+    return [comando.strip() for comando in re.split(r";\s*$", "\n".join(linhas), flags=re.M) if comando.strip()]
+
+
+def _verificar(conn: Connection, migracao: Migracao, sql: str) -> None:
+    for consulta in _FALHA_SE.findall(sql):
+        resultado = conn.execute(text(consulta))
+        linhas = resultado.fetchall()
+        if linhas:
+            colunas = list(resultado.keys())
+            detalhes = "\n".join(
+                "  " + ", ".join(f"{coluna}={valor}" for coluna, valor in zip(colunas, linha)) for linha in linhas
+            )
+            raise MigracaoBloqueada(
+                f"Migração {migracao.versao:04d}_{migracao.nome} não aplicada: a pré-condição "
+                f"({consulta}) retornou {len(linhas)} linha(s):\n{detalhes}\n"
+                f"Corrija os dados manualmente (ver {migracao.arquivo.name}) e reinicie a aplicação."
+            )
+
+
+def _aplicar(conn: Connection) -> List[int]:
+    dialeto = conn.dialect.name
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            versao INT PRIMARY KEY,
+            nome VARCHAR(255) NOT NULL,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+
+    # No MySQL/MariaDB vários workers sobem juntos: um lock nomeado garante que
+    # apenas um aplica as migrações (DDL faz commit implícito nesses bancos)
+    usa_lock = dialeto in DIALETOS_COM_LOCK
+    if usa_lock:
+        obtido = conn.execute(
+            text("SELECT GET_LOCK('schema_migrations', :espera)"), {"espera": DB_MIGRATION_LOCK_TIMEOUT}
+        ).scalar()
+        # 0 = tempo esgotado, NULL = erro: migrar sem o lock poderia aplicar a mesma versão duas vezes
+        if obtido != 1:
+            raise RuntimeError(
+                f"Não foi possível obter o lock das migrações em {DB_MIGRATION_LOCK_TIMEOUT}s "
+                f"(GET_LOCK retornou {obtido}); outra instância pode estar migrando o banco"
+            )
+    try:
+        aplicadas = {linha.versao for linha in conn.execute(text("SELECT versao FROM schema_migrations"))}
+        novas = []
+        for migracao in listar_migracoes(dialeto):
+            if migracao.versao in aplicadas:
+                continue
+            sql = migracao.arquivo.read_text(encoding="utf-8")
+            _verificar(conn, migracao, sql)
+            logger.info("Aplicando migração %04d_%s", migracao.versao, migracao.nome)
+            for comando in _comandos(sql):
+                conn.execute(text(comando))
+            conn.execute(
+                text("INSERT INTO schema_migrations (versao, nome) VALUES (:versao, :nome)"),
+                {"versao": migracao.versao, "nome": migracao.nome},
+            )
+            novas.append(migracao.versao)
+        return novas
+    finally:
+        if usa_lock:
+            conn.execute(text("SELECT RELEASE_LOCK('schema_migrations')"))
+
+
+async def aplicar_migracoes() -> List[int]:
+    """
+    Aplica as migrações pendentes em ordem, registrando cada versão em
+    schema_migrations.
+
+    Raises:
+        MigracaoBloqueada: se a pré-condição de uma migração falhar
+
+    Returns:
+        Versões aplicadas nesta execução
+    """
+    async with async_engine.begin() as conn:
+        return await conn.run_sync(_aplicar)
+
+
+if __name__ == "__main__":
+    # Aplicação manual: python -m services.migration_service (a partir de app/)
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        try:
+            print(f"Migrações aplicadas: {await aplicar_migracoes() or 'nenhuma'}")
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(main())
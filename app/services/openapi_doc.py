@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Fonte da especificação (mantida à mão, na raiz do repositório) e a versão
+# pré-compilada em JSON que acompanha o pacote e é lida pela aplicação
+OPENAPI_YAML = Path(__file__).resolve().parent.parent.parent / "openapi.yaml"
+OPENAPI_JSON = Path(__file__).resolve().parent.parent / "openapi.json"
+
+_documento: Optional[Dict[str, Any]] = None
+
+
+def compilar_openapi(origem: Path = OPENAPI_YAML, destino: Path = OPENAPI_JSON) -> Dict[str, Any]:
+    """Converte o openapi.yaml em JSON (o parser de YAML é lento demais para rodar a cada início)"""
+    import yaml
+
+    with open(origem, encoding="utf-8") as f:
+        documento = yaml.safe_load(f)
+    destino.write_text(json.dumps(documento, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    return documento
+
+
+def carregar_openapi() -> Dict[str, Any]:
+    """
+    Especificação OpenAPI da API, lida do JSON pré-compilado no primeiro uso
+    e mantida em memória.
+
+    Sem o JSON (ex.: checkout sem o arquivo gerado), compila a partir do YAML.
+    """
+    global _documento
+    if _documento is None:
+        if OPENAPI_JSON.exists():
+            _documento = json.loads(OPENAPI_JSON.read_bytes())
+        else:
+            _documento = compilar_openapi()
+    return _documento
+
+
+if __name__ == "__main__":
+    # Regenera o JSON após editar o openapi.yaml: python -m services.openapi_doc (a partir de app/)
+    documento = compilar_openapi()
+    print(f"{OPENAPI_JSON}: {len(documento.get('paths', {}))} rotas")
@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .html_parser import extrair_colunas
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# Onde roda a extração/normalização das tabelas:
+#   process - pool de processos (usa vários núcleos, sem disputar o GIL com o event loop)
+#   thread  - pool de threads
+#   inline  - no próprio event loop (útil para depuração)
+SCRAPING_PARSE_EXECUTOR = os.getenv("SCRAPING_PARSE_EXECUTOR", "process")
+SCRAPING_PARSE_WORKERS = int(os.getenv("SCRAPING_PARSE_WORKERS", str(os.cpu_count() or 2)))
+
+# Como os processos do pool são criados. Não usa fork: o worker do uvicorn já tem
+# várias threads (to_thread, bcrypt, aiosqlite) e um lock preso por uma delas no
+# momento do fork travaria o processo filho. forkserver cria os processos a partir
+# de um servidor limpo (com o parser já importado); spawn onde ele não existe
+SCRAPING_PARSE_START_METHOD = os.getenv(
+    "SCRAPING_PARSE_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+_executor: Optional[Executor] = None
+
+
+def get_parse_executor() -> Optional[Executor]:
+    """Retorna o executor de parsing, criando-o no primeiro uso (None no modo inline)"""
+    global _executor
+    if _executor is None:
+        if SCRAPING_PARSE_EXECUTOR == "process":
+            contexto = multiprocessing.get_context(SCRAPING_PARSE_START_METHOD)
+            if SCRAPING_PARSE_START_METHOD == "forkserver":
+                # O servidor importa o parser uma vez; cada processo do pool já nasce com ele
+                contexto.set_forkserver_preload([extrair_colunas.__module__])
+            _executor = ProcessPoolExecutor(max_workers=SCRAPING_PARSE_WORKERS, mp_context=contexto)
+        elif SCRAPING_PARSE_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(
+                max_workers=SCRAPING_PARSE_WORKERS,
+                thread_name_prefix="parse",
+            )
+        elif SCRAPING_PARSE_EXECUTOR != "inline":
+            raise ValueError(f"SCRAPING_PARSE_EXECUTOR inválido: {SCRAPING_PARSE_EXECUTOR}")
+    return _executor
+
+
+def _extrair_cronometrado(
+    content: bytes,
+) -> Tuple[Tuple[List[str], List[str], List[list], Optional[List[int]], Optional[List[int]]], Dict[str, float]]:
+    # Roda no executor; as durações voltam junto do resultado (o dict não atravessa processos)
+    duracoes: Dict[str, float] = {}
+    return extrair_colunas(content, duracoes=duracoes), duracoes
+
+
+async def processar_pagina(
+    content: bytes, duracoes: Optional[Dict[str, float]] = None
+) -> Tuple[List[str], List[str], List[list], Optional[List[int]], Optional[List[int]]]:
+    """
+    Extrai e normaliza a tabela de uma página fora do event loop.
+
+    Recebe o HTML bruto e devolve apenas cabeçalhos, tipos, colunas já
+    normalizadas, a categoria e a quantidade de células de cada linha, o que mantém pequeno o volume de dados trocado com os processos.
+
+    Args:
+        duracoes: Se informado, recebe a duração (s) do parse e da normalização
+    """
+    executor = get_parse_executor()
+    if executor is None:
+        resultado, medidas = _extrair_cronometrado(content)
+    else:
+        resultado, medidas = await asyncio.get_running_loop().run_in_executor(executor, _extrair_cronometrado, content)
+    if duracoes is not None:
+        duracoes.update(medidas)
+    return resultado
+
+
+def shutdown_parse_executor() -> None:
+    """Encerra o pool (chamado no encerramento da aplicação)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
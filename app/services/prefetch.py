@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from .circuit_breaker import embrapa_breaker
+from .singleflight import scraping_singleflight
+
+# Carrega variáveis do .env
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Primeiro ano disponível no VitiBrasil
+ANO_INICIAL = 1970
+
+# Após um miss numa consulta por ano, quantos anos vizinhos (para cada lado) são buscados antecipadamente (0 desativa)
+PREFETCH_ADJACENT_YEARS = int(os.getenv("PREFETCH_ADJACENT_YEARS", "1"))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))
+PREFETCH_QUEUE_SIZE = int(os.getenv("PREFETCH_QUEUE_SIZE", "256"))
+
+# Buscas em segundo plano esperam enquanto houver ao menos esta quantidade de
+# buscas na Embrapa em andamento, para não competir com as requisições dos usuários
+PREFETCH_PAUSE_IN_FLIGHT = int(os.getenv("PREFETCH_PAUSE_IN_FLIGHT", os.getenv("SCRAPING_MAX_CONCURRENCY", "8")))
+
+
+async def aguardar_folga() -> None:
+    """Aguarda até a Embrapa ter folga: poucas buscas em andamento e circuito fechado"""
+    while scraping_singleflight.in_flight() >= PREFETCH_PAUSE_IN_FLIGHT or embrapa_breaker.is_open():
+        await asyncio.sleep(0.1)
+
+
+class Prefetcher:
+    """
+    Fila de baixa prioridade que carrega anos no cache antes de serem pedidos.
+
+    Alimentada pelos misses das consultas por ano: quem pede um ano tende a
+    pedir os vizinhos em seguida. A fila é limitada (itens excedentes são
+    descartados), repetições são ignoradas e os workers só buscam quando a
+    Embrapa tem folga (aguardar_folga).
+    """
+
+    def __init__(self, workers: int = PREFETCH_WORKERS, max_fila: int = PREFETCH_QUEUE_SIZE,
+                 vizinhos: int = PREFETCH_ADJACENT_YEARS):
+        self.workers = workers
+        self.max_fila = max_fila
+        self.vizinhos = vizinhos
+        self._fila: Optional[asyncio.Queue] = None
+        self._tarefas: List[asyncio.Task] = []
+        self._pendentes: Set[Tuple[str, int]] = set()
+        self._contadores = {"agendados": 0, "carregados": 0, "descartados": 0, "erros": 0}
+
+    def iniciar(self) -> None:
+        """Cria a fila e os workers no event loop atual (chamado no lifespan)"""
+        if self._tarefas or self.vizinhos <= 0:
+            return
+        self._fila = asyncio.Queue(maxsize=self.max_fila)
+        self._tarefas = [asyncio.create_task(self._trabalhar()) for _ in range(self.workers)]
+
+    async def parar(self) -> None:
+        for tarefa in self._tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*self._tarefas, return_exceptions=True)
+        self._tarefas = []
+        self._fila = None
+        self._pendentes.clear()
+
+    def agendar(self, service: Any, ano: int) -> bool:
+        """Coloca um ano na fila; retorna False se o prefetch está parado, o ano já está na fila ou ela está cheia"""
+        chave = (service.url_param, ano)
+        if self._fila is None or chave in self._pendentes:
+            return False
+        try:
+            self._fila.put_nowait((service, ano))
+        except asyncio.QueueFull:
+            self._contadores["descartados"] += 1
+            return False
+        self._pendentes.add(chave)
+        self._contadores["agendados"] += 1
+        return True
+
+    def agendar_vizinhos(self, service: Any, ano: int) -> None:
+        """Agenda os anos vizinhos de um ano que acabou de ser buscado (os mais próximos primeiro)"""
+        ultimo = date.today().year
+        for distancia in range(1, self.vizinhos + 1):
+            for vizinho in (ano + distancia, ano - distancia):
+                if ANO_INICIAL <= vizinho <= ultimo:
+                    self.agendar(service, vizinho)
+
+    async def aguardar(self) -> None:
+        """Aguarda a fila esvaziar"""
+        if self._fila is not None:
+            await self._fila.join()
+
+    async def _trabalhar(self) -> None:
+        while True:
+            service, ano = await self._fila.get()
+            try:
+                await aguardar_folga()
+                if await service.aquecer_ano(ano):
+                    self._contadores["carregados"] += 1
+            except HTTPException as e:
+                # Ano sem tabela ou Embrapa com problema: o usuário verá o erro se pedir o ano
+                self._contadores["erros"] += 1
+                logger.debug("Prefetch de %s/%s falhou: %s", service.nome, ano, e.detail)
+            except Exception:
+                self._contadores["erros"] += 1
+                logger.exception("Prefetch de %s/%s falhou", service.nome, ano)
+            finally:
+                self._pendentes.discard((service.url_param, ano))
+                self._fila.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **self._contadores,
+            "na_fila": self._fila.qsize() if self._fila is not None else 0,
+            "workers": len(self._tarefas),
+        }
+
+
+# Instância compartilhada pelos serviços de scraping
+prefetcher = Prefetcher()
@@ -1,7 +1,7 @@
 from .scraping_service import ScrapingService
 
 # Instanciando a classe Scraping
-processamento_service_viniferas = ScrapingService(url_param='subopcao=subopt_01&opcao=opt_03')
-processamento_service_americanas = ScrapingService(url_param='subopcao=subopt_02&opcao=opt_03')
-processamento_service_uvas = ScrapingService(url_param='subopcao=subopt_03&opcao=opt_03')
-processamento_service_sem_classificacao = ScrapingService(url_param='subopcao=subopt_04&opcao=opt_03')
\ No newline at end of file
+processamento_service_viniferas = ScrapingService(url_param='subopcao=subopt_01&opcao=opt_03', nome='processamento_viniferas')
+processamento_service_americanas = ScrapingService(url_param='subopcao=subopt_02&opcao=opt_03', nome='processamento_americanas')
+processamento_service_uvas = ScrapingService(url_param='subopcao=subopt_03&opcao=opt_03', nome='processamento_uvas')
+processamento_service_sem_classificacao = ScrapingService(url_param='subopcao=subopt_04&opcao=opt_03', nome='processamento_sem_classificacao')
\ No newline at end of file
@@ -1,4 +1,4 @@
 from .scraping_service import ScrapingService
 
 # Instanciando a classe Scraping
-producao_service = ScrapingService(url_param='opcao=opt_02')
+producao_service = ScrapingService(url_param='opcao=opt_02', nome='producao')
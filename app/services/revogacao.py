@@ -0,0 +1,122 @@
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .cache_service import CACHE_BACKEND_URL
+
+logger = logging.getLogger(__name__)
+
+
+class RevogacaoIndisponivel(Exception):
+    """A lista de revogação não pôde ser lida ou gravada (ex: Redis fora do ar)"""
+
+
+class MemoryRevogacoes:
+    """
+    Lista de revogação em processo: username -> momento da revogação.
+
+    Ao contrário do cache de tabelas, não tem limite de entradas nem descarte
+    LRU: uma revogação só sai da lista quando vence o último token que ela
+    invalida (expira_em), nunca por falta de espaço.
+    """
+
+    name = "memory"
+    # Cada worker tem a sua cópia: uma revogação não chega aos demais workers
+    compartilhada = False
+
+    # Tamanho mínimo da lista antes da primeira varredura das revogações vencidas
+    VARREDURA_MINIMA = 1024
+
+    def __init__(self):
+        self._entradas: Dict[str, Tuple[int, float]] = {}
+        self._proxima_varredura = self.VARREDURA_MINIMA
+
+    async def revogado_em(self, username: str) -> Optional[int]:
+        """Momento (epoch) da revogação do usuário, ou None se ele não foi revogado"""
+        entrada = self._entradas.get(username)
+        if entrada is None:
+            return None
+        revogado_em, expira_em = entrada
+        if expira_em <= time.time():
+            del self._entradas[username]
+            return None
+        return revogado_em
+
+    async def revogar(self, username: str, revogado_em: int, expira_em: float) -> None:
+        """Registra a revogação até expira_em (epoch), quando os tokens revogados já terão expirado"""
+        # As revogações vencidas saem aqui, sem tarefa periódica; a varredura só
+        # acontece quando a lista dobra de tamanho, para não custar O(n) a cada revogação
+        if len(self._entradas) >= self._proxima_varredura:
+            agora = time.time()
+            for vencido in [u for u, (_, expira) in self._entradas.items() if expira <= agora]:
+                del self._entradas[vencido]
+            self._proxima_varredura = max(self.VARREDURA_MINIMA, 2 * len(self._entradas))
+        self._entradas[username] = (revogado_em, expira_em)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisRevogacoes:
+    """
+    Lista de revogação no Redis, compartilhada por todos os workers.
+
+    Falha fechada: se o Redis não responde, a consulta levanta
+    RevogacaoIndisponivel em vez de tratar o usuário como não revogado.
+    """
+
+    name = "redis"
+    compartilhada = True
+    PREFIXO = "embrapa:revoked"
+
+    def __init__(self, url: str = CACHE_BACKEND_URL, client: Any = None, prefixo: Optional[str] = None):
+        """
+        Args:
+            url: URL de conexão (ex: redis://localhost:6379/0)
+            client: Cliente redis.asyncio já criado (ex: fakeredis nos testes)
+            prefixo: Prefixo das chaves no Redis (padrão: PREFIXO)
+        """
+        self.prefixo = prefixo or self.PREFIXO
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.client = client
+
+    def _chave(self, username: str) -> str:
+        return f"{self.prefixo}:{username}"
+
+    async def revogado_em(self, username: str) -> Optional[int]:
+        try:
+            bruto = await self.client.get(self._chave(username))
+        except Exception as e:
+            logger.error("Falha ao ler a lista de revogação no Redis: %s", e)
+            raise RevogacaoIndisponivel() from e
+        return int(bruto) if bruto is not None else None
+
+    async def revogar(self, username: str, revogado_em: int, expira_em: float) -> None:
+        # O TTL da chave acompanha a expiração do último token revogado
+        ttl = max(1, int(expira_em - time.time()) + 1)
+        try:
+            await self.client.set(self._chave(username), revogado_em, ex=ttl)
+        except Exception as e:
+            logger.error("Falha ao gravar a revogação de %s no Redis: %s", username, e)
+            raise RevogacaoIndisponivel() from e
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_revogacoes(url: str = CACHE_BACKEND_URL):
+    """Lista de revogação no mesmo backend configurado para o cache (memory:// ou Redis)"""
+    if not url or url.startswith("memory://"):
+        return MemoryRevogacoes()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRevogacoes(url)
+    raise ValueError(f"CACHE_BACKEND_URL não suportada: {url}")
+
+
+# Instância compartilhada, usada por auth_service
+revogacoes = create_revogacoes()
@@ -1,113 +1,435 @@
-import requests
-from bs4 import BeautifulSoup
-from fastapi import HTTPException
-from typing import List, Dict, Any
-from functools import lru_cache
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+import httpx
+from fastapi import HTTPException, Response
+from typing import AsyncIterator, List, Dict, Any, Optional
+
+from .cache_service import (
+    scraping_cache, get_dataset_ttl, CACHE_STALE_SECONDS, CACHE_NEGATIVE_TTL, CACHE_TTL_HISTORICAL
+)
+from .circuit_breaker import HALF_OPEN, embrapa_breaker
+from .consulta import Consulta
+from .html_parser import TabelaAusente
+from .http_cache import VARY_ACCEPT, ano_recente, cache_headers_anos
+from .http_client import get_http_client
+from .json_response import responder_tabelas
+from .metrics import MetricasDataset
+from .parse_executor import processar_pagina
+from .prefetch import prefetcher
+from .singleflight import scraping_singleflight
+from .snapshot_store import snapshot_store
+from .streaming import FORMATO_JSON, negociar_formato, responder_stream
+from .tabela import Tabela
+
+logger = logging.getLogger(__name__)
+
+# Endereço das páginas do VitiBrasil (pode apontar para o servidor local de benchmarks/vitibrasil_local.py)
+VITIBRASIL_BASE_URL = os.getenv("VITIBRASIL_BASE_URL", "http://vitibrasil.cnpuv.embrapa.br/index.php")
+
+# Quantidade máxima de anos buscados em paralelo numa consulta por intervalo
+SCRAPING_MAX_CONCURRENCY = int(os.getenv("SCRAPING_MAX_CONCURRENCY", "8"))
+
+# Revalidações em segundo plano (referência mantida para não serem coletadas)
+_revalidacoes: "set[asyncio.Task]" = set()
+
+
+class TabelaNaoEncontrada(HTTPException):
+    """Página carregou, mas não há tabela de dados para o ano"""
+
+    def __init__(self, ano: int):
+        super().__init__(status_code=404, detail=f"Tabela não encontrada para o ano {ano}")
+
 
 class ScrapingService:
-    def __init__(self, url_param: str):
+    def __init__(self, url_param: str, nome: str, cache_ttl: Optional[int] = None):
         """
         Serviço de scraping genérico para o site VitiBrasil.
         
         Args:
             url_param: Parâmetro da URL que identifica a página (ex: 'opt_02' para produção)
+            nome: Nome do dataset (ex: 'producao'), usado na configuração e administração do cache
+            cache_ttl: TTL (s) das tabelas em cache; se None, usa CACHE_TTL_<NOME> ou o padrão
         """
-        self.BASE_URL = f'http://vitibrasil.cnpuv.embrapa.br/index.php?{url_param}'
+        self.url_param = url_param
+        self.nome = nome
+        self.cache_ttl = cache_ttl if cache_ttl is not None else get_dataset_ttl(nome)
+        self.BASE_URL = f'{VITIBRASIL_BASE_URL}?{url_param}'
+        self.metricas = MetricasDataset(nome)
+
+    async def _fetch_pagina(self, ano: int) -> bytes:
+        """Baixa a página do ano usando o cliente HTTP assíncrono compartilhado"""
+        # Com o circuito aberto, falha imediatamente em vez de esperar o timeout
+        if not embrapa_breaker.allow_request():
+            self.metricas.upstream("circuito_aberto")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Site da Embrapa indisponível no momento. Tente novamente mais tarde (ano {ano})"
+            )
+
+        # Em half-open, esta é a única chamada de teste liberada
+        teste = embrapa_breaker.state == HALF_OPEN
+        try:
+            url = f'{self.BASE_URL}&ano={ano}'
+            inicio = time.perf_counter()
+            try:
+                response = await get_http_client().get(url)
+            except httpx.TimeoutException:
+                self.metricas.upstream("timeout")
+                embrapa_breaker.record_failure()
+                raise HTTPException(
+                    status_code=504,
+                    detail=f"Tempo esgotado ao acessar a página para o ano {ano}"
+                )
+            except httpx.HTTPError as e:
+                self.metricas.upstream("erro_conexao")
+                embrapa_breaker.record_failure()
+                raise HTTPException(
+                    status_code=502,
+                    detail=f"Erro de conexão ao acessar a página para o ano {ano}: {e}"
+                )
+            finally:
+                self.metricas.observar("fetch", inicio)
 
-    def _limpar_valor(self, valor: str) -> Any:
+            self.metricas.upstream(str(response.status_code))
+            if response.status_code != 200:
+                embrapa_breaker.record_failure()
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Erro ao acessar a página para o ano {ano}. Status code: {response.status_code}"
+                )
+
+            embrapa_breaker.record_success()
+            return response.content
+        finally:
+            # Teste cancelado ou interrompido por outra exceção: libera um novo teste
+            if teste:
+                embrapa_breaker.release_probe()
+
+    async def _scrape_ano(self, ano: int, prefetch: bool = False) -> Tabela:
         """
-        Tenta converter valores para o tipo apropriado (int, float ou mantém string).
+        Realiza scraping dos dados do site para um ano específico.
+
+        Args:
+            prefetch: Se True, um miss também agenda a busca antecipada dos anos vizinhos
         """
-        valor = valor.strip()
-        
-        # Verifica se é um número no formato brasileiro (1.234,56)
-        if valor.replace('.', '').replace(',', '').isdigit():
-            # Remove pontos de milhar e substitui vírgula decimal por ponto
-            cleaned = valor.replace('.', '').replace(',', '.')
-            # Retorna float se tiver parte decimal, int caso contrário
-            return float(cleaned) if '.' in cleaned else int(cleaned)
-        
-        # Se não for número, retorna a string original
-        return valor
+        # O cache é compartilhado entre os serviços, por isso a chave inclui o url_param
+        chave = (self.url_param, ano)
+        inicio = time.perf_counter()
+        entrada = await scraping_cache.get(chave)
+        self.metricas.observar("cache", inicio)
+        if entrada is not None:
+            # Cache negativo: ano sem tabela consultado recentemente
+            if "erro" in entrada:
+                self.metricas.cache["negativo"].inc()
+                raise TabelaNaoEncontrada(ano)
 
+            # Tabela vencida: serve a última versão boa e revalida em segundo plano
+            if entrada["fresco_ate"] <= time.time():
+                self.metricas.cache["stale"].inc()
+                self._revalidar(ano)
+            else:
+                self.metricas.cache["hit"].inc()
+            dados = entrada["dados"]
+            # Entradas gravadas antes do formato colunar guardam a lista de registros
+            return dados if isinstance(dados, Tabela) else Tabela.from_registros(ano, dados)
 
-    @lru_cache(maxsize=100)
-    def _scrape_ano(self, ano: int) -> List[Dict[str, Any]]:
-        """Realiza scraping dos dados do site para um ano específico"""
-        url = f'{self.BASE_URL}&ano={ano}'
-        response = requests.get(url)
-        
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao acessar a página para o ano {ano}. Status code: {response.status_code}"
-            )
+        self.metricas.cache["miss"].inc()
+        if prefetch:
+            prefetcher.agendar_vizinhos(self, ano)
+        # Requisições concorrentes para o mesmo ano aguardam um único scraping
+        return await scraping_singleflight.do(chave, lambda: self._carregar_ano(ano))
+
+    async def aquecer_ano(self, ano: int) -> bool:
+        """
+        Carrega o ano no cache se ele ainda não estiver lá (aquecimento e prefetch).
+
+        Returns:
+            True se o ano foi buscado, False se já estava em cache
+        """
+        chave = (self.url_param, ano)
+        if await scraping_cache.get(chave) is not None:
+            return False
+        await scraping_singleflight.do(chave, lambda: self._carregar_ano(ano))
+        return True
+
+    async def _carregar_ano(self, ano: int) -> Tabela:
+        """Lê a tabela do snapshot local ou, se não houver, busca na Embrapa"""
+        if snapshot_store is not None:
+            inicio = time.perf_counter()
+            tabela = await snapshot_store.aget(self.url_param, ano)
+            self.metricas.observar("snapshot", inicio)
+            if tabela is not None:
+                await self._gravar_cache(ano, tabela)
+                return tabela
+
+        return await self.atualizar_ano(ano)
+
+    async def atualizar_ano(self, ano: int) -> Tabela:
+        """
+        Busca a página na Embrapa, extrai a tabela e atualiza o snapshot e o cache.
+        """
+        content = await self._fetch_pagina(ano)
+        try:
+            tabela = await self._parse_tabela(content, ano)
+        except TabelaNaoEncontrada:
+            # Guarda a ausência por pouco tempo para não repetir a busca a cada requisição,
+            # mas sem sobrescrever uma tabela boa (mesmo vencida), que continua sendo servida
+            chave = (self.url_param, ano)
+            atual = await scraping_cache.get(chave)
+            if atual is None or "erro" in atual:
+                await scraping_cache.set(chave, {"erro": 404}, CACHE_NEGATIVE_TTL)
+            raise
+
+        # Conteúdo igual ao da versão anterior (mesmo ETag): mantém a data dela,
+        # para que o Last-Modified não avance a cada revalidação sem mudança
+        anterior = await self._tabela_anterior(ano)
+        if anterior is not None and anterior.etag == tabela.etag:
+            tabela.atualizado_em = anterior.atualizado_em
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        table = soup.find('table', {'class': 'tb_base tb_dados'})
+        if snapshot_store is not None:
+            await snapshot_store.aput(self.url_param, ano, tabela)
+        await self._gravar_cache(ano, tabela)
+        return tabela
 
-        if not table:
+    async def _tabela_anterior(self, ano: int) -> Optional[Tabela]:
+        """Versão atual do ano no cache (mesmo vencida) ou, se não houver, no snapshot local"""
+        entrada = await scraping_cache.get((self.url_param, ano))
+        if entrada is not None and isinstance(entrada.get("dados"), Tabela):
+            return entrada["dados"]
+        if snapshot_store is not None:
+            return await snapshot_store.aget(self.url_param, ano)
+        return None
+
+    def _ttl_ano(self, ano: int) -> int:
+        """TTL da tabela do ano: anos fechados não mudam mais e usam CACHE_TTL_HISTORICAL"""
+        return self.cache_ttl if ano_recente(ano) else max(self.cache_ttl, CACHE_TTL_HISTORICAL)
+
+    async def _gravar_cache(self, ano: int, tabela: Tabela) -> None:
+        # A entrada fica no cache além do TTL para poder ser servida vencida
+        # (stale-while-revalidate) caso a Embrapa esteja fora do ar
+        # O JSON da resposta e o índice da coluna chave (usado nos filtros)
+        # são montados uma vez, antes de entrar no cache
+        inicio = time.perf_counter()
+        tabela.json_registros()
+        tabela.indice()
+        self.metricas.observar("serializacao", inicio)
+        ttl = self._ttl_ano(ano)
+        entrada = {"dados": tabela, "fresco_ate": time.time() + ttl}
+        await scraping_cache.set((self.url_param, ano), entrada, ttl + CACHE_STALE_SECONDS)
+
+    def _revalidar(self, ano: int) -> None:
+        """Agenda a atualização de um ano em segundo plano, sem bloquear a resposta"""
+        chave = (self.url_param, ano)
+        if scraping_singleflight.is_in_flight(chave) or embrapa_breaker.is_open():
+            return
+
+        # Anos fechados são recarregados do snapshot local (se houver), sem nova
+        # busca na Embrapa; só os anos recentes são atualizados na origem
+        carregar = self.atualizar_ano if ano_recente(ano) else self._carregar_ano
+
+        async def revalidar() -> None:
+            try:
+                await scraping_singleflight.do(chave, lambda: carregar(ano))
+            except HTTPException as e:
+                # Mantém a versão vencida; a próxima requisição tenta de novo
+                logger.warning("Revalidação de %s/%s falhou: %s", self.nome, ano, e.detail)
+            except Exception:
+                # Qualquer outra falha (pool de parsing, parser, backend do cache)
+                # também mantém a versão vencida, mas fica registrada com o traceback
+                logger.exception("Revalidação de %s/%s falhou", self.nome, ano)
+
+        task = asyncio.create_task(revalidar())
+        _revalidacoes.add(task)
+        task.add_done_callback(_revalidacoes.discard)
+
+    async def _parse_tabela(self, content: bytes, ano: int) -> Tabela:
+        """Extrai a tabela de dados do HTML da página (no executor de parsing)"""
+        duracoes: Dict[str, float] = {}
+        try:
+            headers, tipos, colunas, hierarquia, larguras = await processar_pagina(content, duracoes)
+        except TabelaAusente:
+            raise TabelaNaoEncontrada(ano)
+        for etapa, duracao in duracoes.items():
+            self.metricas.etapas[etapa].observe(duracao)
+        return Tabela(ano, headers, tipos, colunas, hierarquia=hierarquia, larguras=larguras)
+
+    @staticmethod
+    def _validar_intervalo(ano_inicio: int, ano_fim: int) -> None:
+        if ano_inicio > ano_fim:
             raise HTTPException(
-                status_code=404,
-                detail=f"Tabela não encontrada para o ano {ano}"
+                status_code=400,
+                detail="Ano inicial deve ser menor ou igual ao ano final"
             )
 
-        # Encontra os cabeçalhos da tabela
-        headers = []
-        thead = table.find('thead')
-        if thead:
-            header_row = thead.find('tr')
-            if header_row:
-                headers = [th.get_text(strip=True) for th in header_row.find_all('th')]
-        
-        # Se não encontrar no thead, tenta pegar a primeira linha do tbody
-        if not headers:
-            first_row = table.find('tr')
-            if first_row:
-                headers = [th.get_text(strip=True) for th in first_row.find_all('td')]
-        
-        # Se ainda não tiver cabeçalhos, usa padrão
-        if not headers:
-            headers = ['Produto', 'Valor']  # padrão mínimo
+    async def get_tabela_range(self, ano_inicio: int, ano_fim: int, ignorar_ausentes: bool = False) -> List[Tabela]:
+        """
+        Retorna as tabelas de um intervalo de anos (inclusive), em ordem.
 
-        data = []
-        rows = table.find_all('tr')
-        
-        # Se pegou cabeçalhos na primeira linha, começa da segunda
-        start_idx = 1 if not thead and len(rows) > 1 else 0
-        
-        for row in rows[start_idx:]:
-            cols = row.find_all('td')
-            if cols:
-                row_data = {'ano': ano}  # sempre inclui o ano
-                
-                # Mapeia cada coluna para seu cabeçalho correspondente
-                for i, col in enumerate(cols):
-                    header = headers[i] if i < len(headers) else f'coluna_{i}'
-                    row_data[header] = self._limpar_valor(col.get_text(strip=True))
-                
-                data.append(row_data)
+        Args:
+            ignorar_ausentes: Se True, anos sem tabela na Embrapa são omitidos
+                em vez de interromper a consulta com 404
+        """
+        self._validar_intervalo(ano_inicio, ano_fim)
         
-        return data
+        # Limita quantos anos são buscados ao mesmo tempo no site
+        semaforo = asyncio.Semaphore(SCRAPING_MAX_CONCURRENCY)
+
+        async def scrape_limitado(ano: int) -> Optional[Tabela]:
+            async with semaforo:
+                try:
+                    return await self._scrape_ano(ano)
+                except TabelaNaoEncontrada:
+                    if ignorar_ausentes:
+                        return None
+                    raise
+
+        # gather preserva a ordem dos anos, independente de qual termina primeiro
+        tabelas = await asyncio.gather(
+            *(scrape_limitado(ano) for ano in range(ano_inicio, ano_fim + 1))
+        )
+        return [tabela for tabela in tabelas if tabela is not None]
 
-    def get_data_by_year(self, ano: int) -> List[Dict[str, str]]:
+    async def iter_tabela_range(
+        self, ano_inicio: int, ano_fim: int, ignorar_ausentes: bool = False
+    ) -> AsyncIterator[Tabela]:
+        """
+        Entrega as tabelas de um intervalo de anos em ordem, cada uma assim que
+        fica pronta.
+
+        Mantém no máximo SCRAPING_MAX_CONCURRENCY anos em andamento à frente
+        do ano sendo entregue, então a memória não cresce com o tamanho do intervalo.
+
+        Args:
+            ignorar_ausentes: Se True, anos sem tabela na Embrapa são pulados
+                em vez de interromper a iteração com 404
+        """
+        self._validar_intervalo(ano_inicio, ano_fim)
+        anos = iter(range(ano_inicio, ano_fim + 1))
+        pendentes: "deque[asyncio.Task]" = deque()
+
+        def agendar_proximo() -> None:
+            ano = next(anos, None)
+            if ano is not None:
+                pendentes.append(asyncio.ensure_future(self._scrape_ano(ano)))
+
+        for _ in range(SCRAPING_MAX_CONCURRENCY):
+            agendar_proximo()
+        try:
+            while pendentes:
+                tarefa = pendentes.popleft()
+                agendar_proximo()
+                try:
+                    tabela = await tarefa
+                except TabelaNaoEncontrada:
+                    if ignorar_ausentes:
+                        continue
+                    raise
+                yield tabela
+        finally:
+            # Cliente desconectou ou um ano falhou: não busca os anos restantes
+            for tarefa in pendentes:
+                tarefa.cancel()
+                # Evita o aviso de exceção não lida das buscas que já tinham falhado
+                tarefa.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def get_data_by_year(self, ano: int) -> List[Dict[str, str]]:
         """
         Realiza o scraping e retorna os dados para o ano informado.
         """
-        return self._scrape_ano(ano)
+        # Os registros (dicts) só são montados aqui, na saída
+        return (await self._scrape_ano(ano, prefetch=True)).registros()
 
-    def get_data_range(self, ano_inicio: int, ano_fim: int) -> List[Dict[str, str]]:
+    async def get_data_range(self, ano_inicio: int, ano_fim: int) -> List[Dict[str, str]]:
         """
         Retorna dados de um intervalo de anos (inclusive).
         """
-        if ano_inicio > ano_fim:
+        all_data = []
+        for tabela in await self.get_tabela_range(ano_inicio, ano_fim):
+            all_data.extend(tabela.registros())
+        
+        return all_data
+
+    def _responder_consulta(
+        self, tabelas: List[Tabela], consulta: Optional[Consulta], headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        inicio = time.perf_counter()
+        headers = dict(headers or {})
+        if consulta is None or consulta.vazia:
+            resposta = responder_tabelas(tabelas, headers)
+        else:
+            selecionadas, proximo = consulta.aplicar(tabelas)
+            if proximo:
+                headers["X-Next-Cursor"] = proximo
+            resposta = responder_tabelas(selecionadas, headers)
+        self.metricas.observar("resposta", inicio)
+        return resposta
+
+    async def get_response_by_year(self, ano: int, consulta: Optional[Consulta] = None) -> Response:
+        """
+        Resposta JSON pronta (com ETag) para o ano informado, a partir do JSON
+        já serializado que fica em cache junto da tabela.
+
+        Com filtro, projeção ou paginação (consulta), só as linhas e colunas
+        pedidas são serializadas.
+        """
+        return self._responder_consulta([await self._scrape_ano(ano, prefetch=True)], consulta)
+
+    async def get_response_range(
+        self, ano_inicio: int, ano_fim: int, accept: Optional[str] = None, consulta: Optional[Consulta] = None
+    ) -> Response:
+        """
+        Resposta para um intervalo de anos (inclusive), no formato pedido no
+        cabeçalho Accept: JSON pronto (com ETag) ou, para NDJSON e CSV, em
+        streaming, enviando cada ano assim que ele fica pronto.
+
+        Filtro e projeção valem para todos os formatos; a paginação, só para JSON.
+        Como a mesma URL tem várias representações, toda resposta leva Vary: Accept.
+        """
+        formato = negociar_formato(accept)
+        if formato != FORMATO_JSON and consulta is not None and consulta.paginada:
             raise HTTPException(
                 status_code=400,
-                detail="Ano inicial deve ser menor ou igual ao ano final"
+                detail="Paginação (limite/cursor) só está disponível para respostas JSON"
             )
-        
-        all_data = []
-        for ano in range(ano_inicio, ano_fim + 1):
-            all_data.extend(self._scrape_ano(ano))
-        
-        return all_data
\ No newline at end of file
+
+        self._validar_intervalo(ano_inicio, ano_fim)
+        if formato == FORMATO_JSON:
+            if consulta is not None and consulta.cursor is not None:
+                # Páginas seguintes não precisam dos anos anteriores ao cursor
+                ano_inicio = max(ano_inicio, consulta.cursor[0])
+            tabelas = await self.get_tabela_range(ano_inicio, ano_fim) if ano_inicio <= ano_fim else []
+            return self._responder_consulta(tabelas, consulta, VARY_ACCEPT)
+
+        # Os anos são enviados em ordem assim que ficam prontos (com no máximo
+        # SCRAPING_MAX_CONCURRENCY buscas à frente), para o primeiro byte não
+        # esperar o último ano. Anos sem tabela na Embrapa são pulados. O primeiro
+        # ano é aguardado antes do status, para que erros nele (Embrapa fora do ar,
+        # nenhum ano com dados) ainda virem o status HTTP; falhas em anos seguintes
+        # são informadas no próprio corpo (ver streaming.responder_stream)
+        tabelas = self.iter_tabela_range(ano_inicio, ano_fim, ignorar_ausentes=True)
+        try:
+            primeira = await anext(tabelas)
+        except StopAsyncIteration:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Nenhuma tabela encontrada entre {ano_inicio} e {ano_fim}"
+            )
+        filtrar = consulta is not None and not consulta.vazia
+        if filtrar:
+            consulta.validar_colunas([primeira])
+
+        async def todas() -> AsyncIterator[Tabela]:
+            try:
+                yield consulta.selecionar(primeira) if filtrar else primeira
+                async for tabela in tabelas:
+                    yield consulta.selecionar(tabela) if filtrar else tabela
+            finally:
+                await tabelas.aclose()
+
+        # Last-Modified depende de todos os anos, então só vai o Cache-Control
+        headers = {**cache_headers_anos(range(ano_inicio, ano_fim + 1)), **VARY_ACCEPT}
+        return responder_stream(todas(), formato, headers)
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalescência de chamadas concorrentes (single-flight).
+
+        Enquanto uma chamada para uma chave está em andamento, as demais
+        chamadas com a mesma chave aguardam o mesmo resultado em vez de
+        repetir o trabalho. Erros são propagados para todos os chamadores.
+        """
+        self._em_voo: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+        # Contadores para acompanhamento
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, chave: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Executa func uma única vez por chave entre chamadores concorrentes"""
+        task = self._em_voo.get(chave)
+        if task is None:
+            # A execução roda numa task própria: se o primeiro chamador for
+            # cancelado (ex: cliente desconectou), os demais não são afetados
+            task = asyncio.ensure_future(func())
+            self._em_voo[chave] = task
+            task.add_done_callback(lambda t: self._finalizar(chave, t))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def is_in_flight(self, chave: Hashable) -> bool:
+        """Indica se já existe uma execução em andamento para a chave"""
+        return chave in self._em_voo
+
+    def in_flight(self) -> int:
+        """Quantidade de chaves com execução em andamento"""
+        return len(self._em_voo)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight(),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+    def _finalizar(self, chave: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._em_voo.get(chave) is task:
+            del self._em_voo[chave]
+        # Marca a exceção como consumida caso todos os chamadores tenham sido cancelados
+        if not task.cancelled():
+            task.exception()
+
+
+# Instância compartilhada pelos serviços de scraping, com chave (url_param, ano)
+scraping_singleflight = SingleFlight()
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import logging
+import os
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from .datasets import DATASETS
+from .scraping_service import SCRAPING_MAX_CONCURRENCY
+from .snapshot_store import snapshot_store
+
+# Carrega variáveis do .env
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Primeiro ano disponível no VitiBrasil
+ANO_INICIAL = 1970
+
+# Intervalo (s) entre atualizações e quantos anos recentes são re-scrapeados
+SNAPSHOT_REFRESH_INTERVAL = int(os.getenv("SNAPSHOT_REFRESH_INTERVAL", str(6 * 60 * 60)))
+SNAPSHOT_REFRESH_YEARS = int(os.getenv("SNAPSHOT_REFRESH_YEARS", "2"))
+
+
+async def sincronizar(
+    anos: Iterable[int],
+    datasets: Optional[Iterable[str]] = None,
+    forcar: bool = False,
+) -> Dict[str, int]:
+    """
+    Percorre os datasets e anos informados gravando as tabelas no snapshot local.
+
+    Args:
+        anos: Anos a sincronizar
+        datasets: Nomes dos datasets (padrão: todos)
+        forcar: Se True, re-scrapeia mesmo os anos que já estão no snapshot
+
+    Returns:
+        Contagem de anos atualizados, ignorados (já salvos) e com erro
+    """
+    if snapshot_store is None:
+        raise RuntimeError("SNAPSHOT_DB_PATH não configurado")
+
+    anos = list(anos)
+    services = [DATASETS[nome] for nome in (datasets or DATASETS)]
+    semaforo = asyncio.Semaphore(SCRAPING_MAX_CONCURRENCY)
+    resultado = {"atualizados": 0, "ignorados": 0, "erros": 0}
+
+    async def sincronizar_ano(service, ano: int, salvos: set) -> None:
+        if not forcar and ano in salvos:
+            resultado["ignorados"] += 1
+            return
+        async with semaforo:
+            try:
+                await service.atualizar_ano(ano)
+                resultado["atualizados"] += 1
+            except HTTPException as e:
+                # Alguns anos não têm tabela (ou o site falhou): segue com os demais
+                resultado["erros"] += 1
+                logger.warning("Snapshot %s/%s não atualizado: %s", service.nome, ano, e.detail)
+
+    for service in services:
+        salvos = set(await asyncio.to_thread(snapshot_store.anos, service.url_param))
+        await asyncio.gather(*(sincronizar_ano(service, ano, salvos) for ano in anos))
+
+    return resultado
+
+
+async def atualizar_anos_recentes() -> Dict[str, int]:
+    """Re-scrapeia apenas os anos recentes, que ainda podem mudar na Embrapa"""
+    ano_atual = date.today().year
+    anos = range(ano_atual - SNAPSHOT_REFRESH_YEARS + 1, ano_atual + 1)
+    return await sincronizar(anos, forcar=True)
+
+
+async def loop_atualizacao() -> None:
+    """Tarefa de fundo que atualiza periodicamente os anos recentes do snapshot"""
+    while True:
+        await asyncio.sleep(SNAPSHOT_REFRESH_INTERVAL)
+        try:
+            resultado = await atualizar_anos_recentes()
+            logger.info("Snapshot atualizado: %s", resultado)
+        except Exception:
+            logger.exception("Falha ao atualizar o snapshot")
+
+
+if __name__ == "__main__":
+    # Carga completa do snapshot: python -m services.snapshot_service (a partir de app/)
+    parser = argparse.ArgumentParser(description="Sincroniza o snapshot local dos datasets do VitiBrasil")
+    parser.add_argument("--ano-inicio", type=int, default=ANO_INICIAL)
+    parser.add_argument("--ano-fim", type=int, default=date.today().year)
+    parser.add_argument("--dataset", action="append", choices=sorted(DATASETS), help="Dataset a sincronizar (padrão: todos)")
+    parser.add_argument("--forcar", action="store_true", help="Re-scrapeia anos já salvos")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        from .http_client import close_http_client
+        try:
+            print(await sincronizar(range(args.ano_inicio, args.ano_fim + 1), args.dataset, args.forcar))
+        finally:
+            await close_http_client()
+
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from .tabela import Tabela
+
+# Carrega variáveis do .env
+load_dotenv()
+
+# Caminho do arquivo SQLite com o snapshot local dos datasets (vazio desativa)
+SNAPSHOT_DB_PATH = os.getenv("SNAPSHOT_DB_PATH", "")
+
+
+class SnapshotStore:
+    def __init__(self, path: str):
+        """
+        Armazenamento local (SQLite) das tabelas já extraídas do VitiBrasil.
+
+        Serve como fonte primária de leitura para o ScrapingService, de modo
+        que a API continua respondendo mesmo com o site da Embrapa fora do ar.
+
+        Args:
+            path: Caminho do arquivo SQLite
+        """
+        self.path = path
+        self._local = threading.local()
+        self._criar_tabela()
+
+    def _conexao(self) -> sqlite3.Connection:
+        # sqlite3 não compartilha conexões entre threads: uma por thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _criar_tabela(self) -> None:
+        with self._conexao() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    url_param TEXT NOT NULL,
+                    ano INTEGER NOT NULL,
+                    dados TEXT NOT NULL,
+                    atualizado_em REAL NOT NULL,
+                    PRIMARY KEY (url_param, ano)
+                )
+            """)
+
+    def get(self, url_param: str, ano: int) -> Optional[Tabela]:
+        """Retorna a tabela salva para o dataset/ano ou None"""
+        row = self._conexao().execute(
+            "SELECT dados FROM snapshots WHERE url_param = ? AND ano = ?",
+            (url_param, ano),
+        ).fetchone()
+        if not row:
+            return None
+        dados = json.loads(row[0])
+        # Snapshots gravados antes do formato colunar guardam a lista de registros
+        if isinstance(dados, list):
+            return Tabela.from_registros(ano, dados)
+        return Tabela.from_dict(dados)
+
+    def put(self, url_param: str, ano: int, tabela: Tabela) -> None:
+        """Grava (ou substitui) a tabela do dataset/ano"""
+        with self._conexao() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (url_param, ano, dados, atualizado_em) "
+                "VALUES (?, ?, ?, ?)",
+                (url_param, ano, json.dumps(tabela.to_dict()), time.time()),
+            )
+
+    def anos(self, url_param: str) -> List[int]:
+        """Anos já salvos para um dataset"""
+        rows = self._conexao().execute(
+            "SELECT ano FROM snapshots WHERE url_param = ? ORDER BY ano",
+            (url_param,),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    # As versões assíncronas rodam o SQLite numa thread para não bloquear o event loop
+    async def aget(self, url_param: str, ano: int) -> Optional[Tabela]:
+        return await asyncio.to_thread(self.get, url_param, ano)
+
+    async def aput(self, url_param: str, ano: int, tabela: Tabela) -> None:
+        await asyncio.to_thread(self.put, url_param, ano, tabela)
+
+
+# Instância compartilhada (None quando SNAPSHOT_DB_PATH não está configurado)
+snapshot_store: Optional[SnapshotStore] = SnapshotStore(SNAPSHOT_DB_PATH) if SNAPSHOT_DB_PATH else None
@@ -0,0 +1,91 @@
+import csv
+import io
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from .tabela import Tabela, serializar_json
+
+# Formatos das consultas por intervalo, escolhidos pelo cabeçalho Accept
+FORMATO_JSON = "application/json"
+FORMATO_NDJSON = "application/x-ndjson"
+FORMATO_CSV = "text/csv"
+FORMATOS = (FORMATO_JSON, FORMATO_NDJSON, FORMATO_CSV)
+
+logger = logging.getLogger(__name__)
+
+
+def negociar_formato(accept: Optional[str]) -> str:
+    """
+    Escolhe o formato da resposta a partir do cabeçalho Accept.
+
+    Considera os pesos (q=) e, no empate, a ordem de FORMATOS; sem Accept,
+    com */* ou sem nenhum formato suportado, responde JSON.
+    """
+    melhor, melhor_q = FORMATO_JSON, 0.0
+    for item in (accept or "").split(","):
+        tipo, *parametros = (parte.strip() for parte in item.split(";"))
+        q = 1.0
+        for parametro in parametros:
+            nome, _, valor = parametro.partition("=")
+            if nome.strip() == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        # application/ndjson também é usado por alguns clientes
+        tipo = FORMATO_NDJSON if tipo == "application/ndjson" else tipo
+        if tipo in FORMATOS and q > melhor_q:
+            melhor, melhor_q = tipo, q
+    return melhor
+
+
+async def _ndjson(tabelas: AsyncIterator[Tabela]) -> AsyncIterator[bytes]:
+    try:
+        async for tabela in tabelas:
+            if len(tabela):
+                yield b"\n".join(serializar_json(registro) for registro in tabela.registros()) + b"\n"
+    except Exception as e:
+        # O status 200 já foi enviado: a falha vai como última linha do corpo
+        if isinstance(e, HTTPException):
+            erro = {"status": e.status_code, "detail": e.detail}
+        else:
+            logger.exception("Falha durante o streaming NDJSON")
+            erro = {"status": 500, "detail": "Erro interno ao gerar a resposta"}
+        yield serializar_json({"erro": erro}) + b"\n"
+
+
+async def _csv(tabelas: AsyncIterator[Tabela]) -> AsyncIterator[bytes]:
+    # As colunas do CSV são as do primeiro ano; nos demais, os valores são
+    # alinhados pelo nome da coluna (colunas ausentes ficam vazias).
+    # O CSV não tem como representar um erro: uma falha num ano interrompe o
+    # corpo (sem o fim do chunked), e o cliente vê a resposta como incompleta
+    colunas = None
+    async for tabela in tabelas:
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer, lineterminator="\n")
+        if colunas is None:
+            colunas = tabela.headers
+            escritor.writerow(("ano", *colunas))
+        if tabela.headers == colunas:
+            linhas = tabela.iter_linhas()
+        else:
+            posicoes = [tabela.headers.index(c) if c in tabela.headers else None for c in colunas]
+            linhas = ([linha[i] if i is not None else None for i in posicoes] for linha in tabela.iter_linhas())
+        escritor.writerows((tabela.ano, *("" if v is None else v for v in linha)) for linha in linhas)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def responder_stream(tabelas: AsyncIterator[Tabela], formato: str, headers: Optional[dict] = None) -> StreamingResponse:
+    """
+    Resposta em streaming (NDJSON ou CSV): cada ano é serializado e enviado
+    assim que fica pronto, sem montar o corpo inteiro em memória.
+
+    Uma falha depois do início da resposta vira, no NDJSON, uma última linha
+    {"erro": {"status": ..., "detail": ...}}; no CSV, interrompe o corpo.
+    """
+    corpo = _ndjson(tabelas) if formato == FORMATO_NDJSON else _csv(tabelas)
+    media_type = FORMATO_NDJSON if formato == FORMATO_NDJSON else "text/csv; charset=utf-8"
+    return StreamingResponse(corpo, media_type=media_type, headers=headers)
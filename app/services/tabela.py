@@ -0,0 +1,286 @@
+import hashlib
+import json
+import sys
+import time
+import unicodedata
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, usa o json da biblioteca padrão
+    orjson = None
+
+# Tipos possíveis de coluna após a normalização
+TIPO_INT = "int"
+TIPO_FLOAT = "float"
+TIPO_STR = "str"
+
+# Typecode do array usado por cada tipo numérico
+_TYPECODES = {TIPO_INT: "q", TIPO_FLOAT: "d"}
+
+# Cabeçalhos já vistos: tabelas com os mesmos cabeçalhos compartilham a mesma tupla
+_CABECALHOS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _compartilhar_cabecalhos(headers: Sequence[str]) -> Tuple[str, ...]:
+    chave = tuple(sys.intern(h) for h in headers)
+    return _CABECALHOS.setdefault(chave, chave)
+
+
+def serializar_json(valor: Any) -> bytes:
+    """Mesmo JSON que o FastAPI geraria (UTF-8, sem escapar acentos), só que compacto"""
+    if orjson is not None:
+        return orjson.dumps(valor)
+    return json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def normalizar_chave(texto: str) -> str:
+    """Forma usada nas buscas: sem acentos, sem diferenciar maiúsculas e sem espaços nas pontas"""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold().strip()
+
+
+def _compactar_coluna(tipo: str, valores: Sequence[Any]) -> Tuple[Any, Optional[array]]:
+    """
+    Converte uma coluna de valores na forma compacta.
+
+    Colunas numéricas viram um array tipado (8 bytes por valor, sem objetos
+    Python) mais os índices das células vazias; colunas de texto viram uma
+    tupla de strings internadas (nomes de países e produtos se repetem em
+    todos os anos e passam a existir uma única vez na memória).
+    """
+    typecode = _TYPECODES.get(tipo)
+    if typecode is None:
+        return tuple(sys.intern(v) if isinstance(v, str) else v for v in valores), None
+
+    nulos = array("I", (i for i, v in enumerate(valores) if v is None))
+    coluna = array(typecode, (0 if v is None else v for v in valores))
+    return coluna, (nulos or None)
+
+
+def _inferir_tipo(valores: Sequence[Any]) -> str:
+    # Usado para dados antigos em formato de registros, que não guardam o tipo
+    presentes = [v for v in valores if v is not None]
+    if presentes and all(isinstance(v, int) and not isinstance(v, bool) for v in presentes):
+        return TIPO_INT
+    if presentes and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in presentes):
+        return TIPO_FLOAT
+    return TIPO_STR
+
+
+class Tabela:
+    """
+    Tabela de um dataset/ano em formato colunar.
+
+    Os cabeçalhos ficam uma única vez (tupla compartilhada entre anos) e cada
+    coluna é armazenada compactada, em vez de uma lista de dicts que repete
+    as chaves e o ano em todas as linhas. Os registros (dicts) só são
+    montados na resposta, com registros().
+    """
+
+    __slots__ = (
+        "ano", "headers", "tipos", "colunas", "nulos", "linhas", "hierarquia", "larguras", "atualizado_em",
+        "_json", "_etag", "_indice",
+    )
+
+    def __init__(
+        self,
+        ano: int,
+        headers: Sequence[str],
+        tipos: Sequence[str],
+        colunas: Sequence[Sequence[Any]],
+        atualizado_em: Optional[float] = None,
+        hierarquia: Optional[Sequence[int]] = None,
+        larguras: Optional[Sequence[int]] = None,
+    ):
+        """
+        Args:
+            ano: Ano da tabela (incluído em cada registro)
+            headers: Nome de cada coluna
+            tipos: Tipo de cada coluna (TIPO_INT, TIPO_FLOAT ou TIPO_STR)
+            colunas: Valores de cada coluna (None para células vazias)
+            atualizado_em: Momento (epoch) em que a tabela foi extraída (padrão: agora)
+            hierarquia: Nas tabelas com categorias e subitens, a posição da linha
+                da categoria de cada linha (-1 no primeiro nível); None nas demais.
+                Não aparece nos registros: é usada pelas agregações
+            larguras: Quantidade de células de cada linha, quando há linhas mais
+                curtas que os cabeçalhos; as células que faltam ficam fora dos
+                registros (None = todas as linhas completas)
+        """
+        self.ano = ano
+        self.atualizado_em = atualizado_em if atualizado_em is not None else time.time()
+        self.headers = _compartilhar_cabecalhos(headers)
+        self.tipos = tuple(sys.intern(t) for t in tipos)
+        compactas = [_compactar_coluna(tipo, valores) for tipo, valores in zip(self.tipos, colunas)]
+        self.colunas = tuple(coluna for coluna, _ in compactas)
+        self.nulos = tuple(nulos for _, nulos in compactas)
+        self.linhas = len(self.colunas[0]) if self.colunas else 0
+        self.hierarquia = array("i", hierarquia) if hierarquia is not None else None
+        self.larguras = array("H", larguras) if larguras is not None else None
+        self._json: Optional[bytes] = None
+        self._etag: Optional[str] = None
+        self._indice: Optional[Dict[str, array]] = None
+
+    def __len__(self) -> int:
+        return self.linhas
+
+    def __eq__(self, outra: object) -> bool:
+        if not isinstance(outra, Tabela):
+            return NotImplemented
+        return (self.ano, self.headers, self.tipos, self.larguras) == (
+            outra.ano, outra.headers, outra.tipos, outra.larguras
+        ) and all(
+            a == b for a, b in zip(self.valores(), outra.valores())
+        )
+
+    def valores(self) -> List[list]:
+        """Valores de cada coluna como listas de objetos Python (None nas células vazias)"""
+        resultado = []
+        for coluna, nulos in zip(self.colunas, self.nulos):
+            valores = coluna.tolist() if isinstance(coluna, array) else list(coluna)
+            for i in nulos or ():
+                valores[i] = None
+            resultado.append(valores)
+        return resultado
+
+    def iter_linhas(self) -> Iterator[tuple]:
+        """Percorre as linhas como tuplas de valores, na ordem dos cabeçalhos"""
+        return zip(*self.valores())
+
+    def registros(self) -> List[Dict[str, Any]]:
+        """Materializa os registros (um dict por linha, com o ano) para a resposta"""
+        ano, headers = self.ano, self.headers
+        if self.larguras is None:
+            return [{'ano': ano, **dict(zip(headers, linha))} for linha in self.iter_linhas()]
+        # Linhas mais curtas só têm as chaves das células presentes na página
+        return [
+            {'ano': ano, **dict(zip(headers[:w], linha))} for w, linha in zip(self.larguras, self.iter_linhas())
+        ]
+
+    def json_registros(self) -> bytes:
+        """
+        Registros serializados em JSON, sem os colchetes do array, para que as
+        respostas de vários anos sejam apenas a concatenação dos anos.
+
+        Calculado uma vez e guardado junto da tabela em cache.
+        """
+        if self._json is None:
+            self._json = serializar_json(self.registros())[1:-1]
+        return self._json
+
+    @property
+    def etag(self) -> str:
+        """ETag (forte) do JSON da tabela"""
+        if self._etag is None:
+            self._etag = '"' + hashlib.blake2b(self.json_registros(), digest_size=16).hexdigest() + '"'
+        return self._etag
+
+    @property
+    def coluna_chave(self) -> Optional[int]:
+        """Posição da coluna que identifica a linha (produto, cultivar ou país): a primeira de texto"""
+        return next((j for j, tipo in enumerate(self.tipos) if tipo == TIPO_STR), None)
+
+    def indice(self) -> Dict[str, array]:
+        """
+        Índice da coluna chave: valor normalizado (normalizar_chave) -> posições
+        das linhas. Calculado uma vez e guardado junto da tabela em cache.
+        """
+        if self._indice is None:
+            indice: Dict[str, array] = {}
+            j = self.coluna_chave
+            if j is not None:
+                for i, valor in enumerate(self.colunas[j]):
+                    if valor is not None:
+                        indice.setdefault(normalizar_chave(valor), array("I")).append(i)
+            self._indice = indice
+        return self._indice
+
+    def buscar(self, chaves: Sequence[str]) -> List[int]:
+        """Posições (em ordem) das linhas cuja coluna chave é igual a alguma das chaves"""
+        indice = self.indice()
+        return sorted({i for chave in chaves for i in indice.get(normalizar_chave(chave), ())})
+
+    def selecionar(self, linhas: Optional[Sequence[int]] = None, colunas: Optional[Sequence[int]] = None) -> "Tabela":
+        """
+        Nova tabela só com as linhas e colunas informadas (por posição; None = todas).
+
+        O custo é proporcional ao tamanho da seleção, não ao da tabela. A
+        hierarquia só é mantida quando todas as linhas são selecionadas. As
+        colunas devem vir na ordem da tabela, como em Consulta.selecionar.
+        """
+        posicoes = range(self.linhas) if linhas is None else linhas
+        js = range(len(self.headers)) if colunas is None else colunas
+        valores = []
+        for j in js:
+            coluna, nulos = self.colunas[j], set(self.nulos[j] or ())
+            valores.append([None if i in nulos else coluna[i] for i in posicoes])
+        return Tabela(
+            self.ano,
+            [self.headers[j] for j in js],
+            [self.tipos[j] for j in js],
+            valores,
+            self.atualizado_em,
+            self.hierarquia if linhas is None else None,
+            self._larguras_selecao(posicoes, js),
+        )
+
+    def _larguras_selecao(self, posicoes: Sequence[int], js: Sequence[int]) -> Optional[List[int]]:
+        # Numa linha com w células, as colunas presentes são as de posição < w
+        if self.larguras is None:
+            return None
+        larguras = [sum(1 for j in js if j < self.larguras[i]) for i in posicoes]
+        return None if all(w == len(js) for w in larguras) else larguras
+
+    def tamanho_estimado(self) -> int:
+        """Memória (bytes) ocupada pela tabela, sem contar strings compartilhadas"""
+        tamanho = sys.getsizeof(self) + sys.getsizeof(self.colunas) + sys.getsizeof(self.nulos)
+        if self.hierarquia is not None:
+            tamanho += sys.getsizeof(self.hierarquia)
+        if self.larguras is not None:
+            tamanho += sys.getsizeof(self.larguras)
+        if self._json is not None:
+            tamanho += sys.getsizeof(self._json)
+        if self._indice is not None:
+            tamanho += sys.getsizeof(self._indice) + sum(
+                sys.getsizeof(chave) + sys.getsizeof(posicoes) for chave, posicoes in self._indice.items()
+            )
+        for coluna, nulos in zip(self.colunas, self.nulos):
+            tamanho += sys.getsizeof(coluna) + (sys.getsizeof(nulos) if nulos is not None else 0)
+        return tamanho
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma serializável em JSON (Redis e snapshot local)"""
+        dados = {
+            "ano": self.ano,
+            "headers": list(self.headers),
+            "tipos": list(self.tipos),
+            "colunas": self.valores(),
+            "atualizado_em": self.atualizado_em,
+        }
+        if self.hierarquia is not None:
+            dados["hierarquia"] = self.hierarquia.tolist()
+        if self.larguras is not None:
+            dados["larguras"] = self.larguras.tolist()
+        return dados
+
+    @classmethod
+    def from_dict(cls, dados: Dict[str, Any]) -> "Tabela":
+        # Tabelas gravadas antes da hierarquia não a trazem (agregadas num só nível)
+        return cls(
+            dados["ano"], dados["headers"], dados["tipos"], dados["colunas"],
+            dados.get("atualizado_em"), dados.get("hierarquia"), dados.get("larguras"),
+        )
+
+    @classmethod
+    def from_registros(cls, ano: int, registros: List[Dict[str, Any]]) -> "Tabela":
+        """Converte registros no formato antigo (lista de dicts com 'ano') em Tabela"""
+        headers: Dict[str, None] = {}
+        for registro in registros:
+            headers.update(dict.fromkeys(k for k in registro if k != 'ano'))
+        colunas = [[registro.get(h) for registro in registros] for h in headers]
+        # Registros de linhas mais curtas não têm as últimas chaves
+        larguras = [sum(1 for k in registro if k != 'ano') for registro in registros]
+        if all(w == len(headers) for w in larguras):
+            larguras = None
+        return cls(ano, list(headers), [_inferir_tipo(c) for c in colunas], colunas, larguras=larguras)
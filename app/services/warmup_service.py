@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import os
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from .datasets import DATASETS
+from .prefetch import aguardar_folga
+
+# Carrega variáveis do .env
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Datasets aquecidos ao iniciar a aplicação, separados por vírgula ("*" = todos; vazio desativa)
+WARMUP_DATASETS = os.getenv("WARMUP_DATASETS", "")
+
+# Anos aquecidos: lista e/ou intervalos (ex: "2015-2023" ou "2020,2022"); vazio = os WARMUP_RECENT_YEARS mais recentes
+WARMUP_ANOS = os.getenv("WARMUP_ANOS", "")
+WARMUP_RECENT_YEARS = int(os.getenv("WARMUP_RECENT_YEARS", "5"))
+
+# Anos buscados ao mesmo tempo durante o aquecimento
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "2"))
+
+# Progresso do aquecimento em andamento (ou do último), exposto em /cache/stats
+_progresso: Dict[str, int] = {"total": 0, "carregados": 0, "em_cache": 0, "erros": 0}
+
+
+def datasets_aquecimento(valor: str = WARMUP_DATASETS) -> List[str]:
+    """Nomes dos datasets configurados em WARMUP_DATASETS (nomes desconhecidos são ignorados)"""
+    nomes = [nome.strip() for nome in valor.split(",") if nome.strip()]
+    if "*" in nomes:
+        return list(DATASETS)
+    desconhecidos = [nome for nome in nomes if nome not in DATASETS]
+    if desconhecidos:
+        logger.warning("WARMUP_DATASETS: datasets desconhecidos ignorados: %s", ", ".join(desconhecidos))
+    return [nome for nome in nomes if nome in DATASETS]
+
+
+def anos_aquecimento(valor: str = WARMUP_ANOS) -> List[int]:
+    """Anos configurados em WARMUP_ANOS, do mais recente para o mais antigo"""
+    anos = set()
+    for parte in (p.strip() for p in valor.split(",")):
+        if not parte:
+            continue
+        inicio, _, fim = parte.partition("-")
+        anos.update(range(int(inicio), int(fim or inicio) + 1))
+    if not anos:
+        ano_atual = date.today().year
+        anos.update(range(ano_atual - WARMUP_RECENT_YEARS + 1, ano_atual + 1))
+    return sorted(anos, reverse=True)
+
+
+async def aquecer(datasets: Optional[Iterable[str]] = None, anos: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """
+    Carrega no cache os anos e datasets informados (padrão: a configuração WARMUP_*).
+
+    Os anos mais recentes, os mais consultados, vêm primeiro. Cada busca
+    espera a Embrapa ter folga, então o aquecimento não atrasa as
+    requisições dos usuários, que são atendidas normalmente enquanto ele roda.
+    """
+    services = [DATASETS[nome] for nome in (datasets_aquecimento() if datasets is None else datasets)]
+    anos = anos_aquecimento() if anos is None else list(anos)
+    semaforo = asyncio.Semaphore(WARMUP_CONCURRENCY)
+    _progresso.update(total=len(services) * len(anos), carregados=0, em_cache=0, erros=0)
+
+    async def aquecer_ano(service, ano: int) -> None:
+        async with semaforo:
+            await aguardar_folga()
+            try:
+                carregado = await service.aquecer_ano(ano)
+            except HTTPException as e:
+                # Alguns anos não têm tabela (ou o site falhou): segue com os demais
+                _progresso["erros"] += 1
+                logger.debug("Aquecimento de %s/%s falhou: %s", service.nome, ano, e.detail)
+                return
+            _progresso["carregados" if carregado else "em_cache"] += 1
+
+    await asyncio.gather(*(aquecer_ano(service, ano) for ano in anos for service in services))
+    return dict(_progresso)
+
+
+async def tarefa_aquecimento() -> None:
+    """Tarefa de fundo iniciada no lifespan: aquece o cache sem atrasar o início da aplicação"""
+    try:
+        resultado = await aquecer()
+        logger.info("Aquecimento do cache concluído: %s", resultado)
+    except Exception:
+        logger.exception("Falha no aquecimento do cache")
+
+
+def aquecimento_stats() -> Dict[str, int]:
+    return dict(_progresso)
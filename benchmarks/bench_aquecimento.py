@@ -0,0 +1,123 @@
+"""
+Benchmark de partida a frio: latência logo após um deploy, com o cache vazio.
+
+Simula uma onda de consultas por ano (painéis pedindo sobretudo os anos
+recentes, e anos vizinhos em sequência) contra uma Embrapa com latência
+fixa, em três cenários:
+
+- frio: sem aquecimento nem prefetch
+- prefetch: misses agendam os anos vizinhos
+- aquecimento + prefetch: os anos recentes são carregados em segundo plano
+  a partir do início (como WARMUP_DATASETS/WARMUP_ANOS no lifespan)
+
+Mostra p50/p95 por janela de tempo e a latência de referência com o cache quente.
+As páginas da Embrapa são simuladas (benchmarks/paginas.py), sem acesso à rede.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_aquecimento.py [--latencia 0.3] [--requisicoes 300]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from paginas import pagina_paises  # noqa: E402
+from services import http_client, warmup_service  # noqa: E402
+from services.cache_service import scraping_cache  # noqa: E402
+from services.importacao_service import importacao_service_vinhos_mesa as service  # noqa: E402
+from services.prefetch import prefetcher  # noqa: E402
+
+ANO_FIM = 2023
+
+
+def percentil(valores: List[float], p: float) -> float:
+    return statistics.quantiles(valores, n=100)[int(p) - 1] if len(valores) > 1 else valores[0]
+
+
+def gerar_consultas(n: int, semente: int = 42) -> List[int]:
+    """Anos consultados: na maior parte os 10 mais recentes, percorridos em sequência"""
+    aleatorio = random.Random(semente)
+    anos, ano = [], ANO_FIM
+    for _ in range(n):
+        if aleatorio.random() < 0.6:
+            ano = max(1970, ano - 1) if ano > ANO_FIM - 10 else ANO_FIM
+        else:
+            ano = ANO_FIM - int(aleatorio.expovariate(1 / 6)) % 50
+        anos.append(ano)
+    return anos
+
+
+async def cenario(anos: List[int], intervalo: float, aquecer: bool, prefetch: bool) -> List[Tuple[float, float]]:
+    await scraping_cache.invalidate()
+    prefetcher.vizinhos = 1 if prefetch else 0
+    prefetcher.iniciar()
+    tarefa = None
+    if aquecer:
+        tarefa = asyncio.create_task(warmup_service.aquecer([service.nome], range(ANO_FIM, ANO_FIM - 15, -1)))
+
+    amostras: List[Tuple[float, float]] = []
+    inicio = time.perf_counter()
+
+    async def consultar(ano: int) -> None:
+        t = time.perf_counter()
+        await service.get_response_by_year(ano)
+        amostras.append((t - inicio, (time.perf_counter() - t) * 1000))
+
+    consultas = []
+    for ano in anos:
+        consultas.append(asyncio.create_task(consultar(ano)))
+        await asyncio.sleep(intervalo)
+    await asyncio.gather(*consultas)
+    if tarefa is not None:
+        await tarefa
+    await prefetcher.parar()
+    return amostras
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencia", type=float, default=0.3, help="Latência simulada da Embrapa (s)")
+    parser.add_argument("--requisicoes", type=int, default=300)
+    parser.add_argument("--intervalo", type=float, default=0.02, help="Intervalo entre requisições (s)")
+    parser.add_argument("--janelas", type=int, default=3)
+    args = parser.parse_args()
+
+    async def embrapa(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(args.latencia)
+        return httpx.Response(200, content=pagina_paises(int(request.url.params["ano"])))
+
+    http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(embrapa))
+    anos = gerar_consultas(args.requisicoes)
+    duracao = args.requisicoes * args.intervalo
+
+    cenarios = [("frio", False, False), ("prefetch", False, True), ("aquecimento + prefetch", True, True)]
+    print(f"{args.requisicoes} consultas em {duracao:.1f}s, Embrapa com {args.latencia * 1000:.0f} ms de latência\n")
+    print(f"{'cenário':<24} " + " ".join(f"{f'janela {i + 1} p50/p95 (ms)':>26}" for i in range(args.janelas)))
+    for nome, aquecer, prefetch in cenarios:
+        amostras = await cenario(anos, args.intervalo, aquecer, prefetch)
+        colunas = []
+        for i in range(args.janelas):
+            janela = [ms for t, ms in amostras if i * duracao / args.janelas <= t < (i + 1) * duracao / args.janelas]
+            colunas.append(f"{percentil(janela, 50):>12.1f} / {percentil(janela, 95):>9.1f}" if janela else " " * 26)
+        print(f"{nome:<24} " + " ".join(f"{c:>26}" for c in colunas))
+
+    quente = []
+    for ano in anos[:100]:
+        t = time.perf_counter()
+        await service.get_response_by_year(ano)
+        quente.append((time.perf_counter() - t) * 1000)
+    print(f"\ncache quente: p50 {percentil(quente, 50):.2f} ms, p95 {percentil(quente, 95):.2f} ms")
+
+    await http_client.close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,253 @@
+"""
+Teste de carga de ponta a ponta: usuários virtuais autenticados (JWT) fazendo
+uma mistura de consultas (ano, intervalo, filtro, NDJSON e agregação) pelo
+tempo configurado, com a Embrapa substituída pelo servidor local
+(benchmarks/vitibrasil_local.py) com latência e falhas injetadas.
+
+Por padrão a aplicação roda neste processo (httpx.ASGITransport, com o
+lifespan e um banco SQLite temporário) e o servidor local sobe num processo
+separado; o cache começa vazio. Com --url, mede uma API já no ar, que deve
+estar com VITIBRASIL_BASE_URL apontando para um servidor local.
+
+Mostra vazão, taxa de erros e latência (p50/p95/p99) por tipo de consulta;
+--saida grava o resultado em JSON.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_carga.py [--usuarios 20] [--duracao 30] [--latencia 0.2] [--taxa-erro 0.01]
+    python benchmarks/bench_carga.py --url http://localhost:8000 --usuario bench --senha bench123
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import httpx
+
+from vitibrasil_local import ServidorLocal, ULTIMO_ANO
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+API_PREFIX = "/api/v1"
+
+# Rota de cada dataset (consulta por ano: <rota>/{year}; por intervalo: <rota>?ano_inicio=&ano_fim=)
+ROTAS = {
+    "producao": "/producao",
+    "processamento_viniferas": "/processamento/viniferas",
+    "processamento_americanas": "/processamento/americanas",
+    "processamento_uvas": "/processamento/uvas",
+    "processamento_sem_classificacao": "/processamento/semClass",
+    "comercializacao": "/comercializacao",
+    "importacao_vinhos_mesa": "/importacao/vinhosMesa",
+    "importacao_espumantes": "/importacao/espumantes",
+    "importacao_uvas_frescas": "/importacao/uvasFrescas",
+    "importacao_uvas_passas": "/importacao/uvasPassas",
+    "importacao_suco_uva": "/importacao/sucoUva",
+    "exportacao_vinhos_mesa": "/exportacao/vinhosMesa",
+    "exportacao_espumantes": "/exportacao/espumantes",
+    "exportacao_uvas_frescas": "/exportacao/uvasFrescas",
+    "exportacao_suco_uva": "/exportacao/sucoUva",
+}
+
+# Tipos de consulta e peso de cada um na mistura
+MISTURA = {"ano": 50, "intervalo": 20, "filtro": 10, "ndjson": 5, "agregacao": 15}
+
+Requisicao = Tuple[str, Dict[str, Any], Dict[str, str]]
+
+
+def _ano(aleatorio: random.Random) -> int:
+    # Painéis pedem sobretudo os anos recentes
+    if aleatorio.random() < 0.7:
+        return aleatorio.randint(ULTIMO_ANO - 9, ULTIMO_ANO)
+    return aleatorio.randint(1970, ULTIMO_ANO)
+
+
+def _intervalo(aleatorio: random.Random) -> Dict[str, int]:
+    fim = _ano(aleatorio)
+    return {"ano_inicio": max(1970, fim - aleatorio.randint(4, 14)), "ano_fim": fim}
+
+
+def gerar_requisicao(tipo: str, aleatorio: random.Random) -> Requisicao:
+    """URL, parâmetros e cabeçalhos de uma consulta do tipo informado"""
+    dataset = aleatorio.choice(list(ROTAS))
+    rota = API_PREFIX + ROTAS[dataset]
+    if tipo == "ano":
+        return f"{rota}/{_ano(aleatorio)}", {}, {}
+    if tipo == "intervalo":
+        return rota, _intervalo(aleatorio), {}
+    if tipo == "filtro":
+        pais = aleatorio.choice(["importacao_vinhos_mesa", "exportacao_vinhos_mesa", "exportacao_suco_uva"])
+        return API_PREFIX + ROTAS[pais], {**_intervalo(aleatorio), "chave": "Chile", "limite": 50}, {}
+    if tipo == "ndjson":
+        return rota, _intervalo(aleatorio), {"Accept": "application/x-ndjson"}
+    if tipo == "agregacao":
+        return f"{API_PREFIX}/agregacoes/{dataset}/top", {**_intervalo(aleatorio), "n": 10}, {}
+    raise ValueError(f"Tipo de consulta desconhecido: {tipo}")
+
+
+def resumir(latencias: List[float]) -> Dict[str, float]:
+    """Percentis (ms) de uma lista de latências em segundos"""
+    if not latencias:
+        return {}
+    ms = sorted(valor * 1000 for valor in latencias)
+    percentis = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else [ms[0]] * 99
+    return {
+        "p50": round(percentis[49], 3),
+        "p95": round(percentis[94], 3),
+        "p99": round(percentis[98], 3),
+        "max": round(ms[-1], 3),
+    }
+
+
+async def autenticar(cliente: httpx.AsyncClient, usuario: str, senha: str) -> Dict[str, str]:
+    """Cria o usuário (se ainda não existir) e retorna o cabeçalho com o token JWT"""
+    credenciais = {"username": usuario, "password": senha}
+    await cliente.post(f"{API_PREFIX}/auth/createUser", json=credenciais)
+    resposta = await cliente.post(f"{API_PREFIX}/auth/createToken", json=credenciais)
+    resposta.raise_for_status()
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+async def executar_carga(
+    cliente: httpx.AsyncClient, autorizacao: Dict[str, str], usuarios: int, duracao: float, semente: int = 42
+) -> Dict[str, Any]:
+    """
+    Roda usuários virtuais em ciclo fechado (cada um envia a próxima consulta
+    assim que recebe a resposta) durante duracao segundos.
+    """
+    tipos, pesos = list(MISTURA), list(MISTURA.values())
+    latencias: Dict[str, List[float]] = defaultdict(list)
+    erros: Counter = Counter()
+    status: Counter = Counter()
+    limite = time.perf_counter() + duracao
+
+    async def usuario(numero: int) -> None:
+        aleatorio = random.Random(semente + numero)
+        while time.perf_counter() < limite:
+            tipo = aleatorio.choices(tipos, pesos)[0]
+            url, params, headers = gerar_requisicao(tipo, aleatorio)
+            inicio = time.perf_counter()
+            try:
+                resposta = await cliente.get(url, params=params, headers={**autorizacao, **headers})
+                codigo = str(resposta.status_code)
+            except (httpx.HTTPError, RuntimeError) as e:
+                # Ex.: resposta interrompida no meio do corpo
+                codigo = type(e).__name__
+            latencias[tipo].append(time.perf_counter() - inicio)
+            status[codigo] += 1
+            if not codigo.isdigit() or int(codigo) >= 500:
+                erros[tipo] += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(usuario(i) for i in range(usuarios)))
+    decorrido = time.perf_counter() - inicio
+
+    total = sum(len(valores) for valores in latencias.values())
+    return {
+        "usuarios": usuarios,
+        "duracao_s": round(decorrido, 3),
+        "requisicoes": total,
+        "rps": round(total / decorrido, 2),
+        "erros": sum(erros.values()),
+        "taxa_erro": round(sum(erros.values()) / total, 4) if total else 0.0,
+        "latencia_ms": resumir([valor for valores in latencias.values() for valor in valores]),
+        "status": dict(sorted(status.items())),
+        "por_tipo": {
+            tipo: {"requisicoes": len(latencias[tipo]), "erros": erros[tipo], "latencia_ms": resumir(latencias[tipo])}
+            for tipo in tipos if latencias[tipo]
+        },
+    }
+
+
+def configurar_ambiente(vitibrasil_base_url: str, pasta: str) -> None:
+    """
+    Variáveis da aplicação para rodá-la neste processo; precisa ser chamada
+    antes de importar app/ (as configurações são lidas na importação).
+    """
+    os.environ["VITIBRASIL_BASE_URL"] = vitibrasil_base_url
+    os.environ["DATABASE_URL"] = f"sqlite:///{pasta}/usuarios.db"
+    os.environ["DB_AUTO_MIGRATE"] = "true"
+    os.environ["WARMUP_DATASETS"] = ""
+    os.environ.pop("SNAPSHOT_DB_PATH", None)
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+    if str(APP_DIR) not in sys.path:
+        sys.path.insert(0, str(APP_DIR))
+
+
+@asynccontextmanager
+async def cliente_local() -> AsyncIterator[httpx.AsyncClient]:
+    """Cliente para a aplicação rodando neste processo, com o lifespan (após configurar_ambiente)"""
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(
+            # Falhas depois de iniciada a resposta chegam como resposta truncada, como num servidor real
+            transport=httpx.ASGITransport(app=main.app, raise_app_exceptions=False),
+            base_url="http://bench", timeout=None,
+        ) as cliente:
+            yield cliente
+
+
+def imprimir(resultado: Dict[str, Any]) -> None:
+    print(
+        f"{resultado['requisicoes']} requisições em {resultado['duracao_s']:.1f}s "
+        f"({resultado['rps']:.1f} req/s) com {resultado['usuarios']} usuários, "
+        f"erros: {resultado['taxa_erro']:.2%}, status: {resultado['status']}\n"
+    )
+    print(f"{'consulta':<12} {'req':>6} {'erros':>6} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}")
+    for tipo, dados in {**resultado["por_tipo"], "total": {
+        "requisicoes": resultado["requisicoes"], "erros": resultado["erros"], "latencia_ms": resultado["latencia_ms"]
+    }}.items():
+        lat = dados["latencia_ms"]
+        print(
+            f"{tipo:<12} {dados['requisicoes']:>6} {dados['erros']:>6} "
+            f"{lat.get('p50', 0):>10.1f} {lat.get('p95', 0):>10.1f} {lat.get('p99', 0):>10.1f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=20)
+    parser.add_argument("--duracao", type=float, default=30.0, help="Duração (s)")
+    parser.add_argument("--latencia", type=float, default=0.2, help="Latência simulada da Embrapa (s)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração das páginas da Embrapa com erro 500")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--url", help="API já no ar (em vez de rodar a aplicação neste processo)")
+    parser.add_argument("--usuario", default="benchmark")
+    parser.add_argument("--senha", default="benchmark123")
+    parser.add_argument("--saida", type=Path, help="Grava o resultado em JSON")
+    args = parser.parse_args()
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=None) as cliente:
+            autorizacao = await autenticar(cliente, args.usuario, args.senha)
+            resultado = await executar_carga(cliente, autorizacao, args.usuarios, args.duracao, args.semente)
+    else:
+        with tempfile.TemporaryDirectory() as pasta, ServidorLocal(
+            latencia=args.latencia, jitter=args.jitter, taxa_erro=args.taxa_erro, semente=args.semente
+        ) as servidor:
+            configurar_ambiente(servidor.base_url, pasta)
+            async with cliente_local() as cliente:
+                autorizacao = await autenticar(cliente, args.usuario, args.senha)
+                resultado = await executar_carga(cliente, autorizacao, args.usuarios, args.duracao, args.semente)
+            resultado["vitibrasil"] = servidor.stats()
+
+    imprimir(resultado)
+    if args.saida:
+        args.saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nResultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Benchmark da exportação em lote (services.export_service).
+
+Para o histórico completo de um dataset (cache já aquecido), compara o JSON
+da rota de intervalo com os arquivos Parquet e Arrow IPC da exportação:
+tamanho, tempo para gerar no servidor e tempo para carregar no pandas.
+
+As páginas da Embrapa são simuladas (benchmarks/paginas.py), sem acesso à rede.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_export.py [--dataset importacao_vinhos_mesa] [--repeticoes N]
+"""
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from paginas import pagina_paises, pagina_produtos  # noqa: E402
+from services import export_service, http_client  # noqa: E402
+from services.datasets import DATASETS  # noqa: E402
+from services.json_response import corpo_tabelas  # noqa: E402
+
+ANO_INICIO, ANO_FIM = 1970, 2025
+
+
+def mediana_ms(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="importacao_vinhos_mesa", choices=sorted(DATASETS))
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    gerar = pagina_paises if args.dataset.startswith(("importacao", "exportacao")) else pagina_produtos
+    http_client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda r: httpx.Response(200, content=gerar(int(r.url.params["ano"]))))
+    )
+    service = DATASETS[args.dataset]
+    tabelas = await service.get_tabela_range(ANO_INICIO, ANO_FIM)  # aquece o cache
+    linhas = sum(len(t) for t in tabelas)
+
+    # Geração no servidor, sem o cache de arquivos da exportação
+    def gerar_json() -> bytes:
+        for tabela in tabelas:
+            tabela._json = None
+        return corpo_tabelas(tabelas)
+
+    def gerar_arquivo(formato: str):
+        return lambda: export_service._serializar([export_service.tabela_arrow(t) for t in tabelas], formato)
+
+    formatos = {
+        "json": (gerar_json, lambda dados: pd.DataFrame(json.loads(dados))),
+        "parquet": (gerar_arquivo("parquet"), lambda dados: pd.read_parquet(io.BytesIO(dados))),
+        "arrow": (gerar_arquivo("arrow"), lambda dados: pa.ipc.open_stream(dados).read_pandas()),
+    }
+
+    print(f"{args.dataset}: {ANO_INICIO}-{ANO_FIM}, {linhas} linhas\n")
+    print(f"{'formato':<10} {'KB':>8} {'gerar (ms)':>11} {'carregar (ms)':>14}")
+    referencia = None
+    for nome, (gerar_dados, carregar) in formatos.items():
+        dados = gerar_dados()
+        df = carregar(dados)
+        if referencia is None:
+            referencia = df
+        elif len(df) != len(referencia):
+            sys.exit(f"{nome}: {len(df)} linhas, esperado {len(referencia)}")
+        print(
+            f"{nome:<10} {len(dados) / 1024:>8.0f} {mediana_ms(gerar_dados, args.repeticoes):>11.2f} "
+            f"{mediana_ms(lambda: carregar(dados), args.repeticoes):>14.2f}"
+        )
+
+    await http_client.close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+Benchmark do tempo de inicialização de um worker (reinícios e autoscaling).
+
+Cada medida roda num interpretador novo, como um worker recém-criado:
+tempo até a aplicação ficar pronta (importação de app/main.py e início do
+lifespan), primeiro acesso a /openapi.json e primeira consulta de dados
+(página da Embrapa simulada), que é quando o parsing passa a ser necessário.
+--espera simula o intervalo entre o worker ficar pronto e receber tráfego
+(ex.: health check do balanceador).
+
+O modo "antecipado" reproduz a inicialização anterior: o openapi.yaml é
+lido com o parser de YAML e bs4, numpy e pyarrow são importados antes da
+aplicação. O modo "sob demanda" é a inicialização atual (JSON pré-compilado
+lido no primeiro acesso e importações pesadas adiadas até o primeiro uso).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_inicializacao.py [--repeticoes N] [--espera 0.5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Código executado em cada interpretador novo; imprime os tempos (s) em JSON
+_MEDIR = """
+import asyncio, json, sys, time
+inicio = time.perf_counter()
+if {antecipado}:
+    import yaml
+    with open({yaml!r}, encoding="utf-8") as f:
+        yaml.safe_load(f)
+    import bs4, numpy, pyarrow, pyarrow.parquet
+import main
+
+import httpx
+sys.path.insert(0, {benchmarks!r})
+from paginas import pagina_produtos
+from services import http_client
+from services.auth_service import get_current_user
+
+http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(
+    lambda r: httpx.Response(200, content=pagina_produtos(int(r.url.params["ano"])))
+))
+main.app.dependency_overrides[get_current_user] = lambda: "benchmark"
+
+async def requisicoes():
+    async with main.app.router.lifespan_context(main.app):
+        pronto = time.perf_counter() - inicio
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as cliente:
+            t = time.perf_counter()
+            (await cliente.get("/openapi.json")).raise_for_status()
+            openapi = time.perf_counter() - t
+            await asyncio.sleep({espera})
+            t = time.perf_counter()
+            (await cliente.get("/api/v1/producao/2020")).raise_for_status()
+            return pronto, openapi, time.perf_counter() - t
+
+pronto, openapi, dados = asyncio.run(requisicoes())
+print(json.dumps({{"pronto": pronto, "openapi": openapi, "primeira_consulta": dados}}))
+"""
+
+
+def medir(antecipado: bool, espera: float, env: dict) -> dict:
+    codigo = _MEDIR.format(
+        antecipado=antecipado, espera=espera, yaml=str(RAIZ / "openapi.yaml"), benchmarks=str(RAIZ / "benchmarks")
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=RAIZ / "app", env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--espera", type=float, default=0.0, help="Intervalo (s) entre ficar pronto e a 1ª consulta")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{pasta}/usuarios.db",
+            "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark"),
+            "ALGORITHM": os.environ.get("ALGORITHM", "HS256"),
+            "ACCESS_TOKEN_EXPIRE_MINUTES": os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "30"),
+            "REFRESH_TOKEN_EXPIRE_DAYS": os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", "7"),
+            "SCRAPING_PARSE_EXECUTOR": "inline",
+            "DB_AUTO_MIGRATE": "false",
+            "WARMUP_DATASETS": "",
+        }
+        print(f"mediana de {args.repeticoes} interpretadores novos (ms)\n")
+        print(f"{'modo':<14} {'pronto':>8} {'/openapi.json':>14} {'1ª consulta':>12} {'total':>8}")
+        for nome, antecipado in (("antecipado", True), ("sob demanda", False)):
+            medidas = [medir(antecipado, args.espera, env) for _ in range(args.repeticoes)]
+            medianas = {chave: statistics.median(m[chave] for m in medidas) * 1000 for chave in medidas[0]}
+            print(
+                f"{nome:<14} {medianas['pronto']:>8.0f} {medianas['openapi']:>14.1f} "
+                f"{medianas['primeira_consulta']:>12.1f} {sum(medianas.values()):>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
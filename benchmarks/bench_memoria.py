@@ -0,0 +1,80 @@
+"""
+Benchmark de memória do cache de tabelas.
+
+Simula o cache totalmente aquecido (todos os datasets x todos os anos) e
+compara a memória ocupada pelas tabelas no formato antigo (lista de dicts,
+um por linha) e no formato colunar (services.tabela.Tabela).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_memoria.py [--ano-inicio 1970] [--ano-fim 2025]
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from paginas import pagina_paises, pagina_produtos  # noqa: E402
+from services.cache_service import estimar_tamanho  # noqa: E402
+from services.datasets import DATASETS  # noqa: E402
+from services.html_parser import extrair_colunas, montar_registros  # noqa: E402
+from services.tabela import Tabela  # noqa: E402
+
+
+def gerar_paginas(anos: range) -> list:
+    """Uma página por dataset/ano (países para importação/exportação, produtos para os demais)"""
+    paginas = []
+    for nome in DATASETS:
+        gerar = pagina_paises if nome.startswith(("importacao", "exportacao")) else pagina_produtos
+        for ano in anos:
+            paginas.append((ano, gerar(ano, nome)))
+    return paginas
+
+
+def medir(paginas: list, montar) -> tuple:
+    """Memória (bytes, via tracemalloc) retida pelas tabelas montadas, estimativa do cache e tempo"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    tabelas = []
+    for ano, content in paginas:
+        headers, tipos, colunas, _, _ = extrair_colunas(content)
+        tabelas.append(montar(ano, headers, tipos, colunas))
+    tempo = time.perf_counter() - inicio
+    gc.collect()
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    estimativa = sum(estimar_tamanho(t) for t in tabelas)
+    linhas = sum(len(t) for t in tabelas)
+    return memoria, estimativa, linhas, tempo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ano-inicio", type=int, default=1970)
+    parser.add_argument("--ano-fim", type=int, default=2025)
+    args = parser.parse_args()
+
+    anos = range(args.ano_inicio, args.ano_fim + 1)
+    paginas = gerar_paginas(anos)
+    print(f"{len(DATASETS)} datasets x {len(anos)} anos = {len(paginas)} tabelas\n")
+
+    formatos = {
+        "registros (dicts)": lambda ano, headers, tipos, colunas: montar_registros(ano, headers, colunas),
+        "Tabela (colunar)": Tabela,
+    }
+    resultados = {nome: medir(paginas, montar) for nome, montar in formatos.items()}
+
+    print(f"{'formato':<20} {'linhas':>8} {'memória (MB)':>13} {'estimativa (MB)':>16} {'montagem (s)':>13}")
+    for nome, (memoria, estimativa, linhas, tempo) in resultados.items():
+        print(f"{nome:<20} {linhas:>8} {memoria / 2**20:>13.2f} {estimativa / 2**20:>16.2f} {tempo:>13.2f}")
+
+    antigo, novo = resultados["registros (dicts)"][0], resultados["Tabela (colunar)"][0]
+    print(f"\nredução de memória: {antigo / novo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark da extração da tabela de dados (services.html_parser).
+
+Compara os modos de parser em páginas salvas do VitiBrasil, verificando
+que todos produzem exatamente as mesmas linhas do modo "full" (original).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_parser.py [--paginas DIR] [--repeticoes N]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from services.html_parser import PARSER_MODES, extrair_tabela  # noqa: E402
+
+PAGINAS_DIR = Path(__file__).resolve().parent / "paginas"
+
+
+def medir(content: bytes, modo: str, repeticoes: int) -> float:
+    """Tempo mediano (ms) de uma extração"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        extrair_tabela(content, 2022, modo)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", type=Path, default=PAGINAS_DIR, help="Diretório com páginas .html salvas")
+    parser.add_argument("--repeticoes", type=int, default=30)
+    args = parser.parse_args()
+
+    paginas = sorted(args.paginas.glob("*.html"))
+    if not paginas:
+        sys.exit(f"Nenhuma página .html em {args.paginas} (gere com: python benchmarks/paginas.py)")
+
+    print(f"{'página':<40} {'KB':>6} {'linhas':>7} " + " ".join(f"{m + ' (ms)':>14}" for m in PARSER_MODES) + f" {'ganho':>7}")
+    for pagina in paginas:
+        content = pagina.read_bytes()
+        referencia = extrair_tabela(content, 2022, "full")
+        for modo in PARSER_MODES:
+            if extrair_tabela(content, 2022, modo) != referencia:
+                sys.exit(f"{pagina.name}: modo {modo} produziu linhas diferentes do modo full")
+
+        tempos = {modo: medir(content, modo, args.repeticoes) for modo in PARSER_MODES}
+        melhor = min(tempos[m] for m in PARSER_MODES if m != "full")
+        print(
+            f"{pagina.name:<40} {len(content) / 1024:>6.1f} {len(referencia):>7} "
+            + " ".join(f"{tempos[m]:>14.2f}" for m in PARSER_MODES)
+            + f" {tempos['full'] / melhor:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark de respostas servidas do cache.
+
+Compara, com o cache já aquecido, uma rota que devolve os registros (dicts)
+validados e serializados pelo response_model do FastAPI com a rota que
+devolve o JSON pré-serializado guardado no cache (get_response_*).
+
+As páginas da Embrapa são simuladas (benchmarks/paginas.py), sem acesso à rede.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_respostas.py [--repeticoes N]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Union
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from paginas import pagina_paises  # noqa: E402
+from services import http_client  # noqa: E402
+from services.importacao_service import importacao_service_vinhos_mesa as service  # noqa: E402
+
+Registros = List[Dict[str, Union[str, int, float, None]]]
+
+app = FastAPI()
+
+
+@app.get("/dicts/{ano_inicio}/{ano_fim}", response_model=Registros)
+async def rota_dicts(ano_inicio: int, ano_fim: int):
+    return await service.get_data_range(ano_inicio, ano_fim)
+
+
+@app.get("/json/{ano_inicio}/{ano_fim}", response_model=Registros)
+async def rota_json(ano_inicio: int, ano_fim: int):
+    return await service.get_response_range(ano_inicio, ano_fim)
+
+
+async def medir(cliente: httpx.AsyncClient, url: str, repeticoes: int) -> float:
+    """Tempo mediano (ms) de uma requisição"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resposta = await cliente.get(url)
+        resposta.raise_for_status()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    http_client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda r: httpx.Response(200, content=pagina_paises(int(r.url.params["ano"]))))
+    )
+    cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+    print(f"{'intervalo':<12} {'linhas':>7} {'KB':>7} {'dicts (ms)':>11} {'json (ms)':>10} {'ganho':>7}")
+    for ano_inicio, ano_fim in [(2020, 2020), (2011, 2020), (1970, 2020)]:
+        caminho = f"{ano_inicio}/{ano_fim}"
+        referencia = (await cliente.get(f"/dicts/{caminho}")).json()  # aquece o cache
+        resposta = await cliente.get(f"/json/{caminho}")
+        if resposta.json() != referencia:
+            sys.exit(f"{caminho}: JSON pré-serializado difere dos registros")
+
+        dicts = await medir(cliente, f"/dicts/{caminho}", args.repeticoes)
+        pronto = await medir(cliente, f"/json/{caminho}", args.repeticoes)
+        print(
+            f"{ano_inicio}-{ano_fim:<7} {len(referencia):>7} {len(resposta.content) / 1024:>7.0f} "
+            f"{dicts:>11.2f} {pronto:>10.2f} {dicts / pronto:>6.1f}x"
+        )
+
+    await cliente.aclose()
+    await http_client.close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,266 @@
+"""
+Suíte de benchmarks reprodutível, sem acesso à Embrapa, com resultado em JSON.
+
+A Embrapa é substituída pelo servidor local (benchmarks/vitibrasil_local.py),
+num processo separado e acessado por HTTP de verdade (VITIBRASIL_BASE_URL).
+Grupos:
+
+- parse: vazão da extração (páginas/s e MB/s) por modo de parser, sobre as
+  páginas gravadas em benchmarks/paginas/
+- cache: latência de um ano servido do cache (hit) e buscado no servidor
+  local, extraído e serializado (miss)
+- fanout: consulta de 1970 até o último ano com o cache vazio, para
+  diferentes SCRAPING_MAX_CONCURRENCY, e com o cache quente
+- carga: teste de carga de ponta a ponta com JWT (benchmarks/bench_carga.py)
+
+--saida grava o resultado (com commit, Python e máquina) como baseline;
+--comparar confere o resultado com um baseline anterior e termina com
+status 1 se alguma métrica piorar além de --tolerancia.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_suite.py --saida benchmarks/baselines/local.json
+    python benchmarks/bench_suite.py --grupos parse,cache --comparar benchmarks/baselines/referencia.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bench_carga import cliente_local, autenticar, configurar_ambiente, executar_carga, resumir
+from paginas import PAGINAS_DIR
+from vitibrasil_local import ULTIMO_ANO, ServidorLocal
+
+RAIZ = Path(__file__).resolve().parent.parent
+GRUPOS = ("parse", "cache", "fanout", "carga")
+
+# Dataset usado nos grupos cache e fanout (tabela de países, a maior do site)
+DATASET = "importacao_vinhos_mesa"
+
+
+def grupo_parse(repeticoes: int) -> Dict[str, Any]:
+    from services.html_parser import PARSER_MODES, extrair_colunas
+
+    paginas = [pagina.read_bytes() for pagina in sorted(PAGINAS_DIR.glob("*.html"))]
+    tamanho = sum(len(pagina) for pagina in paginas)
+    resultado = {}
+    for modo in PARSER_MODES:
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            for pagina in paginas:
+                extrair_colunas(pagina, modo)
+            tempos.append(time.perf_counter() - inicio)
+        mediana = statistics.median(tempos)
+        resultado[modo] = {
+            "paginas_por_s": round(len(paginas) / mediana, 1),
+            "mb_por_s": round(tamanho / mediana / 1e6, 2),
+            "pagina_ms": round(mediana / len(paginas) * 1000, 3),
+        }
+    return {"paginas": len(paginas), "modos": resultado}
+
+
+async def grupo_cache(servidor: ServidorLocal, repeticoes: int) -> Dict[str, Any]:
+    from services.cache_service import scraping_cache
+    from services.datasets import DATASETS
+
+    service = DATASETS[DATASET]
+    servidor.configurar(latencia=0, jitter=0, taxa_erro=0, taxa_timeout=0)
+    anos = range(ULTIMO_ANO - 29, ULTIMO_ANO + 1)
+
+    await scraping_cache.invalidate()
+    miss = []
+    for ano in anos:
+        inicio = time.perf_counter()
+        await service.get_response_by_year(ano)
+        miss.append(time.perf_counter() - inicio)
+
+    hit = []
+    for _ in range(repeticoes):
+        for ano in anos:
+            inicio = time.perf_counter()
+            await service.get_response_by_year(ano)
+            hit.append(time.perf_counter() - inicio)
+    return {"dataset": DATASET, "miss_ms": resumir(miss), "hit_ms": resumir(hit)}
+
+
+async def grupo_fanout(servidor: ServidorLocal, latencia: float, concorrencias: List[int]) -> Dict[str, Any]:
+    from services import scraping_service
+    from services.cache_service import scraping_cache
+    from services.datasets import DATASETS
+
+    service = DATASETS[DATASET]
+    servidor.configurar(latencia=latencia, jitter=0, taxa_erro=0, taxa_timeout=0)
+    padrao = scraping_service.SCRAPING_MAX_CONCURRENCY
+    frio = {}
+    try:
+        for concorrencia in concorrencias:
+            scraping_service.SCRAPING_MAX_CONCURRENCY = concorrencia
+            await scraping_cache.invalidate()
+            inicio = time.perf_counter()
+            await service.get_response_range(1970, ULTIMO_ANO)
+            frio[str(concorrencia)] = round((time.perf_counter() - inicio) * 1000, 1)
+    finally:
+        scraping_service.SCRAPING_MAX_CONCURRENCY = padrao
+
+    quente = []
+    for _ in range(20):
+        inicio = time.perf_counter()
+        await service.get_response_range(1970, ULTIMO_ANO)
+        quente.append(time.perf_counter() - inicio)
+    return {
+        "dataset": DATASET,
+        "anos": ULTIMO_ANO - 1970 + 1,
+        "latencia_embrapa_ms": latencia * 1000,
+        "frio_ms_por_concorrencia": frio,
+        "quente_ms": resumir(quente),
+    }
+
+
+async def grupo_carga(servidor: ServidorLocal, args: argparse.Namespace) -> Dict[str, Any]:
+    from services.cache_service import scraping_cache
+
+    servidor.configurar(latencia=args.latencia, jitter=args.latencia / 4, taxa_erro=args.taxa_erro, taxa_timeout=0)
+    await scraping_cache.invalidate()
+    async with cliente_local() as cliente:
+        autorizacao = await autenticar(cliente, "benchmark", "benchmark123")
+        resultado = await executar_carga(cliente, autorizacao, args.usuarios, args.duracao)
+    resultado["latencia_embrapa_ms"] = args.latencia * 1000
+    resultado["taxa_erro_embrapa"] = args.taxa_erro
+    return resultado
+
+
+def metadados() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "gerado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parser_executor": os.getenv("SCRAPING_PARSE_EXECUTOR", "process"),
+    }
+
+
+def _metricas(dados: Any, prefixo: str = "") -> Iterator[Tuple[str, float]]:
+    # Achata o resultado em (caminho, valor) só com as métricas comparáveis
+    if isinstance(dados, dict):
+        for chave, valor in dados.items():
+            yield from _metricas(valor, f"{prefixo}.{chave}" if prefixo else chave)
+    elif isinstance(dados, (int, float)) and _maior_melhor(prefixo) is not None:
+        yield prefixo, float(dados)
+
+
+def _maior_melhor(caminho: str) -> Optional[bool]:
+    """
+    True para vazão, False para latência e erros, None para o que não é
+    comparado (contagens, parâmetros e o máximo, ruidoso demais)
+    """
+    if caminho.endswith(".max"):
+        return None
+    if caminho.endswith(("_por_s", ".rps")):
+        return True
+    if ("_ms" in caminho and "latencia_embrapa" not in caminho) or caminho.endswith(".taxa_erro"):
+        return False
+    return None
+
+
+def comparar(atual: Dict[str, Any], base: Dict[str, Any], tolerancia: float) -> List[str]:
+    """Métricas presentes nos dois resultados que pioraram mais que a tolerância (fração)"""
+    anteriores = dict(_metricas(base["resultados"]))
+    regressoes = []
+    print(f"\n{'métrica':<58} {'base':>10} {'atual':>10} {'variação':>9}")
+    for caminho, valor in _metricas(atual["resultados"]):
+        if caminho not in anteriores:
+            continue
+        anterior = anteriores[caminho]
+        variacao = (valor - anterior) / anterior if anterior else 0.0
+        piora = -variacao if _maior_melhor(caminho) else variacao
+        marca = "  REGRESSÃO" if piora > tolerancia else ""
+        if marca:
+            regressoes.append(caminho)
+        print(f"{caminho:<58} {anterior:>10.2f} {valor:>10.2f} {variacao:>+9.1%}{marca}")
+    return regressoes
+
+
+async def executar(args: argparse.Namespace, grupos: List[str]) -> Dict[str, Any]:
+    resultados: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as pasta, ServidorLocal(semente=42) as servidor:
+        configurar_ambiente(servidor.base_url, pasta)
+        from services import http_client
+        from services.parse_executor import shutdown_parse_executor
+
+        try:
+            if "parse" in grupos:
+                print("parse...", flush=True)
+                resultados["parse"] = grupo_parse(args.repeticoes)
+            if "cache" in grupos:
+                print("cache...", flush=True)
+                resultados["cache"] = await grupo_cache(servidor, args.repeticoes)
+            if "fanout" in grupos:
+                print("fanout...", flush=True)
+                resultados["fanout"] = await grupo_fanout(servidor, args.latencia, args.concorrencias)
+        finally:
+            await http_client.close_http_client()
+        if "carga" in grupos:
+            print("carga...", flush=True)
+            resultados["carga"] = await grupo_carga(servidor, args)
+        shutdown_parse_executor()
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grupos", default=",".join(GRUPOS), help=f"Grupos a executar, separados por vírgula ({', '.join(GRUPOS)})")
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--latencia", type=float, default=0.05, help="Latência simulada da Embrapa (s) no fanout e na carga")
+    parser.add_argument("--concorrencias", type=lambda v: [int(c) for c in v.split(",")], default=[1, 4, 8, 16])
+    parser.add_argument("--usuarios", type=int, default=20, help="Usuários virtuais da carga")
+    parser.add_argument("--duracao", type=float, default=20.0, help="Duração (s) da carga")
+    parser.add_argument("--taxa-erro", type=float, default=0.01, help="Fração das páginas da Embrapa com erro 500 na carga")
+    parser.add_argument("--saida", type=Path, help="Grava o resultado em JSON (baseline)")
+    parser.add_argument("--comparar", type=Path, help="Baseline JSON anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora aceita na comparação (fração)")
+    args = parser.parse_args()
+
+    grupos = [grupo.strip() for grupo in args.grupos.split(",") if grupo.strip()]
+    desconhecidos = set(grupos) - set(GRUPOS)
+    if desconhecidos:
+        sys.exit(f"Grupos desconhecidos: {', '.join(sorted(desconhecidos))}. Use {', '.join(GRUPOS)}")
+
+    resultado = {"metadados": metadados(), "parametros": {
+        "repeticoes": args.repeticoes, "latencia_embrapa_s": args.latencia, "concorrencias": args.concorrencias,
+        "usuarios": args.usuarios, "duracao_s": args.duracao, "taxa_erro_embrapa": args.taxa_erro,
+    }}
+    resultado["resultados"] = asyncio.run(executar(args, grupos))
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        args.saida.parent.mkdir(parents=True, exist_ok=True)
+        args.saida.write_text(texto + "\n", encoding="utf-8")
+        print(f"Resultado gravado em {args.saida}")
+    else:
+        print(texto)
+
+    if args.comparar:
+        base = json.loads(args.comparar.read_text(encoding="utf-8"))
+        regressoes = comparar(resultado, base, args.tolerancia)
+        if regressoes:
+            sys.exit(f"\n{len(regressoes)} métrica(s) piores que o baseline além de {args.tolerancia:.0%}")
+        print("\nSem regressões em relação ao baseline")
+
+
+if __name__ == "__main__":
+    main()
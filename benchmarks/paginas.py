@@ -0,0 +1,210 @@
+"""
+Geração de páginas de exemplo no layout do VitiBrasil.
+
+As páginas reproduzem a estrutura do site (cabeçalho, menus, tabela
+`tb_base tb_dados` com itens/subitens e rodapé) e são determinísticas,
+para que os benchmarks sejam reprodutíveis sem acesso à Embrapa.
+
+Também servem de fixture para o servidor local (benchmarks/vitibrasil_local.py),
+que entrega uma página gravada por dataset e gera as dos demais anos.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/paginas.py  # regrava benchmarks/paginas/*.html
+"""
+import random
+from pathlib import Path
+
+PAGINAS_DIR = Path(__file__).resolve().parent / "paginas"
+
+PRODUTOS = {
+    "VINHO DE MESA": ["Tinto", "Branco", "Rosado"],
+    "VINHO FINO DE MESA (VINIFERA)": ["Tinto", "Branco", "Rosado"],
+    "SUCO": ["Suco de uva integral", "Suco de uva concentrado", "Suco de uva adoçado", "Suco de uva orgânico", "Suco de uva reconstituído"],
+    "DERIVADOS": [
+        "Espumante", "Espumante moscatel", "Base espumante", "Base espumante moscatel", "Base Champenoise champanhe",
+        "Base Charmat champanhe", "Bebida de uva", "Polpa de uva", "Mosto simples", "Mosto concentrado",
+        "Mosto de uva com bagaceira", "Mosto dessulfitado", "Néctar de uva", "Licorosos", "Compostos",
+        "Jeropiga", "Filtrado", "Frisante", "Vinho leve", "Vinho licoroso", "Brandy", "Destilado",
+        "Vinagre", "Bagaceira (graspa)", "Cooler", "Nectar", "Álcool vínico", "Vinho composto",
+    ],
+}
+
+PAISES = [
+    "Afeganistão", "África do Sul", "Alemanha, República Democrática", "Angola", "Anguilla", "Antígua e Barbuda",
+    "Antilhas Holandesas", "Arábia Saudita", "Argélia", "Argentina", "Armênia", "Aruba", "Austrália", "Áustria",
+    "Bahamas", "Bangladesh", "Barbados", "Barein", "Bélgica", "Belice", "Benin", "Bermudas", "Bolívia",
+    "Bósnia-Herzegovina", "Brasil", "Bulgária", "Cabo Verde", "Camarões", "Canadá", "Catar", "Cayman, Ilhas",
+    "Chile", "China", "Chipre", "Cingapura", "Cocos (Keeling), Ilhas", "Colômbia", "Comores", "Congo",
+    "Coreia, Republica Sul", "Costa do Marfim", "Costa Rica", "Croácia", "Cuba", "Curaçao", "Dinamarca",
+    "Dominica", "Egito", "El Salvador", "Emirados Arabes Unidos", "Equador", "Eslovaca, Republica", "Eslovênia",
+    "Espanha", "Estados Unidos", "Estônia", "Filipinas", "Finlândia", "França", "Gana", "Geórgia", "Gibraltar",
+    "Granada", "Grécia", "Guatemala", "Guiana", "Guiana Francesa", "Guiné Bissau", "Guiné Equatorial", "Haiti",
+    "Honduras", "Hong Kong", "Hungria", "Ilhas Virgens", "Índia", "Indonésia", "Irã", "Iraque", "Irlanda",
+    "Islândia", "Israel", "Itália", "Jamaica", "Japão", "Jordânia", "Letônia", "Líbano", "Libéria", "Lituânia",
+    "Luxemburgo", "Macau", "Malásia", "Malta", "Marrocos", "Marshall, Ilhas", "Mauritânia", "México",
+    "Moçambique", "Moldávia", "Mônaco", "Montenegro", "Namíbia", "Nicarágua", "Nigéria", "Noruega",
+    "Nova Caledônia", "Nova Zelândia", "Omã", "Países Baixos", "Panamá", "Paraguai", "Peru", "Polônia",
+    "Porto Rico", "Portugal", "Quênia", "Reino Unido", "República Dominicana", "Romênia", "Rússia",
+    "São Cristóvão e Névis", "São Vicente e Granadinas", "Senegal", "Serra Leoa", "Sérvia", "Síria", "Suécia",
+    "Suíça", "Suriname", "Tailândia", "Taiwan (Formosa)", "Tanzânia", "Tcheca, República", "Togo",
+    "Trinidade Tobago", "Tunísia", "Turquia", "Ucrânia", "Uruguai", "Venezuela", "Vietnã", "Zâmbia",
+]
+
+CULTIVARES = {
+    "TINTAS": [
+        "Alicante Bouschet", "Ancellota", "Aramon", "Alfrocheiro", "Barbera", "Bonarda", "Cabernet Franc",
+        "Cabernet Sauvignon", "Carmenere", "Egiodola", "Gamay", "Lagrein", "Malbec", "Marselan", "Merlot",
+        "Montepulciano", "Nebbiolo", "Pinot Noir", "Pinotage", "Refosco", "Sangiovese", "Syrah", "Tannat",
+        "Tempranillo", "Teroldego", "Touriga Nacional", "Vinhão",
+    ],
+    "BRANCAS E ROSADAS": [
+        "Chardonnay", "Chenin Blanc", "Gewurztraminer", "Glera", "Malvasia Bianca", "Moscato Branco",
+        "Moscato Giallo", "Pinot Blanc", "Pinot Grigio", "Riesling Itálico", "Sauvignon Blanc", "Sémillon",
+        "Trebbiano", "Verdelho", "Viognier",
+    ],
+}
+
+# Título da página de cada dataset (nome usado em services/*_service.py) e layout:
+# tabela de produtos, de cultivares ou de países
+DATASETS_PAGINAS = {
+    "producao": ("produtos", "Produção de vinhos, sucos e derivados do Rio Grande do Sul"),
+    "processamento_viniferas": ("cultivares", "Quantidade de uvas processadas no Rio Grande do Sul - Viníferas"),
+    "processamento_americanas": ("cultivares", "Quantidade de uvas processadas no Rio Grande do Sul - Americanas e híbridas"),
+    "processamento_uvas": ("cultivares", "Quantidade de uvas processadas no Rio Grande do Sul - Uvas de mesa"),
+    "processamento_sem_classificacao": ("cultivares", "Quantidade de uvas processadas no Rio Grande do Sul - Sem classificação"),
+    "comercializacao": ("produtos", "Comercialização de vinhos e derivados no Rio Grande do Sul"),
+    "importacao_vinhos_mesa": ("paises", "Importação de vinhos de mesa"),
+    "importacao_espumantes": ("paises", "Importação de espumantes"),
+    "importacao_uvas_frescas": ("paises", "Importação de uvas frescas"),
+    "importacao_uvas_passas": ("paises", "Importação de uvas passas"),
+    "importacao_suco_uva": ("paises", "Importação de suco de uva"),
+    "exportacao_vinhos_mesa": ("paises", "Exportação de vinhos de mesa"),
+    "exportacao_espumantes": ("paises", "Exportação de espumantes"),
+    "exportacao_uvas_frescas": ("paises", "Exportação de uvas frescas"),
+    "exportacao_suco_uva": ("paises", "Exportação de suco de uva"),
+}
+
+MENU = ["Apresentação", "Produção", "Processamento", "Comercialização", "Importação", "Exportação", "Publicação"]
+
+
+def _numero(valor: int) -> str:
+    # Formato brasileiro com separador de milhar (1.234.567); zero aparece como "-"
+    return f"{valor:,}".replace(",", ".") if valor else "-"
+
+
+def _cabecalho(titulo: str, ano: int) -> str:
+    botoes = "".join(
+        f'<td><button class="btn_opt" type="submit" name="opcao" value="opt_0{i + 1}" id="btn_opt_0{i + 1}">{item}</button></td>'
+        for i, item in enumerate(MENU)
+    )
+    return f"""<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=utf-8" />
+<title>Banco de dados de uva, vinho e derivados</title>
+<link rel="stylesheet" href="css/style.css" type="text/css" />
+<script type="text/javascript" src="js/jquery.min.js"></script>
+<script type="text/javascript">$(document).ready(function() {{ $('.btn_opt').click(function() {{ return true; }}); }});</script>
+</head>
+<body>
+<table class="tb_base tb_header no_print"><tr><td><img src="img/logo_embrapa.png" alt="Embrapa" /></td>
+<td class="col_center"><p>Banco de dados de uva, vinho e derivados</p></td><td><img src="img/logo_vitibrasil.png" alt="VitiBrasil" /></td></tr></table>
+<form action="index.php" method="get"><table class="tb_base tb_header no_print"><tr>{botoes}</tr></table></form>
+<div class="content_center">
+<table class="tb_base tb_controles"><tr><td><p class="text_center">Ano: [1970-2023]
+<input class="text_pesq" type="number" name="ano" min="1970" max="2023" value="{ano}" />
+<button class="btn_sopt" type="submit">OK</button></p></td></tr></table>
+<p class="text_center">{titulo} [{ano}]</p>
+"""
+
+
+def _rodape() -> str:
+    links = "".join(f'<li><a href="index.php?opcao=opt_0{i + 1}">{item}</a></li>' for i, item in enumerate(MENU))
+    return f"""</div>
+<table class="tb_base tb_footer no_print"><tr><td><ul>{links}</ul></td>
+<td><p>Embrapa Uva e Vinho - Rua Livramento, 515 - Bento Gonçalves, RS</p>
+<p>Fone: (54) 3455-8000 | Dúvidas e sugestões: vitibrasil@embrapa.br</p></td></tr></table>
+</body>
+</html>
+"""
+
+
+def pagina_produtos(
+    ano: int, titulo: str = "Produção de vinhos, sucos e derivados do Rio Grande do Sul",
+    itens: dict = PRODUTOS, cabecalho: tuple = ("Produto", "Quantidade (L.)"),
+) -> bytes:
+    """Página com tabela de produtos/subprodutos (produção, processamento, comercialização)"""
+    rnd = random.Random(f"produtos-{titulo}-{ano}")
+    linhas = []
+    total = 0
+    for produto, subprodutos in itens.items():
+        valores = [rnd.choice([0, rnd.randint(1_000, 200_000_000)]) for _ in subprodutos]
+        soma = sum(valores)
+        total += soma
+        linhas.append(f'<tr><td class="tb_item">{produto}</td><td class="tb_item">{_numero(soma)}</td></tr>')
+        for nome, valor in zip(subprodutos, valores):
+            linhas.append(f'<tr><td class="tb_subitem">{nome}</td><td class="tb_subitem">{_numero(valor)}</td></tr>')
+    corpo = "\n".join(linhas)
+    tabela = f"""<table class="tb_base tb_dados">
+<thead><tr><th>{cabecalho[0]}</th><th>{cabecalho[1]}</th></tr></thead>
+<tbody>
+{corpo}
+</tbody>
+<tfoot class="tb_total"><tr><td>Total</td><td>{_numero(total)}</td></tr></tfoot>
+</table>
+"""
+    return (_cabecalho(titulo, ano) + tabela + _rodape()).encode("utf-8")
+
+
+def pagina_paises(ano: int, titulo: str = "Importação de vinhos de mesa") -> bytes:
+    """Página com tabela de países, quantidade e valor (importação, exportação)"""
+    rnd = random.Random(f"paises-{titulo}-{ano}")
+    linhas = []
+    total_kg = total_us = 0
+    for pais in PAISES:
+        kg = rnd.choice([0, 0, rnd.randint(1, 50_000_000)])
+        us = kg * rnd.randint(1, 9) if kg else 0
+        total_kg += kg
+        total_us += us
+        linhas.append(f"<tr><td>{pais}</td><td>{_numero(kg)}</td><td>{_numero(us)}</td></tr>")
+    corpo = "\n".join(linhas)
+    tabela = f"""<table class="tb_base tb_dados">
+<thead><tr><th>Países</th><th>Quantidade (Kg)</th><th>Valor (US$)</th></tr></thead>
+<tbody>
+{corpo}
+</tbody>
+<tfoot class="tb_total"><tr><td>Total</td><td>{_numero(total_kg)}</td><td>{_numero(total_us)}</td></tr></tfoot>
+</table>
+"""
+    return (_cabecalho(titulo, ano) + tabela + _rodape()).encode("utf-8")
+
+
+def pagina_sem_tabela(ano: int) -> bytes:
+    """Página de um ano sem dados (não contém a tabela tb_dados)"""
+    return (_cabecalho("Sem dados", ano) + _rodape()).encode("utf-8")
+
+
+def pagina_dataset(dataset: str, ano: int) -> bytes:
+    """Página de um ano de um dataset, no layout e com o título do dataset"""
+    layout, titulo = DATASETS_PAGINAS[dataset]
+    if layout == "paises":
+        return pagina_paises(ano, titulo)
+    if layout == "cultivares":
+        return pagina_produtos(ano, titulo, CULTIVARES, ("Cultivar", "Quantidade (Kg)"))
+    return pagina_produtos(ano, titulo)
+
+
+# Ano das amostras gravadas em benchmarks/paginas/ (<dataset>_<ano>.html), usadas
+# pelo benchmark de parser e como fixture do servidor local
+ANO_AMOSTRAS = 2022
+AMOSTRAS = {
+    f"{dataset}_{ANO_AMOSTRAS}.html": (lambda dataset=dataset: pagina_dataset(dataset, ANO_AMOSTRAS))
+    for dataset in DATASETS_PAGINAS
+}
+
+
+if __name__ == "__main__":
+    PAGINAS_DIR.mkdir(exist_ok=True)
+    for nome, gerar in AMOSTRAS.items():
+        (PAGINAS_DIR / nome).write_bytes(gerar())
+        print(f"Gravado {PAGINAS_DIR / nome}")
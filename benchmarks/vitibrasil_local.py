@@ -0,0 +1,275 @@
+"""
+Servidor local no lugar do VitiBrasil, para medir a API sem acessar a Embrapa.
+
+Responde em /index.php aos mesmos parâmetros do site (opcao, subopcao e ano)
+para todos os url_param de app/services/*_service.py. Entrega a página gravada
+em benchmarks/paginas/<dataset>_<ano>.html quando existe (gravadas com
+--gravar ou geradas por benchmarks/paginas.py) e, para os demais anos, gera
+uma página determinística no layout do dataset. Anos fora de 1970..--ultimo-ano
+recebem a página sem tabela, como no site.
+
+Latência e falhas são injetadas por requisição:
+  --latencia/--jitter  atraso (s) com distribuição normal
+  --taxa-erro          fração das respostas com status 500
+  --taxa-timeout       fração das requisições que só respondem após
+                       --espera-timeout (s), acima do SCRAPING_TIMEOUT da API
+
+A configuração também pode ser trocada com o servidor no ar (POST /_config,
+JSON com os mesmos nomes) e os contadores ficam em GET /_stats.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/vitibrasil_local.py [--porta 8081] [--latencia 0.2] [--taxa-erro 0.02]
+    VITIBRASIL_BASE_URL=http://127.0.0.1:8081/index.php uvicorn main:app  # a partir de app/
+
+    # grava as páginas reais de um ano de todos os datasets como fixtures
+    python benchmarks/vitibrasil_local.py --gravar --anos 2022
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+
+from paginas import PAGINAS_DIR, pagina_dataset, pagina_sem_tabela
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+# Anos com dados no VitiBrasil
+ANO_INICIAL = 1970
+ULTIMO_ANO = 2023
+
+# Endereço do site real, usado por --gravar
+EMBRAPA_URL = "http://vitibrasil.cnpuv.embrapa.br/index.php"
+
+_CONFIGURAVEIS = ("latencia", "jitter", "taxa_erro", "taxa_timeout", "espera_timeout")
+
+
+def _parametros(query: Iterable[Tuple[str, str]]) -> FrozenSet[Tuple[str, str]]:
+    # Identifica a página pelos parâmetros, sem depender da ordem (e sem o ano)
+    return frozenset((chave, valor) for chave, valor in query if chave != "ano")
+
+
+def _datasets() -> Dict[str, Any]:
+    # Importado só aqui: os serviços leem VITIBRASIL_BASE_URL ao serem importados, então
+    # quem usa ServidorLocal precisa poder configurá-la antes de importar a aplicação
+    if str(APP_DIR) not in sys.path:
+        sys.path.insert(0, str(APP_DIR))
+    from services.datasets import DATASETS
+
+    return DATASETS
+
+
+class VitiBrasilLocal:
+    """Aplicação ASGI que imita as páginas do VitiBrasil (ver o docstring do módulo)"""
+
+    def __init__(
+        self,
+        latencia: float = 0.0,
+        jitter: float = 0.0,
+        taxa_erro: float = 0.0,
+        taxa_timeout: float = 0.0,
+        espera_timeout: float = 30.0,
+        ultimo_ano: int = ULTIMO_ANO,
+        paginas_dir: Path = PAGINAS_DIR,
+        semente: Optional[int] = None,
+    ):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_erro = taxa_erro
+        self.taxa_timeout = taxa_timeout
+        self.espera_timeout = espera_timeout
+        self.ultimo_ano = ultimo_ano
+        self.paginas_dir = paginas_dir
+        self._aleatorio = random.Random(semente)
+        self._paginas: Dict[Tuple[str, int], bytes] = {}
+        self.contadores: Counter = Counter()
+        # Parâmetros da URL de cada serviço de scraping -> nome do dataset
+        self.datasets = {_parametros(parse_qsl(service.url_param)): nome for nome, service in _datasets().items()}
+
+    def configurar(self, **config: float) -> Dict[str, float]:
+        for nome, valor in config.items():
+            if nome not in _CONFIGURAVEIS:
+                raise ValueError(f"Configuração desconhecida: {nome}. Use uma de {_CONFIGURAVEIS}")
+            setattr(self, nome, float(valor))
+        return {nome: getattr(self, nome) for nome in _CONFIGURAVEIS}
+
+    def pagina(self, dataset: str, ano: int) -> bytes:
+        """Página gravada do ano ou, sem ela, a gerada no layout do dataset (mantida em memória)"""
+        chave = (dataset, ano)
+        if chave not in self._paginas:
+            gravada = self.paginas_dir / f"{dataset}_{ano}.html"
+            if gravada.exists():
+                self._paginas[chave] = gravada.read_bytes()
+            elif ANO_INICIAL <= ano <= self.ultimo_ano:
+                self._paginas[chave] = pagina_dataset(dataset, ano)
+            else:
+                self._paginas[chave] = pagina_sem_tabela(ano)
+        return self._paginas[chave]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        caminho, metodo = scope["path"], scope["method"]
+        query = parse_qsl(scope["query_string"].decode("latin-1"))
+
+        if caminho == "/_stats":
+            await _responder(send, 200, json.dumps(dict(self.contadores)).encode(), "application/json")
+            return
+        if caminho == "/_config" and metodo == "POST":
+            corpo = b""
+            while True:
+                mensagem = await receive()
+                corpo += mensagem.get("body", b"")
+                if not mensagem.get("more_body"):
+                    break
+            try:
+                config = self.configurar(**json.loads(corpo or b"{}"))
+            except (ValueError, TypeError) as e:
+                await _responder(send, 400, str(e).encode(), "text/plain")
+                return
+            await _responder(send, 200, json.dumps(config).encode(), "application/json")
+            return
+
+        dataset = self.datasets.get(_parametros(query)) if caminho == "/index.php" else None
+        ano = dict(query).get("ano", "")
+        if dataset is None or not ano.isdigit():
+            self.contadores["nao_encontrada"] += 1
+            await _responder(send, 404, b"Not Found", "text/plain")
+            return
+
+        self.contadores["requisicoes"] += 1
+        sorteio = self._aleatorio.random()
+        if sorteio < self.taxa_timeout:
+            self.contadores["timeouts"] += 1
+            await asyncio.sleep(self.espera_timeout)
+            await _responder(send, 504, b"Gateway Timeout", "text/plain")
+            return
+        if self.latencia or self.jitter:
+            await asyncio.sleep(max(0.0, self._aleatorio.gauss(self.latencia, self.jitter)))
+        if sorteio < self.taxa_timeout + self.taxa_erro:
+            self.contadores["erros"] += 1
+            await _responder(send, 500, b"Internal Server Error", "text/plain")
+            return
+        await _responder(send, 200, self.pagina(dataset, int(ano)), "text/html; charset=utf-8")
+
+
+async def _responder(send, status: int, corpo: bytes, tipo: str) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", tipo.encode()), (b"content-length", str(len(corpo)).encode())],
+    })
+    await send({"type": "http.response.body", "body": corpo})
+
+
+class ServidorLocal:
+    """
+    Sobe o servidor local num processo separado (com sockets de verdade, como a
+    Embrapa) e o encerra ao sair do bloco with. Usado pelos benchmarks.
+    """
+
+    def __init__(self, **config: float):
+        self.config = config
+        self.porta = _porta_livre()
+        self.url = f"http://127.0.0.1:{self.porta}"
+        self._processo: Optional[subprocess.Popen] = None
+
+    @property
+    def base_url(self) -> str:
+        """Valor para VITIBRASIL_BASE_URL"""
+        return f"{self.url}/index.php"
+
+    def __enter__(self) -> "ServidorLocal":
+        argumentos = [sys.executable, __file__, "--porta", str(self.porta)]
+        for nome, valor in self.config.items():
+            argumentos += [f"--{nome.replace('_', '-')}", str(valor)]
+        self._processo = subprocess.Popen(argumentos, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            try:
+                httpx.get(f"{self.url}/_stats", timeout=1).raise_for_status()
+                return self
+            except httpx.HTTPError:
+                if self._processo.poll() is not None:
+                    break
+                time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError("Servidor local do VitiBrasil não iniciou")
+
+    def __exit__(self, *_) -> None:
+        if self._processo is not None:
+            self._processo.terminate()
+            try:
+                self._processo.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                # Requisições presas na espera de timeout atrasam o encerramento
+                self._processo.kill()
+                self._processo.wait()
+            self._processo = None
+
+    def configurar(self, **config: float) -> Dict[str, float]:
+        resposta = httpx.post(f"{self.url}/_config", json=config, timeout=5)
+        resposta.raise_for_status()
+        return resposta.json()
+
+    def stats(self) -> Dict[str, Any]:
+        return httpx.get(f"{self.url}/_stats", timeout=5).json()
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def gravar(anos: Iterable[int], destino: Path = PAGINAS_DIR) -> None:
+    """Baixa do site real as páginas dos anos informados, para todos os datasets"""
+    destino.mkdir(exist_ok=True)
+    with httpx.Client(timeout=30) as cliente:
+        for ano in anos:
+            for nome, service in _datasets().items():
+                resposta = cliente.get(f"{EMBRAPA_URL}?{service.url_param}&ano={ano}")
+                resposta.raise_for_status()
+                (destino / f"{nome}_{ano}.html").write_bytes(resposta.content)
+                print(f"Gravado {destino / f'{nome}_{ano}.html'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=8081)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso médio (s) de cada página")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Desvio padrão (s) do atraso")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração das respostas com status 500")
+    parser.add_argument("--taxa-timeout", type=float, default=0.0, help="Fração das requisições que não respondem a tempo")
+    parser.add_argument("--espera-timeout", type=float, default=30.0, help="Espera (s) das requisições sorteadas para timeout")
+    parser.add_argument("--ultimo-ano", type=int, default=ULTIMO_ANO)
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--gravar", action="store_true", help="Grava as páginas reais da Embrapa em benchmarks/paginas/")
+    parser.add_argument("--anos", default=str(ULTIMO_ANO - 1), help="Anos gravados por --gravar (ex: 2022 ou 2015-2023)")
+    args = parser.parse_args()
+
+    if args.gravar:
+        inicio, _, fim = args.anos.partition("-")
+        gravar(range(int(inicio), int(fim or inicio) + 1))
+        return
+
+    import uvicorn
+
+    app = VitiBrasilLocal(
+        latencia=args.latencia, jitter=args.jitter, taxa_erro=args.taxa_erro, taxa_timeout=args.taxa_timeout,
+        espera_timeout=args.espera_timeout, ultimo_ano=args.ultimo_ano, semente=args.semente,
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.porta, lifespan="off", log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
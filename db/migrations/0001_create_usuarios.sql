@@ -0,0 +1,6 @@
+-- Tabela de usuários (bancos criados antes das migrações já a possuem)
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(50) NOT NULL,
+    password VARCHAR(255) NOT NULL
+);
@@ -0,0 +1,6 @@
+-- Tabela de usuários (SQLite usa AUTOINCREMENT em vez de AUTO_INCREMENT)
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) NOT NULL,
+    password VARCHAR(255) NOT NULL
+);
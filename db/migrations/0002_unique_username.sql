@@ -0,0 +1,8 @@
+-- Usuários duplicados (criados pela corrida do antigo check-then-insert) impedem
+-- o índice único. A migração não escolhe qual conta manter: ela para com a lista
+-- dos usernames duplicados, que devem ser resolvidos manualmente antes de reiniciar
+-- falha_se: SELECT username, COUNT(*) AS contas FROM usuarios GROUP BY username HAVING COUNT(*) > 1 ORDER BY username
+
+-- Índice único: buscas por username deixam de varrer a tabela e o banco
+-- passa a recusar cadastros duplicados
+CREATE UNIQUE INDEX ux_usuarios_username ON usuarios (username);
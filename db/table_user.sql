@@ -1,6 +1,8 @@
 -- Script para criar tabela usuarios
-CREATE TABLE usuarios (
+-- (igual a db/migrations/0001_create_usuarios.sql; o índice único e as demais
+-- alterações do schema vêm das migrações, aplicadas pela aplicação ao iniciar)
+CREATE TABLE IF NOT EXISTS usuarios (
     id INT AUTO_INCREMENT PRIMARY KEY,
     username VARCHAR(50) NOT NULL,
     password VARCHAR(255) NOT NULL
-);
\ No newline at end of file
+);
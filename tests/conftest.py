@@ -0,0 +1,10 @@
+import os
+
+# Configuração mínima para importar os módulos da aplicação sem .env: banco
+# SQLite em memória e cache em processo (os testes de Redis usam fakeredis)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "chave-de-teste")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ.setdefault("CACHE_BACKEND_URL", "memory://")
@@ -0,0 +1,150 @@
+import fakeredis
+import pytest
+
+from services.cache_service import (
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    TTLCache,
+    create_cache_backend,
+)
+from services.tabela import TIPO_INT, TIPO_STR, Tabela
+
+
+class Relogio:
+    """Substitui time.monotonic para controlar a expiração do TTLCache"""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr("services.cache_service.time.monotonic", relogio)
+    return relogio
+
+
+@pytest.fixture
+def servidor():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+async def redis_cache(servidor):
+    backend = RedisCacheBackend(client=fakeredis.FakeAsyncRedis(server=servidor))
+    yield backend
+    await backend.close()
+
+
+def _tabela(ano: int = 2022) -> Tabela:
+    return Tabela(ano, ["Produto", "Quantidade (L.)"], [TIPO_STR, TIPO_INT], [["Tinto", "Branco"], [10, None]])
+
+
+# TTLCache / MemoryCacheBackend
+
+
+def test_ttlcache_expira_pelo_ttl(relogio):
+    cache = TTLCache()
+    cache.set(("opt_02", 2022), "valor", ttl=10)
+
+    relogio.agora += 9.9
+    assert cache.get(("opt_02", 2022)) == "valor"
+
+    relogio.agora += 0.1
+    assert cache.get(("opt_02", 2022)) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_ttlcache_descarta_o_menos_usado(relogio):
+    cache = TTLCache(max_entries=2, max_bytes=0)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttlcache_invalida_por_prefixo():
+    cache = TTLCache()
+    cache.set(("opt_02", 2021), 1, ttl=60)
+    cache.set(("opt_02", 2022), 2, ttl=60)
+    cache.set(("opt_03", 2022), 3, ttl=60)
+
+    assert cache.invalidate(("opt_02",)) == 2
+    assert cache.get(("opt_03", 2022)) == 3
+
+
+async def test_memory_backend_guarda_a_tabela_sem_copiar(relogio):
+    backend = MemoryCacheBackend()
+    tabela = _tabela()
+    await backend.set(("opt_02", 2022), {"dados": tabela}, ttl=60)
+
+    assert (await backend.get(("opt_02", 2022)))["dados"] is tabela
+    relogio.agora += 60
+    assert await backend.get(("opt_02", 2022)) is None
+
+
+# RedisCacheBackend (fakeredis)
+
+
+async def test_redis_backend_serializa_a_tabela(redis_cache):
+    await redis_cache.set(("opt_02", 2022), {"dados": _tabela(), "fresco_ate": 123.0}, ttl=60)
+
+    entrada = await redis_cache.get(("opt_02", 2022))
+    assert entrada["fresco_ate"] == 123.0
+    assert isinstance(entrada["dados"], Tabela)
+    assert entrada["dados"].registros() == _tabela().registros()
+    assert (await redis_cache.stats())["hits"] == 1
+
+
+async def test_redis_backend_grava_com_ttl_e_prefixo(redis_cache):
+    await redis_cache.set(("opt_02", 2022), {"erro": 404}, ttl=300)
+
+    assert await redis_cache.client.exists("embrapa:scrape:opt_02:2022")
+    assert 0 < await redis_cache.client.ttl("embrapa:scrape:opt_02:2022") <= 300
+
+
+async def test_redis_backend_prefixos_nao_se_misturam(servidor):
+    scraping = RedisCacheBackend(client=fakeredis.FakeAsyncRedis(server=servidor))
+    export = RedisCacheBackend(client=fakeredis.FakeAsyncRedis(server=servidor), prefixo="embrapa:export")
+    await scraping.set(("opt_02", 2022), {"origem": "scraping"}, ttl=60)
+    await export.set(("opt_02", 2022), {"origem": "export"}, ttl=60)
+
+    assert await scraping.invalidate() == 1
+    assert await scraping.get(("opt_02", 2022)) is None
+    assert await export.get(("opt_02", 2022)) == {"origem": "export"}
+
+
+async def test_redis_backend_invalida_por_dataset(redis_cache):
+    for chave in [("opt_02", 2021), ("opt_02", 2022), ("opt_03", 2022)]:
+        await redis_cache.set(chave, {"ano": chave[1]}, ttl=60)
+
+    assert await redis_cache.invalidate(("opt_02",)) == 2
+    assert await redis_cache.invalidate(("opt_03", 2022)) == 1
+    assert await redis_cache.get(("opt_03", 2022)) is None
+
+
+async def test_redis_fora_do_ar_vira_cache_miss(servidor, redis_cache):
+    await redis_cache.set(("opt_02", 2022), {"erro": 404}, ttl=60)
+    servidor.connected = False
+
+    assert await redis_cache.get(("opt_02", 2022)) is None
+    await redis_cache.set(("opt_02", 2021), {"erro": 404}, ttl=60)
+
+    stats = await redis_cache.stats()
+    assert stats["errors"] == 2
+    assert stats["misses"] == 1
+
+
+def test_create_cache_backend():
+    assert isinstance(create_cache_backend("memory://"), MemoryCacheBackend)
+    assert isinstance(create_cache_backend(""), MemoryCacheBackend)
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached://localhost")
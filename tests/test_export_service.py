@@ -0,0 +1,50 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from services import export_service
+from services.export_service import _intervalo
+
+
+class DataFixa(date):
+    """date.today() controlado, para simular a virada do ano"""
+
+    hoje = date(2025, 12, 31)
+
+    @classmethod
+    def today(cls):
+        return cls.hoje
+
+
+@pytest.fixture
+def data(monkeypatch):
+    monkeypatch.setattr(export_service, "date", DataFixa)
+    return DataFixa
+
+
+def test_ano_novo_aceito_sem_reiniciar(data):
+    with pytest.raises(HTTPException) as erro:
+        _intervalo(2020, 2026)
+    assert erro.value.status_code == 400
+
+    data.hoje = date(2026, 1, 1)
+    assert _intervalo(2020, 2026) == range(2020, 2027)
+
+
+@pytest.mark.parametrize("ano_inicio, ano_fim", [(2026, None), (2020, 2019), (1970, 2035)])
+def test_intervalo_invalido(data, ano_inicio, ano_fim):
+    data.hoje = date(2025, 6, 1)
+    with pytest.raises(HTTPException) as erro:
+        _intervalo(ano_inicio, ano_fim)
+    assert erro.value.status_code == 400
+
+
+def test_intervalo_padrao_respeita_o_limite(data, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_MAX_ANOS", 60)
+    data.hoje = date(2025, 6, 1)
+    assert _intervalo(None, None) == range(1970, 2026)
+
+    data.hoje = date(2040, 6, 1)
+    assert _intervalo(None, None) == range(1981, 2041)
+    assert _intervalo(None, 2000) == range(1970, 2001)
@@ -0,0 +1,59 @@
+import pytest
+
+from services.html_parser import PARSER_MODES, _normalizar_coluna, extrair_colunas, extrair_tabela
+from services.tabela import TIPO_FLOAT, TIPO_INT, TIPO_STR, Tabela
+
+
+def test_coluna_numerica_no_formato_brasileiro():
+    assert _normalizar_coluna(["1.234", "-", "5"]) == (TIPO_INT, [1234, None, 5])
+    assert _normalizar_coluna(["1.234,5", "nd"]) == (TIPO_FLOAT, [1234.5, None])
+
+
+def test_coluna_so_de_marcadores_e_numerica():
+    assert _normalizar_coluna(["-", "nd", ""]) == (TIPO_INT, [None, None, None])
+
+
+def test_inteiro_fora_do_int64_mantem_texto():
+    celulas = ["99.999.999.999.999.999.999", "1"]
+    assert _normalizar_coluna(celulas) == (TIPO_STR, celulas)
+
+
+def test_quebra_de_linha_na_celula_nao_desalinha_a_coluna():
+    celulas = ["1\n2", "3"]
+    assert _normalizar_coluna(celulas) == (TIPO_STR, celulas)
+
+
+PAGINA_LINHAS_CURTAS = b"""
+<html><body><table class="tb_base tb_dados">
+<thead><tr><th>Produto</th><th>Quantidade (L.)</th><th>Valor (US$)</th></tr></thead>
+<tbody>
+<tr><td class="tb_item">Tinto</td><td class="tb_item">1.000</td><td class="tb_item">20</td></tr>
+<tr><td class="tb_item">Branco</td><td class="tb_item">500</td></tr>
+<tr><td class="tb_item">Total</td></tr>
+</tbody></table></body></html>
+"""
+
+ESPERADO_LINHAS_CURTAS = [
+    {"ano": 2022, "Produto": "Tinto", "Quantidade (L.)": 1000, "Valor (US$)": 20},
+    {"ano": 2022, "Produto": "Branco", "Quantidade (L.)": 500},
+    {"ano": 2022, "Produto": "Total"},
+]
+
+
+@pytest.mark.parametrize("modo", PARSER_MODES)
+def test_linhas_curtas_nao_ganham_chaves(modo):
+    assert extrair_tabela(PAGINA_LINHAS_CURTAS, 2022, modo) == ESPERADO_LINHAS_CURTAS
+
+
+def test_tabela_preserva_linhas_curtas():
+    headers, tipos, colunas, hierarquia, larguras = extrair_colunas(PAGINA_LINHAS_CURTAS)
+    tabela = Tabela(2022, headers, tipos, colunas, hierarquia=hierarquia, larguras=larguras)
+
+    assert tabela.registros() == ESPERADO_LINHAS_CURTAS
+    assert Tabela.from_dict(tabela.to_dict()).registros() == ESPERADO_LINHAS_CURTAS
+    assert Tabela.from_registros(2022, ESPERADO_LINHAS_CURTAS).registros() == ESPERADO_LINHAS_CURTAS
+    # Projeção das colunas 0 e 2: a linha "Branco" não tem a coluna de valor
+    assert tabela.selecionar([1, 0], [0, 2]).registros() == [
+        {"ano": 2022, "Produto": "Branco"},
+        {"ano": 2022, "Produto": "Tinto", "Valor (US$)": 20},
+    ]
@@ -0,0 +1,113 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from services import migration_service
+from services.migration_service import MigracaoBloqueada, _aplicar, _comandos, aplicar_migracoes
+
+TABLE_USER_SQL = Path(__file__).resolve().parent.parent / "db" / "table_user.sql"
+
+
+@pytest.fixture
+async def engine(tmp_path, monkeypatch):
+    # Cada teste usa um arquivo SQLite novo no lugar da engine configurada
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'teste.db'}")
+    monkeypatch.setattr(migration_service, "async_engine", engine)
+    yield engine
+    await engine.dispose()
+
+
+async def _executar(engine, *comandos, **params):
+    async with engine.begin() as conn:
+        for comando in comandos:
+            await conn.execute(text(comando), params)
+
+
+async def _consultar(engine, consulta):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(consulta))).fetchall()
+
+
+async def _criar_com_table_user(engine, *usernames):
+    # Banco criado manualmente com db/table_user.sql, antes das migrações existirem
+    await _executar(engine, *_comandos(TABLE_USER_SQL.read_text(encoding="utf-8")))
+    for username in usernames:
+        await _executar(
+            engine, "INSERT INTO usuarios (username, password) VALUES (:username, 'hash')", username=username
+        )
+
+
+async def test_banco_novo_recebe_todas_as_migracoes(engine):
+    assert await aplicar_migracoes() == [1, 2]
+    assert await aplicar_migracoes() == []
+
+    versoes = await _consultar(engine, "SELECT versao, nome FROM schema_migrations ORDER BY versao")
+    assert [tuple(linha) for linha in versoes] == [(1, "create_usuarios"), (2, "unique_username")]
+
+
+async def test_indice_unico_recusa_username_repetido(engine):
+    await aplicar_migracoes()
+    await _executar(engine, "INSERT INTO usuarios (username, password) VALUES ('ana', 'hash')")
+
+    with pytest.raises(IntegrityError):
+        await _executar(engine, "INSERT INTO usuarios (username, password) VALUES ('ana', 'outro')")
+
+
+async def test_banco_criado_pelo_table_user_sql(engine):
+    await _criar_com_table_user(engine, "ana", "bruno")
+
+    assert await aplicar_migracoes() == [1, 2]
+    usuarios = await _consultar(engine, "SELECT username FROM usuarios ORDER BY username")
+    assert [linha.username for linha in usuarios] == ["ana", "bruno"]
+
+
+async def test_usernames_duplicados_bloqueiam_a_migracao(engine):
+    await _criar_com_table_user(engine, "ana", "ana", "bruno", "carla", "carla", "carla")
+
+    with pytest.raises(MigracaoBloqueada) as erro:
+        await aplicar_migracoes()
+
+    mensagem = str(erro.value)
+    assert "0002_unique_username" in mensagem
+    assert "username=ana, contas=2" in mensagem
+    assert "username=carla, contas=3" in mensagem
+    assert "bruno" not in mensagem
+
+    # Nenhuma conta é removida: a correção fica a cargo do operador
+    assert len(await _consultar(engine, "SELECT username FROM usuarios")) == 6
+    indices = await _consultar(engine, "SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'ux_usuarios_username'")
+    assert indices == []
+
+    # Com os dados corrigidos, a migração é aplicada na próxima inicialização
+    await _executar(
+        engine, "DELETE FROM usuarios WHERE rowid NOT IN (SELECT MIN(rowid) FROM usuarios GROUP BY username)"
+    )
+    assert await aplicar_migracoes() == [1, 2]
+
+
+class ConexaoFalsa:
+    """Conexão que só registra os comandos; GET_LOCK devolve o valor informado"""
+
+    def __init__(self, dialeto, lock):
+        self.dialect = SimpleNamespace(name=dialeto)
+        self.lock = lock
+        self.comandos = []
+
+    def execute(self, comando, params=None):
+        self.comandos.append(str(comando))
+        return SimpleNamespace(scalar=lambda: self.lock)
+
+
+@pytest.mark.parametrize("dialeto", ["mysql", "mariadb"])
+@pytest.mark.parametrize("lock", [0, None])
+def test_sem_lock_nao_migra(dialeto, lock):
+    conn = ConexaoFalsa(dialeto, lock)
+
+    with pytest.raises(RuntimeError, match="lock das migrações"):
+        _aplicar(conn)
+    assert not any("schema_migrations" in c and "SELECT versao" in c for c in conn.comandos)
+    assert not any("RELEASE_LOCK" in c for c in conn.comandos)
@@ -0,0 +1,141 @@
+import time
+
+import fakeredis
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from services import auth_service
+from services.revogacao import MemoryRevogacoes, RedisRevogacoes, RevogacaoIndisponivel
+
+
+class RevogacoesForaDoAr:
+    """Lista de revogação cujo backend não responde"""
+
+    async def revogado_em(self, username):
+        raise RevogacaoIndisponivel()
+
+    async def revogar(self, username, revogado_em, expira_em):
+        raise RevogacaoIndisponivel()
+
+
+@pytest.fixture
+def revogacoes(monkeypatch):
+    revogacoes = MemoryRevogacoes()
+    monkeypatch.setattr(auth_service, "revogacoes", revogacoes)
+    return revogacoes
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(auth_service, "AUTH_MODE", "stateless")
+
+
+@pytest.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE usuarios (id INTEGER PRIMARY KEY, username VARCHAR(50) NOT NULL, password VARCHAR(255) NOT NULL)"
+        ))
+        await conn.execute(text("INSERT INTO usuarios (username, password) VALUES ('ana', 'hash')"))
+    async with async_sessionmaker(engine, expire_on_commit=False)() as sessao:
+        yield sessao
+    await engine.dispose()
+
+
+# Listas de revogação
+
+
+async def test_memoria_nao_descarta_revogacoes_validas():
+    revogacoes = MemoryRevogacoes()
+    expira_em = time.time() + 3600
+    for i in range(20000):
+        await revogacoes.revogar(f"usuario{i}", 100, expira_em)
+
+    assert len(revogacoes) == 20000
+    assert await revogacoes.revogado_em("usuario0") == 100
+
+
+async def test_memoria_remove_revogacao_depois_que_os_tokens_expiram():
+    revogacoes = MemoryRevogacoes()
+    await revogacoes.revogar("ana", 100, time.time() - 1)
+    await revogacoes.revogar("bruno", 100, time.time() + 3600)
+
+    assert await revogacoes.revogado_em("ana") is None
+    assert len(revogacoes) == 1
+
+
+async def test_redis_expira_junto_com_o_ultimo_token():
+    revogacoes = RedisRevogacoes(client=fakeredis.FakeAsyncRedis())
+    await revogacoes.revogar("ana", 100, time.time() + 600)
+
+    assert await revogacoes.revogado_em("ana") == 100
+    assert await revogacoes.revogado_em("bruno") is None
+    assert 0 < await revogacoes.client.ttl("embrapa:revoked:ana") <= 601
+    await revogacoes.close()
+
+
+async def test_redis_fora_do_ar_falha_fechado():
+    servidor = fakeredis.FakeServer()
+    revogacoes = RedisRevogacoes(client=fakeredis.FakeAsyncRedis(server=servidor))
+    servidor.connected = False
+
+    with pytest.raises(RevogacaoIndisponivel):
+        await revogacoes.revogado_em("ana")
+    with pytest.raises(RevogacaoIndisponivel):
+        await revogacoes.revogar("ana", 100, time.time() + 600)
+
+
+# get_current_user (modo stateless) e delete_user
+
+
+async def test_token_emitido_antes_da_revogacao_e_recusado(stateless, revogacoes):
+    token = auth_service.create_access_token({"sub": "ana"})
+    assert (await auth_service.get_current_user(db=None, token=token)).username == "ana"
+
+    await auth_service.revogar_usuario("ana")
+
+    with pytest.raises(HTTPException) as erro:
+        await auth_service.get_current_user(db=None, token=token)
+    assert erro.value.status_code == 401
+
+
+async def test_token_emitido_depois_da_revogacao_e_aceito(stateless, revogacoes):
+    await revogacoes.revogar("ana", int(time.time()) - 60, time.time() + 3600)
+    token = auth_service.create_access_token({"sub": "ana"})
+
+    assert (await auth_service.get_current_user(db=None, token=token)).username == "ana"
+
+
+async def test_lista_fora_do_ar_recusa_com_503(stateless, monkeypatch):
+    monkeypatch.setattr(auth_service, "revogacoes", RevogacoesForaDoAr())
+    token = auth_service.create_access_token({"sub": "ana"})
+
+    with pytest.raises(HTTPException) as erro:
+        await auth_service.get_current_user(db=None, token=token)
+    assert erro.value.status_code == 503
+    assert erro.value.headers["Retry-After"] == "5"
+
+
+async def test_remocao_registra_a_revogacao(db, revogacoes):
+    assert await auth_service.delete_user(db, 1) == {"message": "User deleted successfully"}
+    assert await revogacoes.revogado_em("ana") is not None
+
+
+async def test_remocao_sem_lista_de_revogacao_nao_remove_o_usuario(db, stateless, monkeypatch):
+    monkeypatch.setattr(auth_service, "revogacoes", RevogacoesForaDoAr())
+
+    with pytest.raises(HTTPException) as erro:
+        await auth_service.delete_user(db, 1)
+    assert erro.value.status_code == 503
+    assert (await db.execute(text("SELECT username FROM usuarios"))).fetchall() == [("ana",)]
+
+
+async def test_remocao_no_modo_database_nao_depende_da_lista(db, monkeypatch):
+    monkeypatch.setattr(auth_service, "AUTH_MODE", "database")
+    monkeypatch.setattr(auth_service, "revogacoes", RevogacoesForaDoAr())
+
+    assert await auth_service.delete_user(db, 1) == {"message": "User deleted successfully"}
+    assert (await db.execute(text("SELECT username FROM usuarios"))).fetchall() == []
@@ -0,0 +1,46 @@
+import asyncio
+
+from services import scraping_service
+from services.scraping_service import ScrapingService
+from services.tabela import TIPO_INT, TIPO_STR, Tabela
+
+
+async def test_revalidacao_com_erro_inesperado_fica_registrada(monkeypatch, caplog):
+    servico = ScrapingService("opcao=teste", "teste")
+
+    async def atualizar_ano(ano):
+        raise ValueError("parser quebrou")
+
+    monkeypatch.setattr(servico, "atualizar_ano", atualizar_ano)
+    # Ano recente: a revalidação busca na Embrapa (atualizar_ano)
+    servico._revalidar(2099)
+    await asyncio.gather(*scraping_service._revalidacoes)
+
+    assert "Revalidação de teste/2099 falhou" in caplog.text
+    assert "parser quebrou" in caplog.text
+
+
+async def test_revalidacao_sem_mudanca_mantem_o_last_modified(monkeypatch):
+    servico = ScrapingService("opcao=teste_etag", "teste")
+    colunas = [["Tinto", "Branco"], [10, 20]]
+    versoes = iter([
+        Tabela(2024, ["Produto", "Quantidade"], [TIPO_STR, TIPO_INT], colunas, atualizado_em=1000.0),
+        Tabela(2024, ["Produto", "Quantidade"], [TIPO_STR, TIPO_INT], colunas, atualizado_em=2000.0),
+        Tabela(2024, ["Produto", "Quantidade"], [TIPO_STR, TIPO_INT], [["Tinto", "Branco"], [10, 21]], atualizado_em=3000.0),
+    ])
+
+    async def fetch(ano):
+        return b""
+
+    async def parse(content, ano):
+        return next(versoes)
+
+    monkeypatch.setattr(servico, "_fetch_pagina", fetch)
+    monkeypatch.setattr(servico, "_parse_tabela", parse)
+    monkeypatch.setattr(scraping_service, "snapshot_store", None)
+
+    assert (await servico.atualizar_ano(2024)).atualizado_em == 1000.0
+    # Mesmo conteúdo: a data (Last-Modified) continua a da primeira versão
+    assert (await servico.atualizar_ano(2024)).atualizado_em == 1000.0
+    # Conteúdo novo: a data avança
+    assert (await servico.atualizar_ano(2024)).atualizado_em == 3000.0
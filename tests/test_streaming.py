@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from services import scraping_service
+from services.scraping_service import ScrapingService, TabelaNaoEncontrada
+from services.streaming import FORMATO_CSV, FORMATO_NDJSON
+from services.tabela import TIPO_INT, TIPO_STR, Tabela
+
+
+class ServicoFalso(ScrapingService):
+    """Serviço cujos anos ficam prontos com atraso, sem acessar a Embrapa"""
+
+    def __init__(self, ausentes=(), falhas=()):
+        super().__init__("opcao=teste", "teste")
+        self.ausentes, self.falhas = set(ausentes), set(falhas)
+        self.iniciados = []
+
+    async def _scrape_ano(self, ano, prefetch=False):
+        self.iniciados.append(ano)
+        # Anos mais antigos demoram mais: a ordem de conclusão não é a do intervalo
+        await asyncio.sleep(0.001 * (2030 - ano))
+        if ano in self.ausentes:
+            raise TabelaNaoEncontrada(ano)
+        if ano in self.falhas:
+            raise HTTPException(status_code=502, detail=f"Erro de conexão no ano {ano}")
+        return Tabela(ano, ["Produto", "Quantidade"], [TIPO_STR, TIPO_INT], [["Tinto"], [ano]])
+
+
+async def _corpo(resposta) -> bytes:
+    return b"".join([parte async for parte in resposta.body_iterator])
+
+
+async def test_anos_saem_em_ordem_com_busca_limitada(monkeypatch):
+    monkeypatch.setattr(scraping_service, "SCRAPING_MAX_CONCURRENCY", 3)
+    servico = ServicoFalso()
+    tabelas = servico.iter_tabela_range(2000, 2009)
+
+    assert (await anext(tabelas)).ano == 2000
+    # Só os anos dentro da janela começaram antes do primeiro ser entregue
+    assert servico.iniciados == [2000, 2001, 2002, 2003]
+    assert [tabela.ano async for tabela in tabelas] == list(range(2001, 2010))
+
+
+async def test_ndjson_pula_anos_ausentes():
+    resposta = await ServicoFalso(ausentes={2001}).get_response_range(2000, 2002, FORMATO_NDJSON)
+
+    linhas = [json.loads(linha) for linha in (await _corpo(resposta)).splitlines()]
+    assert [linha["ano"] for linha in linhas] == [2000, 2002]
+    assert resposta.headers["vary"] == "Accept"
+
+
+async def test_intervalo_sem_nenhum_ano_responde_404():
+    with pytest.raises(HTTPException) as erro:
+        await ServicoFalso(ausentes={2000, 2001}).get_response_range(2000, 2001, FORMATO_NDJSON)
+    assert erro.value.status_code == 404
+
+
+async def test_falha_no_primeiro_ano_vira_status_http():
+    with pytest.raises(HTTPException) as erro:
+        await ServicoFalso(falhas={2000}).get_response_range(2000, 2002, FORMATO_NDJSON)
+    assert erro.value.status_code == 502
+
+
+async def test_falha_no_meio_do_ndjson_vai_no_corpo():
+    resposta = await ServicoFalso(falhas={2001}).get_response_range(2000, 2003, FORMATO_NDJSON)
+
+    linhas = [json.loads(linha) for linha in (await _corpo(resposta)).splitlines()]
+    assert linhas[0]["ano"] == 2000
+    assert linhas[-1] == {"erro": {"status": 502, "detail": "Erro de conexão no ano 2001"}}
+    assert len(linhas) == 2
+
+
+async def test_falha_no_meio_do_csv_interrompe_o_corpo():
+    resposta = await ServicoFalso(falhas={2001}).get_response_range(2000, 2003, FORMATO_CSV)
+
+    partes = []
+    with pytest.raises(HTTPException):
+        async for parte in resposta.body_iterator:
+            partes.append(parte)
+    assert b"".join(partes) == b"ano,Produto,Quantidade\n2000,Tinto,2000\n"